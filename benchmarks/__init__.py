@@ -0,0 +1 @@
+# Benchmarks for the analysis hot paths (python -m benchmarks)
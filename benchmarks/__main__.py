@@ -0,0 +1,101 @@
+"""
+Analysis hot-path benchmarks on synthetic data.
+
+    python -m benchmarks run                      # time everything, append to data/benchmarks/history.json
+                                                  # (exit code 1 if a benchmark could not run)
+    python -m benchmarks run -k vwap --size 10y   # a subset
+    python -m benchmarks baseline                 # store the latest run as the baseline
+    python -m benchmarks compare --threshold 0.1  # latest run vs baseline; exit code 1 on slowdowns and
+                                                  # on benchmarks timed on only one side
+    python -m benchmarks startup                  # entry point import times vs config.STARTUP_IMPORT_BUDGET
+"""
+import argparse
+import sys
+from .runner import run_suite, load_history, save_run, load_baseline, save_baseline, compare
+from .startup import check_startup
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Analysis hot-path benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="run benchmarks and append the results to the history")
+    run.add_argument('-k', dest='names', action='append', help="only benchmarks whose name contains this")
+    run.add_argument('--size', dest='sizes', action='append', help="only these sizes (1d, 1mo, 1y, 10y, 50, 150, 500)")
+    run.add_argument('--repeat', type=int, default=5)
+    run.add_argument('--no-save', action='store_true', help="do not record the run in the history")
+    run.add_argument('--compare', action='store_true', help="compare against the baseline afterwards")
+    run.add_argument('--threshold', type=float, default=0.10)
+
+    baseline = commands.add_parser('baseline', help="store a run from the history as the baseline")
+    baseline.add_argument('--run', type=int, default=-1, help="history index (default: latest)")
+
+    comparison = commands.add_parser('compare', help="compare a run from the history with the baseline")
+    comparison.add_argument('--run', type=int, default=-1, help="history index (default: latest)")
+    comparison.add_argument('--threshold', type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+
+    startup = commands.add_parser('startup', help="check entry point import times against the startup budget")
+    startup.add_argument('--repeat', type=int, default=3)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        result = run_suite(args.names, args.sizes, args.repeat)
+        if not args.no_save:
+            count = save_run(result)
+            print(f"\nRun {count} saved to history")
+        status = _compare(result, args.threshold) if args.compare else 0
+        if result['skipped']:
+            print(f"\n{len(result['skipped'])} benchmark(s) skipped")
+            return 1
+        return status
+
+    if args.command == 'startup':
+        violations = check_startup(repeat=args.repeat)
+        if violations:
+            print(f"\n{len(violations)} startup budget violation(s)")
+            return 1
+        print("\nStartup within budget")
+        return 0
+
+    history = load_history()
+    if not history:
+        print("No benchmark history; run `python -m benchmarks run` first")
+        return 1
+    selected = history[args.run]
+
+    if args.command == 'baseline':
+        save_baseline(selected)
+        print(f"Baseline set to the run of {selected['timestamp']} (commit {selected['commit']})")
+        return 0
+    return _compare(selected, args.threshold)
+
+
+def _compare(run, threshold):
+    baseline = load_baseline()
+    if baseline is None:
+        print("No baseline; set one with `python -m benchmarks baseline`")
+        return 1
+    print(f"\nBaseline {baseline['timestamp']} ({baseline['commit']}) vs {run['timestamp']} ({run['commit']})")
+    rows = compare(run, baseline, threshold)
+    for key, before, after, ratio, status in rows:
+        if ratio is None:
+            side = "not in the baseline" if status == 'new' else "not timed in this run"
+            print(f"{key:<50} {side}  <-- {status.upper()}")
+            continue
+        flag = {'slower': '  <-- SLOWER', 'faster': '  faster'}.get(status, '')
+        print(f"{key:<50} {before * 1000:>10.3f} ms {after * 1000:>10.3f} ms {ratio:>6.2f}x{flag}")
+    slower = [row for row in rows if row[4] == 'slower']
+    unmatched = [row for row in rows if row[4] in ('missing', 'new')]
+    if slower:
+        print(f"\n{len(slower)} benchmark(s) slower than the baseline by more than {threshold:.0%}")
+    if unmatched:
+        print(f"\n{len(unmatched)} benchmark(s) without a time on both sides; rerun them or update the baseline")
+    if slower or unmatched:
+        return 1
+    print(f"\nNo slowdowns beyond {threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from src import config
+from .suite import BENCHMARKS
+
+__all__ = ['time_case', 'run_suite', 'load_history', 'save_run', 'load_baseline', 'save_baseline', 'compare',
+           'HISTORY_FILE', 'BASELINE_FILE']
+
+BENCHMARK_DIR = os.path.join(config.DATA_DIR, "benchmarks")
+HISTORY_FILE = os.path.join(BENCHMARK_DIR, "history.json")
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+
+def time_case(function, setup=None, repeat=5, min_time=0.05):
+    """
+    Seconds per call: the median and best of `repeat` timed batches. Batches
+    are sized to last at least `min_time`; with a per-run setup every call is
+    timed on its own.
+    """
+    if setup:
+        setup()
+    start = time.perf_counter()
+    function()  # warm-up, also sizes the batches
+    single = time.perf_counter() - start
+    number = 1 if setup else max(1, int(min_time / max(single, 1e-9)))
+
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+    return {'median': float(np.median(times)), 'min': float(min(times)), 'repeat': repeat, 'number': number}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_suite(names=None, sizes=None, repeat=5, verbose=True):
+    """Run the selected benchmarks; returns a run record ({'results': {"name[size]": timing}, ...})"""
+    results = {}
+    skipped = {}
+    for name, (case_sizes, prepare) in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        for size in case_sizes:
+            if sizes and size not in sizes:
+                continue
+            key = f"{name}[{size}]"
+            try:
+                function, setup = prepare(size)
+                results[key] = time_case(function, setup, repeat)
+            except ImportError as e:
+                skipped[key] = f"missing dependency: {e.name or e}"
+            except Exception as e:
+                skipped[key] = f"{type(e).__name__}: {e}"
+            if verbose:
+                if key in results:
+                    print(f"{key:<50} {results[key]['median'] * 1000:>10.3f} ms")
+                else:
+                    print(f"{key:<50} skipped ({skipped[key]})")
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'results': results,
+        'skipped': skipped
+    }
+
+
+def load_history(path=None):
+    path = path or HISTORY_FILE
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_run(run, path=None):
+    """Append a run to the JSON history"""
+    path = path or HISTORY_FILE
+    history = load_history(path)
+    history.append(run)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(history, f, indent=1)
+    return len(history)
+
+
+def load_baseline(path=None):
+    path = path or BASELINE_FILE
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(run, path=None):
+    path = path or BASELINE_FILE
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(run, f, indent=1)
+
+
+def compare(run, baseline, threshold=0.10):
+    """
+    Rows of (benchmark, baseline s, current s, ratio, status) for every
+    benchmark in either run; status is 'slower' beyond 1 + threshold,
+    'faster' below 1 - threshold and 'ok' otherwise (medians are compared).
+    A benchmark only one side timed is 'missing' (skipped or dropped from
+    the run) or 'new' (not in the baseline), with None for the absent time.
+    """
+    rows = []
+    for key, timing in run['results'].items():
+        if key not in baseline['results']:
+            rows.append((key, None, timing['median'], None, 'new'))
+            continue
+        before = baseline['results'][key]['median']
+        ratio = timing['median'] / before if before > 0 else float('inf')
+        status = 'slower' if ratio > 1 + threshold else 'faster' if ratio < 1 - threshold else 'ok'
+        rows.append((key, before, timing['median'], ratio, status))
+    for key, timing in baseline['results'].items():
+        if key not in run['results']:
+            rows.append((key, timing['median'], None, None, 'missing'))
+    return rows
@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+from src import config
+from src.capabilities import CAPABILITIES
+
+__all__ = ['cold_import', 'measure_import', 'check_startup']
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'modules': sorted(sys.modules)}}))
+"""
+
+
+def cold_import(module):
+    """
+    Import `module` in a fresh interpreter; returns (seconds, names of the
+    optional capabilities it pulled in). Raises ImportError when the import fails.
+    """
+    result = subprocess.run([sys.executable, '-c', _PROBE.format(module=module)],
+                            capture_output=True, text=True, cwd=ROOT)
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise ImportError(lines[-1] if lines else f"import {module} failed")
+    probe = json.loads(result.stdout.strip().splitlines()[-1])  # the module may print on import
+    loaded = set(probe['modules'])
+    eager = [name for name, (module_name, _, _) in CAPABILITIES.items() if module_name in loaded]
+    return probe['seconds'], eager
+
+
+def measure_import(module, repeat=3):
+    """Import time of `module` over `repeat` fresh interpreters (timing dict as in runner.time_case)"""
+    times = []
+    for _ in range(repeat):
+        seconds, eager = cold_import(module)
+        times.append(seconds)
+    return {'median': float(np.median(times)), 'min': float(min(times)), 'repeat': repeat, 'number': 1,
+            'eager': eager}
+
+
+def check_startup(budget=None, repeat=3, verbose=True):
+    """
+    Time the import of every entry point in the budget; returns the list of
+    (module, problem) violations: an import that fails, over budget, or an
+    optional capability imported eagerly.
+    """
+    budget = config.STARTUP_IMPORT_BUDGET if budget is None else budget
+    violations = []
+    for module, limit in budget.items():
+        try:
+            timing = measure_import(module, repeat)
+        except ImportError as e:
+            violations.append((module, f"import failed: {e}"))
+            if verbose:
+                print(f"{module:<30} import failed  <-- {e}")
+            continue
+        problems = []
+        if timing['median'] > limit:
+            problems.append(f"{timing['median']:.2f}s over the {limit:.2f}s budget")
+        if timing['eager']:
+            problems.append(f"imports {', '.join(timing['eager'])} at startup")
+        violations += [(module, problem) for problem in problems]
+        if verbose:
+            flag = "  <-- " + "; ".join(problems) if problems else ""
+            print(f"{module:<30} {timing['median'] * 1000:>8.0f} ms  (budget {limit * 1000:.0f} ms){flag}")
+    return violations
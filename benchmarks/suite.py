@@ -0,0 +1,97 @@
+from src import config
+from .synthetic import BAR_SIZES, STRIKE_SIZES, ohlcv, option_chain_payload, tv_snapshot
+from .startup import cold_import
+
+__all__ = ['BENCHMARKS']
+
+_bars = {}
+
+
+def _data(size):
+    """Synthetic bars, generated once per size and shared by every benchmark"""
+    if size not in _bars:
+        _bars[size] = ohlcv(BAR_SIZES[size])
+    return _bars[size]
+
+
+def _analyzer():
+    from src.analysis.technical import TechnicalAnalyzer
+    return TechnicalAnalyzer()
+
+
+def _trading_system():
+    from nifty_trader import TradingSystem
+    from src.data_collectors.snapshots import SnapshotHistory
+    # Only the analysis methods are timed: skip the TradingView session, alert channels and NSE session
+    system = TradingSystem.__new__(TradingSystem)
+    system.recorder = None
+    system.history = SnapshotHistory()
+    return system
+
+
+def calculate_vwap(size):
+    analyzer, data = _analyzer(), _data(size)
+    return lambda: analyzer.calculate_vwap(data), None
+
+
+def calculate_volume_profile(size):
+    analyzer, data = _analyzer(), _data(size)
+    return lambda: analyzer.calculate_volume_profile(data), None
+
+
+def identify_support_resistance_clusters(size):
+    from src.analysis.levels import PriceLevels
+    analyzer, data = _analyzer(), _data(size)
+
+    def cold():
+        # A fresh level tracker each run, so neither the histogram nor the memo is reused
+        analyzer.price_levels = PriceLevels()
+    return lambda: analyzer.identify_support_resistance_clusters(data), cold
+
+
+def calculate_market_profile(size):
+    analyzer, data = _analyzer(), _data(size)
+    return lambda: analyzer.calculate_market_profile(data), None
+
+
+def detect_divergence(size):
+    analyzer, data = _analyzer(), _data(size)
+    return lambda: analyzer.detect_divergence(data), None
+
+
+def analyze_indicators(size):
+    system, snapshot = _trading_system(), tv_snapshot()
+    return lambda: system.analyze_indicators(snapshot), None
+
+
+def parse_option_chain(size):
+    from src.data_collectors.option_chain import OptionChain
+    payload = option_chain_payload(STRIKE_SIZES[size])
+    return lambda: OptionChain.from_nse(payload), None
+
+
+def analyze_options_chain(size):
+    from src.data_collectors.option_chain import OptionChain
+    system = _trading_system()
+    payload = option_chain_payload(STRIKE_SIZES[size])
+    chain = OptionChain.from_nse(payload)
+    return lambda: system.analyze_options_chain(payload['records']['underlyingValue'], 'bullish', chain=chain), None
+
+
+def startup_import(module):
+    cold_import(module)  # fail up front (recorded as skipped) if the entry point cannot be imported
+    return lambda: cold_import(module), None
+
+
+# name -> (sizes, prepare(size) -> (callable, per-run setup or None))
+BENCHMARKS = {
+    'calculate_vwap': (list(BAR_SIZES), calculate_vwap),
+    'calculate_volume_profile': (list(BAR_SIZES), calculate_volume_profile),
+    'identify_support_resistance_clusters': (list(BAR_SIZES), identify_support_resistance_clusters),
+    'calculate_market_profile': (list(BAR_SIZES), calculate_market_profile),
+    'detect_divergence': (list(BAR_SIZES), detect_divergence),
+    'analyze_indicators': (['3tf'], analyze_indicators),
+    'parse_option_chain': (list(STRIKE_SIZES), parse_option_chain),
+    'analyze_options_chain': (list(STRIKE_SIZES), analyze_options_chain),
+    'startup_import': (list(config.STARTUP_IMPORT_BUDGET), startup_import),
+}
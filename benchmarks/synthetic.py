@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+__all__ = ['BAR_SIZES', 'STRIKE_SIZES', 'ohlcv', 'option_chain_payload', 'tv_snapshot']
+
+BARS_PER_SESSION = 75   # 5m bars from 09:15 to 15:30
+
+# Benchmark sizes: label -> 5m bars (trading sessions x 75)
+BAR_SIZES = {
+    '1d': BARS_PER_SESSION,
+    '1mo': 21 * BARS_PER_SESSION,
+    '1y': 250 * BARS_PER_SESSION,
+    '10y': 2500 * BARS_PER_SESSION,
+}
+STRIKE_SIZES = {'50': 50, '150': 150, '500': 500}
+
+
+def ohlcv(bars, start_price=20000.0, seed=0, start='2015-01-01'):
+    """
+    Session-aligned 5m OHLCV bars (IST, 09:15-15:30 on weekdays) from a
+    random walk with intraday volatility and a U-shaped volume curve
+    """
+    rng = np.random.default_rng(seed)
+    sessions = -(-bars // BARS_PER_SESSION)
+    days = pd.bdate_range(start, periods=sessions, tz='Asia/Kolkata')
+    offsets = pd.to_timedelta(9 * 60 + 15 + 5 * np.arange(BARS_PER_SESSION), unit='min')
+    index = pd.DatetimeIndex(days.repeat(BARS_PER_SESSION)[:bars]) + np.tile(offsets, sessions)[:bars]
+
+    returns = rng.normal(0, 0.0012, bars)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[start_price], close[:-1]]) * (1 + rng.normal(0, 0.0002, bars))
+    spread = np.abs(rng.normal(0, 0.0015, bars)) * close
+    high = np.maximum(open_, close) + spread * rng.random(bars)
+    low = np.minimum(open_, close) - spread * rng.random(bars)
+    slot = np.arange(bars) % BARS_PER_SESSION
+    shape = 1.0 + 2.0 * ((slot - BARS_PER_SESSION / 2) / (BARS_PER_SESSION / 2)) ** 2
+    volume = np.round(rng.lognormal(11, 0.4, bars) * shape)
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+                        index=index)
+
+
+def option_chain_payload(strikes, spot=20000.0, step=50, expiries=3, seed=0):
+    """NSE /api/option-chain-indices style payload with `strikes` strikes per expiry"""
+    rng = np.random.default_rng(seed)
+    atm = round(spot / step) * step
+    strike_prices = atm + step * (np.arange(strikes) - strikes // 2)
+    first = pd.Timestamp('2026-10-20')
+    rows = []
+    for week in range(expiries):
+        expiry = (first + pd.Timedelta(weeks=week)).strftime('%d-%b-%Y')
+        for strike in strike_prices:
+            distance = (strike - spot) / spot
+            row = {'strikePrice': float(strike), 'expiryDate': expiry}
+            for side, moneyness in (('CE', -distance), ('PE', distance)):
+                oi = float(np.round(rng.lognormal(10, 1) * np.exp(-40 * distance ** 2)))
+                intrinsic = max(0.0, moneyness * spot)
+                price = intrinsic + spot * 0.01 * np.exp(-60 * distance ** 2) * (week + 1) ** 0.5
+                row[side] = {
+                    'lastPrice': round(float(price), 2),
+                    'openInterest': oi,
+                    'changeinOpenInterest': float(np.round(oi * rng.normal(0, 0.1))),
+                    'totalTradedVolume': float(np.round(oi * rng.random() * 5)),
+                    'impliedVolatility': round(float(12 + 30 * distance ** 2 + rng.normal(0, 0.5)), 2),
+                    'bidprice': round(float(price * 0.995), 2),
+                    'askPrice': round(float(price * 1.005), 2),
+                }
+            rows.append(row)
+    return {'records': {'data': rows, 'underlyingValue': spot, 'timestamp': first.strftime('%d-%b-%Y %H:%M:%S')}}
+
+
+def tv_snapshot(seed=0, price=20000.0):
+    """{timeframe: indicators} in build_timeframe_data's shape, as fed to analyze_indicators"""
+    rng = np.random.default_rng(seed)
+    snapshot = {}
+    for timeframe in ('5m', '15m', '1h'):
+        close = price * (1 + rng.normal(0, 0.002))
+        snapshot[timeframe] = {
+            'open': close * 0.999, 'high': close * 1.002, 'low': close * 0.997, 'close': close,
+            'volume': float(rng.lognormal(13, 0.3)),
+            'RSI': float(rng.uniform(20, 80)), 'RSI[1]': float(rng.uniform(20, 80)),
+            'MACD.macd': float(rng.normal(0, 10)), 'MACD.signal': float(rng.normal(0, 10)),
+            'EMA20': close * (1 + rng.normal(0, 0.002)), 'EMA50': close * (1 + rng.normal(0, 0.004)),
+            'EMA200': close * (1 + rng.normal(0, 0.01)),
+            'BB.upper': close * 1.01, 'BB.middle': close, 'BB.lower': close * 0.99,
+            'ADX': float(rng.uniform(10, 45)), 'ADX+': float(rng.uniform(5, 40)), 'ADX-': float(rng.uniform(5, 40)),
+            'Stoch.K': float(rng.uniform(0, 100)), 'Stoch.D': float(rng.uniform(0, 100)),
+            'recommendation': str(rng.choice(['STRONG_BUY', 'BUY', 'NEUTRAL', 'SELL', 'STRONG_SELL']))
+        }
+    return snapshot
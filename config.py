@@ -1,6 +1,10 @@
 # WhatsApp configuration
 WHATSAPP_NUMBER = ""  # Your WhatsApp number with country code
 
+# Telegram configuration
+TELEGRAM_BOT_TOKEN = ""  # Bot token from @BotFather
+TELEGRAM_CHAT_ID = ""  # Chat that receives the alerts
+
 # OpenAI configuration
 OPENAI_API_KEY = "sk-proj--"  # Get this from platform.openai.com
 
@@ -2,11 +2,9 @@ from tradingview_ta import TA_Handler, Interval
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from scipy.stats import norm
-from sklearn.cluster import KMeans
+from src.alerts.dispatcher import get_dispatcher
+from src.alerts.channels import SMTPChannel
+from src.analysis.rules import get_rule_set, analysis_fields
 
 # Email configuration
 EMAIL_CONFIG = {
@@ -30,22 +28,15 @@ class NiftyAnalyzer:
             if self.last_alert_time and (current_time - self.last_alert_time).total_seconds() < self.alert_cooldown_minutes * 60:
                 return False
                 
-            msg = MIMEMultipart()
-            msg['From'] = EMAIL_CONFIG['sender_email']
-            msg['To'] = ', '.join(EMAIL_CONFIG['recipients'])
-            msg['Subject'] = f"NIFTY Alert: {subject}"
-            
             full_body = f"Alert Time: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n\n{body}"
-            msg.attach(MIMEText(full_body, 'plain'))
             
-            server = smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port'])
-            server.starttls()
-            server.login(EMAIL_CONFIG['sender_email'], EMAIL_CONFIG['sender_password'])
-            server.send_message(msg)
-            server.quit()
+            dispatcher = get_dispatcher()
+            dispatcher.ensure_channel('email', lambda: SMTPChannel.from_config(EMAIL_CONFIG))
+            if not dispatcher.send('email', f"NIFTY Alert: {subject}", full_body):
+                return False
             
             self.last_alert_time = current_time
-            print("Alert email sent successfully!")
+            print("Alert email queued")
             return True
             
         except Exception as e:
@@ -71,32 +62,11 @@ class NiftyAnalyzer:
             macd = analysis.indicators['MACD.macd']
             macd_signal = analysis.indicators['MACD.signal']
             
-            # Determine trend and strength
-            trend = "neutral"
-            strength = 0
-            
-            # RSI Analysis
-            if rsi > 60:
-                trend = "bullish"
-                strength += 2
-            elif rsi < 40:
-                trend = "bearish"
-                strength += 2
+            # Trend and strength from the 'rsi_macd' rule set in src/config.py
+            result = get_rule_set('rsi_macd').evaluate(analysis_fields(analysis))
+            trend = {1: "bullish", -1: "bearish", 0: "neutral"}[int(np.sign(result['direction']))]
+            strength = int(result['strength'])
                 
-            # MACD Analysis
-            if macd > macd_signal:
-                if trend == "bullish":
-                    strength += 2
-                elif trend == "neutral":
-                    trend = "bullish"
-                    strength += 1
-            elif macd < macd_signal:
-                if trend == "bearish":
-                    strength += 2
-                elif trend == "neutral":
-                    trend = "bearish"
-                    strength += 1
-            
             # Print analysis
             print(f"\nCurrent Price: ₹{current_price:.2f}")
             print(f"RSI: {rsi:.2f}")
@@ -1,137 +1,55 @@
 import pandas as pd
 import numpy as np
-import requests
-import json
-import os
-import winsound
 from datetime import datetime, timedelta
 from time import sleep
 from tradingview_ta import TA_Handler, Interval, Exchange
-import websocket
-from threading import Thread
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pywhatkit as pwk
-import webbrowser
-from urllib.parse import quote
-import requests
-import openai
+import config as user_config
 from config import (
-    WHATSAPP_NUMBER, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID,
-    OPENAI_API_KEY, MIN_TRADE_SCORE, OPTIONS_EXPIRY,
+    WHATSAPP_NUMBER, OPENAI_API_KEY, MIN_TRADE_SCORE, OPTIONS_EXPIRY,
     RISK_AMOUNT, RISK_PER_TRADE
 )
+from src.data_collectors.concurrent_fetch import get_default_fetcher
+from src.data_collectors.screener import BatchScreener
+from src.data_collectors.snapshots import SnapshotHistory, to_snapshot
+from src.data_collectors.nse_session import get_nse_session
+from src.data_collectors.option_chain import fetch_option_chain
+from src.alerts.dispatcher import get_dispatcher
+from src.alerts.channels import WhatsAppChannel, TelegramChannel
+from src.analysis.commentary import get_commentary_service
+from src.scheduling.scheduler import BarScheduler
+from src.data_collectors.tick_stream import WebSocketTickFeed, TickStream
+from src.data_collectors.bar_store import BarStore
+from src.data_collectors.recorder import get_recorder
+from src.monitoring.metrics import span, timed, start_metrics_server, start_summary_reporter
+from src.config import (
+    TICK_FEED_URL, TICK_FEED_SUBSCRIBE, MARKET_TIMEZONE, RESAMPLE_WARMUP_BARS, VOLUME_LOOKBACK, SCHEDULER_PRE_CLOSE
+)
+from src.analysis.resampler import TimeframeResampler
+from src.analysis.technical import TechnicalAnalyzer
+from src.analysis.rules import get_rule_set
+from src.data_collectors.nse_headers import BASE_URL
+from src.capabilities import on_load, available, print_capabilities
 
-# Set up OpenAI
-openai.api_key = OPENAI_API_KEY
+# Set up OpenAI when the commentary first needs it
+on_load('llm', lambda openai: setattr(openai, 'api_key', OPENAI_API_KEY))
 
 # Constants
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9',
-    'Accept-Language': 'en-US,en;q=0.9',
-    'Accept-Encoding': 'gzip, deflate, br',
-    'Cache-Control': 'no-cache',
-    'Connection': 'keep-alive',
-    'X-Requested-With': 'XMLHttpRequest'
-}
-
-BASE_URL = "https://www.nseindia.com"
 NIFTY_QUOTE_URL = f"{BASE_URL}/api/equity-stockIndices?index=NIFTY%2050"
-OPTION_CHAIN_API = f"{BASE_URL}/api/option-chain-indices?symbol=NIFTY"
 FII_DII_URL = f"{BASE_URL}/api/marketStatus"
-COOKIE_URL = f"{BASE_URL}/get-quotes/equity?symbol=NIFTY"
-
-class NSESession:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
-        self.cookies = None
-        self.last_request_time = None
-        self.min_delay = 1
-        # Additional headers that might help
-        self.session.headers.update({
-            'sec-ch-ua': '"Google Chrome";v="119", "Chromium";v="119", "Not?A_Brand";v="24"',
-            'sec-ch-ua-mobile': '?0',
-            'sec-ch-ua-platform': '"Windows"',
-            'sec-fetch-dest': 'empty',
-            'sec-fetch-mode': 'cors',
-            'sec-fetch-site': 'same-origin',
-            'Host': 'www.nseindia.com',
-            'Referer': 'https://www.nseindia.com'
-        })
-
-    def _update_cookies(self):
-        try:
-            # First get the main page to set initial cookies
-            self.session.get(BASE_URL, timeout=10)
-            sleep(1)  # Small delay
-            
-            # Then get the specific page for more cookies
-            response = self.session.get(COOKIE_URL, timeout=10)
-            if response.status_code == 200:
-                self.cookies = self.session.cookies
-                return True
-            return False
-        except Exception as e:
-            print(f"Error updating cookies: {str(e)}")
-            return False
-
-    def _wait_between_requests(self):
-        if self.last_request_time:
-            elapsed = (datetime.now() - self.last_request_time).total_seconds()
-            if elapsed < self.min_delay:
-                sleep(self.min_delay - elapsed)
-        self.last_request_time = datetime.now()
-
-    def make_request(self, url, method="GET", params=None, data=None, max_retries=3):
-        if not self.cookies:
-            self._update_cookies()
-
-        self._wait_between_requests()
-
-        for attempt in range(max_retries):
-            try:
-                if method.upper() == "GET":
-                    response = self.session.get(
-                        url,
-                        params=params,
-                        cookies=self.cookies,
-                        timeout=10
-                    )
-                else:
-                    response = self.session.post(
-                        url,
-                        params=params,
-                        data=data,
-                        cookies=self.cookies,
-                        timeout=10
-                    )
-
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code in [401, 403]:
-                    self._update_cookies()
-                    continue
-                else:
-                    print(f"Request failed with status code: {response.status_code}")
-                    
-            except Exception as e:
-                print(f"Request attempt {attempt + 1} failed: {str(e)}")
-                if attempt < max_retries - 1:
-                    sleep(2 ** attempt)
-                    self._update_cookies()
-                continue
 
-        return None
+# Telegram is optional; config.py files written before it was added do not define it
+TELEGRAM_BOT_TOKEN = getattr(user_config, 'TELEGRAM_BOT_TOKEN', "")
+TELEGRAM_CHAT_ID = getattr(user_config, 'TELEGRAM_CHAT_ID', "")
 
 class TradingViewSession:
-    def __init__(self):
+    def __init__(self, symbol="NIFTY", watchlist=None):
         self.ws = None
+        self.stream = None
         self.last_data = None
         self.is_connected = False
+        self.symbol = symbol
         self.handler = TA_Handler(
-            symbol="NIFTY",
+            symbol=symbol,
             exchange="NSE",
             screener="india",
             interval=Interval.INTERVAL_5_MINUTES,
@@ -141,20 +59,52 @@ class TradingViewSession:
         self.handlers = {
             "5m": self.handler,
             "15m": TA_Handler(
-                symbol="NIFTY",
+                symbol=symbol,
                 exchange="NSE",
                 screener="india",
                 interval=Interval.INTERVAL_15_MINUTES,
                 timeout=30
             ),
             "1h": TA_Handler(
-                symbol="NIFTY",
+                symbol=symbol,
                 exchange="NSE",
                 screener="india",
                 interval=Interval.INTERVAL_1_HOUR,
                 timeout=30
             )
         }
+        self.timeframes = list(self.handlers)
+        # Completed 5m bars resampled into 15m and 1h: Yahoo's ^NSEI bars when polling, the
+        # tick stream's once it runs. TradingView snapshots are still-forming candles and never go in
+        self.analyzer = TechnicalAnalyzer()
+        self.bar_store = BarStore()
+        self.resampler = TimeframeResampler("5m", self.timeframes)
+        # One scanner request per timeframe covers the whole watchlist
+        self.screener = BatchScreener(symbols=watchlist, intervals=self.timeframes)
+        self.fetcher = get_default_fetcher()
+
+    def start_stream(self, on_bar_close=None, intervals=None):
+        """
+        Stream ticks from config.TICK_FEED_URL and build bars locally.
+        on_bar_close(BarEvent) runs as soon as a bar of the given intervals closes;
+        from then on get_analysis works from the streamed bars instead of TradingView.
+        """
+        self.ws = WebSocketTickFeed(TICK_FEED_URL, subscribe=TICK_FEED_SUBSCRIBE)
+        self.stream = TickStream(self.ws, symbol=self.symbol, bar_store=self.bar_store)
+        self.resampler = TimeframeResampler("5m", self.timeframes)
+        self.resampler.update_frame(self.bar_store.read(self.symbol, "5m", last=RESAMPLE_WARMUP_BARS))
+        # Subscribed first so 15m/1h are up to date when on_bar_close runs
+        self.stream.subscribe(self._on_stream_bar, ["5m"])
+        if on_bar_close:
+            self.stream.subscribe(on_bar_close, intervals)
+        self.stream.start()
+        self.is_connected = True
+        return self.stream
+
+    def _on_stream_bar(self, event):
+        bar = event.bar
+        self.resampler.update(pd.Timestamp(bar['timestamp'], tz='UTC'), bar['Open'], bar['High'],
+                              bar['Low'], bar['Close'], bar['Volume'])
 
     def connect(self):
         try:
@@ -166,65 +116,70 @@ class TradingViewSession:
 
     def get_analysis(self):
         try:
-            data = {}
-            for timeframe, handler in self.handlers.items():
+            if self.stream is not None:
+                return self._local_analysis(self.timeframes)
+            
+            # Every timeframe is built from the completed 5m bars once they reach the one that just
+            # closed; until then TradingView's forming candles are used (see the scheduler in __main__)
+            now = pd.Timestamp.now(tz=MARKET_TIMEZONE)
+            data = self._local_analysis(self.timeframes) if self._sync_bars(now) else {}
+            
+            # Send the remaining timeframe requests at once under one batch deadline
+            analyses = self.fetcher.fetch_all({
+                timeframe: handler.get_analysis
+                for timeframe, handler in self.handlers.items() if timeframe not in data
+            })
+            for timeframe in analyses.missed:
+                print(f"Timed out getting {timeframe} analysis")
+            for timeframe, error in analyses.errors.items():
+                print(f"Error getting {timeframe} analysis: {str(error)}")
+            
+            # One compact snapshot record per timeframe, stamped with its bar start
+            for timeframe, analysis in analyses.items():
                 try:
-                    analysis = handler.get_analysis()
-                    indicators = analysis.indicators
-                    oscillators = analysis.oscillators
-                    moving_averages = analysis.moving_averages
-                    
-                    data[timeframe] = {
-                        # Price data
-                        'close': indicators.get('close', 0),
-                        'open': indicators.get('open', 0),
-                        'high': indicators.get('high', 0),
-                        'low': indicators.get('low', 0),
-                        'volume': indicators.get('volume', 0),
-                        
-                        # Technical indicators
-                        'RSI': indicators.get('RSI', 0),
-                        'RSI[1]': indicators.get('RSI[1]', 0),
-                        'EMA20': indicators.get('EMA20', 0),
-                        'EMA50': indicators.get('EMA50', 0),
-                        'EMA200': indicators.get('EMA200', 0),
-                        'SMA20': indicators.get('SMA20', 0),
-                        'SMA50': indicators.get('SMA50', 0),
-                        'SMA200': indicators.get('SMA200', 0),
-                        
-                        # Bollinger Bands
-                        'BB.upper': indicators.get('BB.upper', 0),
-                        'BB.lower': indicators.get('BB.lower', 0),
-                        'BB.middle': indicators.get('BB.middle', 0),
-                        
-                        # MACD
-                        'MACD.macd': indicators.get('MACD.macd', 0),
-                        'MACD.signal': indicators.get('MACD.signal', 0),
-                        
-                        # Volume indicators
-                        'ADX': indicators.get('ADX', 0),
-                        'ADX+': indicators.get('ADX+DI', 0),
-                        'ADX-': indicators.get('ADX-DI', 0),
-                        
-                        # Additional data
-                        'Stoch.K': indicators.get('Stoch.K', 0),
-                        'Stoch.D': indicators.get('Stoch.D', 0),
-                        'ATR': indicators.get('ATR', 0),
-                        
-                        # Summary
-                        'recommendation': analysis.summary.get('RECOMMENDATION', 'NEUTRAL'),
-                        'oscillator_summary': oscillators.get('RECOMMENDATION', 'NEUTRAL'),
-                        'ma_summary': moving_averages.get('RECOMMENDATION', 'NEUTRAL')
-                    }
+                    data[timeframe] = to_snapshot(analysis, self.resampler.bar_start(now, timeframe))
                 except Exception as e:
                     print(f"Error getting {timeframe} analysis: {str(e)}")
                     continue
             
-            return data
+            return {timeframe: data[timeframe] for timeframe in self.timeframes if timeframe in data}
         except Exception as e:
             print(f"Error getting TradingView analysis: {str(e)}")
             return None
 
+    def _sync_bars(self, now):
+        """Fold newly completed ^NSEI 5m bars into the resampler; True once it holds the bar that just closed"""
+        try:
+            bars = self.analyzer.fetch_completed_bars("5m", since=self.resampler.last_base)
+            self.resampler.update_frame(bars)
+        except Exception as e:
+            print(f"Error reading completed 5m bars: {str(e)}")
+        return self.resampler.is_current(now)
+
+    def _local_analysis(self, timeframes):
+        """Snapshots computed from the resampler's completed bars (no HTTP)"""
+        data = {}
+        last_bar = self.resampler.last_base
+        if last_bar is None:
+            return data
+        for timeframe in timeframes:
+            try:
+                timeframe_data = self.resampler.timeframe_data(timeframe)
+                if timeframe_data is not None:
+                    data[timeframe] = to_snapshot(timeframe_data, self.resampler.bar_start(last_bar, timeframe))
+            except Exception as e:
+                print(f"Error building {timeframe} analysis: {str(e)}")
+                continue
+        return data
+
+    def get_watchlist_analysis(self):
+        """Get per-timeframe analysis for every watchlist symbol in batched requests"""
+        try:
+            return self.screener.scan()
+        except Exception as e:
+            print(f"Error scanning watchlist: {str(e)}")
+            return None
+
 class TradingSystem:
     def __init__(self):
         self.tv_session = TradingViewSession()
@@ -235,35 +190,27 @@ class TradingSystem:
         self.telegram_token = TELEGRAM_BOT_TOKEN
         self.telegram_chat_id = TELEGRAM_CHAT_ID
         self.use_real_data = True
-        self.nse_session = NSESession()
+        self.nse_session = get_nse_session()
+        self.alerts = get_dispatcher()
+        self.commentary = get_commentary_service()
+        self.recorder = get_recorder()  # Raw inputs of every run, for replay.py
+        self.history = SnapshotHistory()  # Past snapshots per timeframe, for N-bar lookbacks
+        if self.whatsapp_number:
+            self.alerts.ensure_channel('whatsapp', lambda: WhatsAppChannel(self.whatsapp_number))
+        self.alerts.ensure_channel('telegram', lambda: TelegramChannel(self.telegram_token, self.telegram_chat_id))
         
     def send_telegram_message(self, message):
-        """Placeholder for Telegram messaging (disabled)"""
-        return True
+        """Queue a Telegram message (the channel is a disabled placeholder)"""
+        return self.alerts.send('telegram', None, message)
             
     def send_whatsapp_message(self, message):
-        """Send a WhatsApp message directly using pywhatkit"""
-        try:
-            if not self.whatsapp_number:
-                print("Please set your WhatsApp number in the WHATSAPP_NUMBER constant")
-                return False
-            
-            # Remove the '+' from the number
-            phone = self.whatsapp_number.replace("+", "")
-            
-            # Send message instantly using pywhatkit
-            pwk.sendwhatmsg_instantly(
-                phone, 
-                message,
-                wait_time=15,  # Give browser time to load
-                tab_close=True  # Automatically close tab after sending
-            )
-            print(f"✅ WhatsApp message sent successfully to {phone}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error sending WhatsApp message: {str(e)}")
+        """Queue a WhatsApp message; pywhatkit delivers it on the dispatcher's thread"""
+        if not self.whatsapp_number:
+            print("Please set your WhatsApp number in the WHATSAPP_NUMBER constant")
             return False
+        
+        # Messages sent back to back (alert + detailed analysis) go out as one
+        return self.alerts.send('whatsapp', None, message)
             
     def format_trade_alert(self, bias, current_price, entry, stop_loss, target, analysis, indicators):
         """Format trade alert message for WhatsApp"""
@@ -363,91 +310,14 @@ Top Reasons:"""
         if not tv_data or '5m' not in tv_data:
             return None
         
-        score = 0
-        reasons = []
-        trend_strength = 0
-        current_price = tv_data['5m']['close']
-
-        # Analyze each timeframe
-        timeframes = ['5m', '15m', '1h']
-        weights = {'5m': 0.5, '15m': 0.3, '1h': 0.2}  # Weight by importance
-        
-        for tf in timeframes:
-            if tf not in tv_data:
-                continue
-                
-            data = tv_data[tf]
-            tf_score = 0
-            tf_reasons = []
-
-            # Trend Analysis using EMAs
-            if current_price > data['EMA20'] > data['EMA50']:
-                tf_score += 1
-                tf_reasons.append(f"{tf} Uptrend (Price > EMA20 > EMA50)")
-            elif current_price < data['EMA20'] < data['EMA50']:
-                tf_score -= 1
-                tf_reasons.append(f"{tf} Downtrend (Price < EMA20 < EMA50)")
-
-            # RSI Analysis with momentum
-            rsi = data['RSI']
-            rsi_prev = data['RSI[1]']
-            if rsi > 60 and rsi > rsi_prev:
-                tf_score += 1
-                tf_reasons.append(f"{tf} Strong RSI with momentum ({rsi:.2f})")
-            elif rsi < 40 and rsi < rsi_prev:
-                tf_score -= 1
-                tf_reasons.append(f"{tf} Weak RSI with momentum ({rsi:.2f})")
-
-            # MACD Analysis
-            if data['MACD.macd'] > data['MACD.signal']:
-                tf_score += 1
-                tf_reasons.append(f"{tf} MACD bullish")
-            else:
-                tf_score -= 1
-                tf_reasons.append(f"{tf} MACD bearish")
-
-            # Bollinger Bands Analysis
-            bb_pos = (current_price - data['BB.lower']) / (data['BB.upper'] - data['BB.lower'])
-            if bb_pos > 0.8:
-                tf_score -= 0.5
-                tf_reasons.append(f"{tf} Overbought (BB)")
-            elif bb_pos < 0.2:
-                tf_score += 0.5
-                tf_reasons.append(f"{tf} Oversold (BB)")
-
-            # ADX Analysis (Trend Strength)
-            adx = data['ADX']
-            if adx > 25:
-                trend_strength += 1
-                if data['ADX+'] > data['ADX-']:
-                    tf_score += 1
-                    tf_reasons.append(f"{tf} Strong uptrend (ADX: {adx:.2f})")
-                else:
-                    tf_score -= 1
-                    tf_reasons.append(f"{tf} Strong downtrend (ADX: {adx:.2f})")
-
-            # Stochastic Analysis
-            if data['Stoch.K'] > data['Stoch.D'] and data['Stoch.K'] < 80:
-                tf_score += 0.5
-                tf_reasons.append(f"{tf} Stochastic bullish crossover")
-            elif data['Stoch.K'] < data['Stoch.D'] and data['Stoch.K'] > 20:
-                tf_score -= 0.5
-                tf_reasons.append(f"{tf} Stochastic bearish crossover")
-
-            # TradingView Recommendations
-            rec_score = {
-                'STRONG_BUY': 2, 'BUY': 1, 
-                'NEUTRAL': 0, 
-                'SELL': -1, 'STRONG_SELL': -2
-            }
-            tv_rec = data['recommendation']
-            tv_score = rec_score.get(tv_rec, 0)
-            tf_score += tv_score
-            tf_reasons.append(f"{tf} TradingView: {tv_rec}")
-
-            # Add weighted score and reasons for this timeframe
-            score += tf_score * weights[tf]
-            reasons.extend(tf_reasons)
+        # Scored by the 'bias' rule set in src/config.py (5m/15m/1h weighted 0.5/0.3/0.2) over
+        # the last few snapshots of each timeframe, so rules can look back (RSI[3], MACD[1])
+        rule_set = get_rule_set('bias')
+        windows = self.history.windows(tv_data, rule_set.depth)
+        result = rule_set.evaluate(windows, shared={'price': tv_data['5m']['close']})
+        score = float(result['score'][-1])
+        trend_strength = int(result['trend_strength'][-1])
+        reasons = result.reasons(index=(-1,))
 
         return {
             'bias': "bullish" if score > 0 else "bearish",
@@ -471,9 +341,11 @@ Top Reasons:"""
             # Analyze 5-minute timeframe
             d5 = data['5m']
             
-            # Calculate volume metrics
-            avg_volume = d5['volume']
-            prev_volume = avg_volume * 0.8  # Estimate previous volume
+            # Calculate volume metrics against the previous 5m snapshots (estimated until there are some)
+            volumes = self.history.window('5m', VOLUME_LOOKBACK + 1, current=d5)['volume'][:-1]
+            volumes = volumes[np.isfinite(volumes)]
+            avg_volume = volumes.mean() if len(volumes) else d5['volume']
+            prev_volume = volumes[-1] if len(volumes) else avg_volume * 0.8
             
             # Volume increase analysis
             volume_increase = (d5['volume'] / prev_volume - 1) * 100 if prev_volume > 0 else 0
@@ -505,8 +377,8 @@ Top Reasons:"""
                         volume_analysis['reasons'].append("High volume supporting price decline")
                         volume_analysis['score'] -= 1
             
-            # VWAP relationship
-            vwap = (d5['high'] + d5['low'] + d5['close']) / 3
+            # VWAP relationship (session VWAP from the indicator engine when 5m is resampled locally)
+            vwap = d5.get('VWAP', (d5['high'] + d5['low'] + d5['close']) / 3)
             if d5['close'] > vwap:
                 volume_analysis['reasons'].append("Price trading above VWAP")
                 volume_analysis['score'] += 0.5
@@ -599,67 +471,52 @@ EMA200: ₹{data_5m['EMA200']:.2f}
         position_size = int(risk_amount / points_at_risk)
         return position_size
 
-    def analyze_options_chain(self, current_price, bias):
-        """Analyze options chain and suggest strikes"""
+    def analyze_options_chain(self, current_price, bias, chain=None):
+        """Analyze options chain and suggest strikes (fetches the chain unless one is given)"""
         try:
-            response = self.nse_session.make_request(OPTION_CHAIN_API)
-            if not response or 'filtered' not in response:
+            if chain is None:
+                with span("fetch_option_chain") as timer:
+                    chain = fetch_option_chain("NIFTY")
+                    if chain is None:
+                        timer.fail()
+                self.recorder.record('option_chain', chain)
+            if chain is None or len(chain) == 0:
                 return None
 
-            options_data = response['filtered']['data']
-            atm_strike = round(current_price / 50) * 50
-            
+            # Nearest expiry; most traded option within one strike of ATM
+            summary = chain.summary()
             selected_options = {
-                'CE': None,
-                'PE': None,
-                'strategy': None
+                'CE': chain.most_liquid('CE', current_price) if bias == 'bullish' else None,
+                'PE': chain.most_liquid('PE', current_price) if bias == 'bearish' else None,
+                'strategy': None,
+                'PCR': summary['PCR'],
+                'max_pain': summary['max_pain']
             }
             
-            # Find options with good liquidity near ATM
-            for option in options_data:
-                if option['strikePrice'] in [atm_strike - 50, atm_strike, atm_strike + 50]:
-                    if bias == 'bullish' and option['CE']:
-                        if not selected_options['CE'] or option['CE']['totalTradedVolume'] > selected_options['CE']['volume']:
-                            selected_options['CE'] = {
-                                'strike': option['strikePrice'],
-                                'price': option['CE']['lastPrice'],
-                                'volume': option['CE']['totalTradedVolume'],
-                                'oi': option['CE']['openInterest']
-                            }
-                    elif bias == 'bearish' and option['PE']:
-                        if not selected_options['PE'] or option['PE']['totalTradedVolume'] > selected_options['PE']['volume']:
-                            selected_options['PE'] = {
-                                'strike': option['strikePrice'],
-                                'price': option['PE']['lastPrice'],
-                                'volume': option['PE']['totalTradedVolume'],
-                                'oi': option['PE']['openInterest']
-                            }
-            
             return selected_options
         except Exception as e:
             print(f"Error analyzing options chain: {str(e)}")
             return None
 
-    def get_ai_analysis(self, tv_data, analysis, volume_analysis, options_data):
-        """Get AI-powered market analysis and suggestions"""
-        try:
-            # Prepare data for AI analysis
-            market_context = {
-                'price': tv_data['5m']['close'],
-                'bias': analysis['bias'],
-                'strength': analysis['strength'],
-                'volume_pressure': volume_analysis['pressure'],
-                'rsi': tv_data['5m']['RSI'],
-                'adx': tv_data['5m']['ADX'],
-                'macd': {
-                    'line': tv_data['5m']['MACD.macd'],
-                    'signal': tv_data['5m']['MACD.signal']
-                },
-                'options': options_data
-            }
-            
-            # Create prompt for GPT
-            prompt = f"""As a professional options trader, analyze this market data and provide strategic insights:
+    def build_ai_prompt(self, tv_data, analysis, volume_analysis, options_data):
+        """Market context and GPT prompt for the AI commentary"""
+        # Prepare data for AI analysis
+        market_context = {
+            'price': tv_data['5m']['close'],
+            'bias': analysis['bias'],
+            'strength': analysis['strength'],
+            'volume_pressure': volume_analysis['pressure'],
+            'rsi': tv_data['5m']['RSI'],
+            'adx': tv_data['5m']['ADX'],
+            'macd': {
+                'line': tv_data['5m']['MACD.macd'],
+                'signal': tv_data['5m']['MACD.signal']
+            },
+            'options': options_data or {'CE': None, 'PE': None}
+        }
+        
+        # Create prompt for GPT
+        prompt = f"""As a professional options trader, analyze this market data and provide strategic insights:
 
 Market Context:
 - Price: {market_context['price']}
@@ -680,20 +537,36 @@ Provide:
 4. Entry/Exit Levels
 5. Risk Management Rules
 """
-            # Get AI analysis
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert options trader specializing in Nifty index options."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            
-            return response.choices[0].message.content
+        return market_context, prompt
+
+    def get_ai_analysis(self, tv_data, analysis, volume_analysis, options_data):
+        """Get AI-powered market analysis and suggestions (blocks up to the commentary timeout)"""
+        try:
+            market_context, prompt = self.build_ai_prompt(tv_data, analysis, volume_analysis, options_data)
+            return self.commentary.get(market_context, prompt)
+        except Exception as e:
+            print(f"Error getting AI analysis: {str(e)}")
+            return None
+
+    def request_ai_analysis(self, tv_data, analysis, volume_analysis, options_data):
+        """Start the AI commentary in the background; it is printed and sent as a follow-up when ready"""
+        try:
+            market_context, prompt = self.build_ai_prompt(tv_data, analysis, volume_analysis, options_data)
+            return self.commentary.request(market_context, prompt, callback=self.send_ai_followup)
         except Exception as e:
             print(f"Error getting AI analysis: {str(e)}")
             return None
 
+    def send_ai_followup(self, ai_analysis):
+        if not ai_analysis:
+            return
+        print("\nAI-Powered Analysis:")
+        print(ai_analysis)
+        message = f"🤖 AI ANALYSIS\n\n{ai_analysis}"
+        if self.whatsapp_number:
+            self.send_whatsapp_message(message)
+        self.send_telegram_message(message)
+
     def should_alert(self, analysis, volume_analysis):
         """Determine if an alert should be generated based on signal strength"""
         score = 0
@@ -711,23 +584,32 @@ Provide:
             
         return score >= MIN_TRADE_SCORE
 
+    @timed("trade_plan_cycle")
     def generate_trade_plan(self):
         print("\n=== Starting Trade Plan Generation ===\n")
         
         # Get TradingView analysis
         print("1. Getting TradingView analysis...")
-        tv_data = self.tv_session.get_analysis()
+        with span("fetch_tradingview") as timer:
+            tv_data = self.tv_session.get_analysis()
+            if not tv_data or '5m' not in tv_data:
+                timer.fail()
         if not tv_data or '5m' not in tv_data:
             print("Could not fetch TradingView data")
             return
+        self.recorder.begin_cycle()
+        self.recorder.record('tv_data', tv_data)
+        self.history.append_cycle(tv_data)
             
         # Analyze volume patterns
         print("2. Analyzing volume patterns...")
-        volume_analysis = self.analyze_volume(tv_data)
+        with span("volume_analysis"):
+            volume_analysis = self.analyze_volume(tv_data)
         
         # Analyze indicators
         print("3. Analyzing indicators across timeframes...")
-        analysis = self.analyze_indicators(tv_data)
+        with span("indicator_scoring"):
+            analysis = self.analyze_indicators(tv_data)
         if not analysis:
             print("Could not generate analysis")
             return
@@ -739,12 +621,9 @@ Provide:
             
         # Get options chain analysis
         print("4. Analyzing options chain...")
-        options_data = self.analyze_options_chain(tv_data['5m']['close'], analysis['bias'])
+        with span("options_analysis"):
+            options_data = self.analyze_options_chain(tv_data['5m']['close'], analysis['bias'])
         
-        # Get AI-powered analysis
-        print("5. Getting AI analysis...")
-        ai_analysis = self.get_ai_analysis(tv_data, analysis, volume_analysis, options_data)
-            
         bias = analysis['bias']
         current_price = tv_data['5m']['close']
         
@@ -807,8 +686,7 @@ Provide:
             detailed_analysis = self.generate_detailed_analysis(tv_data, analysis, volume_analysis)
             alert_message = self.format_trade_alert("bullish", current_price, entry, stop_loss, target, analysis, data_5m)
             
-            # Analyze options chain
-            options_data = self.analyze_options_chain(current_price, bias)
+            # Options chain from step 4
             if options_data:
                 print("\nOptions Analysis:")
                 if options_data['CE']:
@@ -816,12 +694,6 @@ Provide:
                 if options_data['PE']:
                     print(f"Put Option - Strike: {options_data['PE']['strike']} Price: {options_data['PE']['price']}")
             
-            # Get AI analysis
-            ai_analysis = self.get_ai_analysis(tv_data, analysis, volume_analysis, options_data)
-            if ai_analysis:
-                print("\nAI-Powered Analysis:")
-                print(ai_analysis)
-            
             # Send messages to both platforms
             self.send_whatsapp_message(alert_message)
             self.send_whatsapp_message(detailed_analysis)
@@ -844,8 +716,7 @@ Provide:
             detailed_analysis = self.generate_detailed_analysis(tv_data, analysis, volume_analysis)
             alert_message = self.format_trade_alert("bearish", current_price, entry, stop_loss, target, analysis, data_5m)
             
-            # Analyze options chain
-            options_data = self.analyze_options_chain(current_price, bias)
+            # Options chain from step 4
             if options_data:
                 print("\nOptions Analysis:")
                 if options_data['CE']:
@@ -853,17 +724,16 @@ Provide:
                 if options_data['PE']:
                     print(f"Put Option - Strike: {options_data['PE']['strike']} Price: {options_data['PE']['price']}")
             
-            # Get AI analysis
-            ai_analysis = self.get_ai_analysis(tv_data, analysis, volume_analysis, options_data)
-            if ai_analysis:
-                print("\nAI-Powered Analysis:")
-                print(ai_analysis)
-            
             # Send messages to both platforms
             self.send_whatsapp_message(alert_message)
             self.send_whatsapp_message(detailed_analysis)
             self.send_telegram_message(alert_message)
             self.send_telegram_message(detailed_analysis)
+        
+        # AI commentary runs in the background; requested only now so that even a cached
+        # answer (delivered at once) is queued behind the alert it follows
+        print("\n5. Requesting AI analysis...")
+        self.request_ai_analysis(tv_data, analysis, volume_analysis, options_data)
             
         print("\nConfirmation Checklist:")
         print("1. Price vs VWAP & EMA alignment")
@@ -884,55 +754,33 @@ if __name__ == "__main__":
     try:
         print("🚀 Starting Nifty Trading System...")
         print("📱 Alerts will be sent via WhatsApp and Telegram")
-        print("⚡ Running analysis every 30 seconds")
+        print("⚡ Running analysis after every 5-minute candle close")
         print("📊 Minimum alert score:", MIN_TRADE_SCORE)
+        print_capabilities()
         print("\nInitializing system...")
         
         system = TradingSystem()
-        last_alert_time = None
-        MIN_ALERT_INTERVAL = 300  # Minimum 5 minutes between alerts
+        start_metrics_server()
+        start_summary_reporter()
         
-        while True:
-            try:
-                current_time = datetime.now()
-                
-                # Check if market is open (9:15 AM to 3:30 PM, Monday to Friday)
-                if current_time.weekday() >= 5:  # Weekend
-                    print("Market closed (Weekend)")
-                    sleep(3600)  # Sleep for an hour
-                    continue
-                    
-                if current_time.hour < 9 or (current_time.hour == 9 and current_time.minute < 15):
-                    print("Waiting for market open...")
-                    sleep(60)  # Sleep for a minute
-                    continue
-                    
-                if current_time.hour > 15 or (current_time.hour == 15 and current_time.minute >= 30):
-                    print("Market closed for the day")
-                    sleep(3600)  # Sleep for an hour
-                    continue
-                
-                # Check if enough time has passed since last alert
-                if last_alert_time and (current_time - last_alert_time).total_seconds() < MIN_ALERT_INTERVAL:
-                    sleep(30)  # Wait 30 seconds before next check
-                    continue
-                
-                # Generate and send trade plan
-                system.generate_trade_plan()
-                last_alert_time = current_time
-                
-                # Wait for 30 seconds before next analysis
-                print("\nWaiting 30 seconds for next analysis...")
-                print("Press Ctrl+C to stop the system")
-                sleep(30)
-                
-            except KeyboardInterrupt:
-                print("\n\n🛑 Stopping the system...")
-                break
-            except Exception as e:
-                print(f"\nError in main loop: {str(e)}")
-                print("Retrying in 30 seconds...")
-                sleep(30)
+        print("Press Ctrl+C to stop the system")
+        try:
+            if TICK_FEED_URL:
+                # Bars are built from the tick feed; analysis runs the moment a 5m bar closes
+                stream = system.tv_session.start_stream(lambda event: system.generate_trade_plan(), intervals=["5m"])
+                try:
+                    stream.join()
+                finally:
+                    stream.stop()
+            else:
+                # Wakes at each 5m bar close on NSE trading days (holidays and special sessions included).
+                # Without Yahoo's completed bars the plan is built from TradingView's forming candle,
+                # which is sampled just before the close rather than just after it
+                scheduler = BarScheduler() if available('yfinance') else BarScheduler(settle_delay=-SCHEDULER_PRE_CLOSE)
+                scheduler.add_job("Trade plan", system.generate_trade_plan, "5m")
+                scheduler.run()
+        except KeyboardInterrupt:
+            print("\n\n🛑 Stopping the system...")
                 
         print("System stopped successfully!")
         
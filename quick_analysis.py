@@ -2,82 +2,54 @@ from tradingview_ta import TA_Handler, Interval
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import requests
+from src.data_collectors.option_chain import fetch_option_chain
+from src.analysis.options import suggest_by_delta
+from src.analysis.rules import get_rule_set, analysis_fields
 
 def get_nifty_option_chain():
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'
-        }
-        url = "https://www.nseindia.com/api/option-chain-indices?symbol=NIFTY"
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return response.json()
-        return None
+        return fetch_option_chain("NIFTY")
     except Exception as e:
         print(f"Error fetching option chain: {str(e)}")
         return None
 
-def suggest_option_trade(current_price, bias, strength):
-    # Round to nearest 50 for strike selection
-    atm_strike = round(current_price / 50) * 50
-    
+def suggest_option_trade(current_price, bias, strength, option_chain=None):
+    # Strikes by delta: ~0.50 to buy, ~0.25 to sell against it in a spread
     if bias == "BUY":
         trade_type = "CALL"
-        entry_strike = atm_strike
-        hedge_strike = atm_strike + 200
+        strikes = suggest_by_delta('CE', current_price, chain=option_chain)
     elif bias == "SELL":
         trade_type = "PUT"
-        entry_strike = atm_strike
-        hedge_strike = atm_strike - 200
+        strikes = suggest_by_delta('PE', current_price, chain=option_chain)
     else:
         return None
+    entry_strike = strikes['primary_strike']
+    hedge_strike = strikes['hedge_strike']
     
     # Strategy based on strength
     if strength >= 3:  # Strong trend
         strategy = "Simple Options Buy"
-        suggestion = f"{trade_type} option at strike {entry_strike}"
+        suggestion = f"{trade_type} option at strike {entry_strike:.0f} (delta {strikes['primary_delta']:.2f})"
     else:  # Moderate trend
         strategy = "Bull/Bear Spread"
-        if trade_type == "CALL":
-            suggestion = f"Buy {entry_strike} CALL & Sell {hedge_strike} CALL"
-        else:
-            suggestion = f"Buy {entry_strike} PUT & Sell {hedge_strike} PUT"
+        suggestion = (f"Buy {entry_strike:.0f} {trade_type} (delta {strikes['primary_delta']:.2f}) & "
+                      f"Sell {hedge_strike:.0f} {trade_type} (delta {strikes['hedge_delta']:.2f})")
     
     return {
         'strategy': strategy,
         'suggestion': suggestion,
         'primary_strike': entry_strike,
         'hedge_strike': hedge_strike,
+        'primary_delta': strikes['primary_delta'],
+        'hedge_delta': strikes['hedge_delta'],
+        'premium': strikes['primary_price'],
+        'expiry': strikes['expiry'],
         'trade_type': trade_type
     }
 
 def calculate_signal_strength(analysis):
-    strength = 0
-    
-    # RSI Analysis
-    rsi = analysis.indicators['RSI']
-    if (rsi > 60 and analysis.summary['RECOMMENDATION'] in ['BUY', 'STRONG_BUY']) or \
-       (rsi < 40 and analysis.summary['RECOMMENDATION'] in ['SELL', 'STRONG_SELL']):
-        strength += 1
-    
-    # MACD Analysis
-    macd = analysis.indicators['MACD.macd']
-    signal = analysis.indicators['MACD.signal']
-    if (macd > signal and analysis.summary['RECOMMENDATION'] in ['BUY', 'STRONG_BUY']) or \
-       (macd < signal and analysis.summary['RECOMMENDATION'] in ['SELL', 'STRONG_SELL']):
-        strength += 1
-    
-    # Moving Averages
-    if analysis.moving_averages['RECOMMENDATION'] == analysis.summary['RECOMMENDATION']:
-        strength += 1
-    
-    # Oscillators
-    if analysis.oscillators['RECOMMENDATION'] == analysis.summary['RECOMMENDATION']:
-        strength += 1
-    
-    return strength
+    # Indicators and sub-ratings agreeing with the summary ('confluence' rules in src/config.py)
+    return int(get_rule_set('confluence').evaluate(analysis_fields(analysis))['strength'])
 
 def main():
     try:
@@ -130,26 +102,26 @@ def main():
         print(f"Signal Strength: {signal_strength}/4 (Higher is stronger)")
         
         if signal_strength >= 2:  # Only suggest trades if signal strength is moderate to strong
+            # Option Chain Analysis
+            print("\nFetching Option Chain data...")
+            option_chain = get_nifty_option_chain()
+            if option_chain is None:
+                print("Unable to fetch live option chain - strikes are estimated from model deltas")
+
             trade_suggestion = suggest_option_trade(
                 current_price=current_price,
                 bias=analysis.summary['RECOMMENDATION'],
-                strength=signal_strength
+                strength=signal_strength,
+                option_chain=option_chain
             )
             
             if trade_suggestion:
                 print(f"\nRECOMMENDED STRATEGY: {trade_suggestion['strategy']}")
                 print(f"TRADE SUGGESTION: {trade_suggestion['suggestion']}")
+                print(f"Premium: ₹{trade_suggestion['premium']:.2f} (expiry {trade_suggestion['expiry']})")
                 print("\nRISK MANAGEMENT:")
                 print(f"Stop Loss: Place stop loss at 30-40% of option premium")
                 print(f"Target: Book profits at 60-80% of option premium")
-                
-                # Option Chain Analysis
-                print("\nFetching Option Chain data...")
-                option_chain = get_nifty_option_chain()
-                if option_chain:
-                    print("Option Chain data available - Validate premiums before entry")
-                else:
-                    print("Unable to fetch live option chain - Check NSE website for current premiums")
             else:
                 print("\nNo clear option trade setup at current levels")
         else:
@@ -0,0 +1,155 @@
+"""
+Replay recorded analysis inputs offline, as fast as the CPU allows.
+
+Feeds every cycle of a SnapshotRecorder segment (data/recordings/YYYY-MM-DD.rec)
+back through the same code the live loops run - TradingSystem.analyze_volume,
+analyze_indicators, should_alert and the options analysis for nifty_trader
+cycles, the per-timeframe technical analysis and TradePlanGenerator for
+src/main.py cycles - with no network access and no alerts sent.
+
+    python replay.py data/recordings/2026-10-16.rec
+    python replay.py data/recordings/2026-10-16.rec --output today.jsonl   # diff two runs for regressions
+    python replay.py data/recordings/2026-10-16.rec --profile --repeat 10
+"""
+import argparse
+import cProfile
+import json
+import pstats
+import time
+from src.data_collectors.recorder import SnapshotReader
+from src.data_collectors.snapshots import SnapshotHistory
+
+
+def replay_tv_cycle(system, inputs):
+    """nifty_trader's generate_trade_plan decisions for one recorded cycle"""
+    tv_data = inputs['tv_data']
+    system.history.append_cycle(tv_data)  # as the live loop does, so lookbacks see the earlier cycles
+    volume_analysis = system.analyze_volume(tv_data)
+    analysis = system.analyze_indicators(tv_data)
+    if not analysis:
+        return None
+    alert = bool(system.should_alert(analysis, volume_analysis))
+    result = {
+        'price': tv_data['5m']['close'],
+        'bias': analysis['bias'],
+        'strength': analysis['strength'],
+        'trend_strength': analysis['trend_strength'],
+        'reasons': analysis['reasons'],
+        'volume_pressure': volume_analysis['pressure'] if volume_analysis else None,
+        'alert': alert
+    }
+    # The live loop only fetches the chain for alerts; a failed fetch was recorded as None
+    if alert and inputs.get('option_chain') is not None:
+        result['options'] = system.analyze_options_chain(tv_data['5m']['close'], analysis['bias'],
+                                                         chain=inputs['option_chain'])
+    return result
+
+
+def replay_main_cycle(technical_analyzer, trade_planner, inputs):
+    """src/main.py's trade plan for one recorded cycle"""
+    from src.main import build_technical_data
+    market_data = inputs['market_data']
+    if market_data is None:
+        return None
+    technical_data = build_technical_data(technical_analyzer, market_data)
+    trade_plan = trade_planner.generate_trade_plan(
+        market_data["5m"]['data'],
+        technical_data,
+        inputs.get('institutional_data'),
+        inputs.get('option_data'),
+        inputs.get('global_data')
+    )
+    return {
+        'price': market_data["5m"]['data']['Close'].iloc[-1],
+        'market_bias': trade_plan['market_bias'],
+        'setups': trade_plan['setups'],
+        'strengths': {interval: {'trend': data['trend']['strength'], 'momentum': data['momentum']['strength']}
+                      for interval, data in technical_data.items()}
+    }
+
+
+class Replayer:
+    """Builds the analysis objects once and replays recorded cycles through them"""
+
+    def __init__(self):
+        self._system = None
+        self._planner = None
+
+    @property
+    def system(self):
+        if self._system is None:
+            from nifty_trader import TradingSystem
+            # Only the analysis methods are used: skip the TradingView session, alert channels and NSE session
+            self._system = TradingSystem.__new__(TradingSystem)
+            self._system.recorder = None
+            self._system.history = SnapshotHistory()
+        return self._system
+
+    @property
+    def planner(self):
+        if self._planner is None:
+            from src.analysis.technical import TechnicalAnalyzer
+            from src.analysis.trade_plan import TradePlanGenerator
+            self._planner = (TechnicalAnalyzer(), TradePlanGenerator())
+        return self._planner
+
+    def run(self, cycles):
+        # Each pass starts without lookback history, like a fresh live session
+        if self._system is not None:
+            self._system.history = SnapshotHistory()
+        results = []
+        for timestamp, inputs in cycles:
+            if 'tv_data' in inputs:
+                result = replay_tv_cycle(self.system, inputs)
+            elif 'market_data' in inputs:
+                result = replay_main_cycle(*self.planner, inputs)
+            else:
+                continue
+            results.append({'timestamp': timestamp.isoformat(), 'result': result})
+        return results
+
+
+def _json_default(value):
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded trading session offline")
+    parser.add_argument('recording', help="segment written by SnapshotRecorder (data/recordings/*.rec)")
+    parser.add_argument('--output', help="write one JSON line per cycle (compare runs with diff)")
+    parser.add_argument('--repeat', type=int, default=1, help="replay the session this many times")
+    parser.add_argument('--profile', action='store_true', help="print the hottest functions")
+    args = parser.parse_args()
+
+    cycles = list(SnapshotReader(args.recording).cycles())
+    print(f"Loaded {len(cycles)} cycles from {args.recording}")
+
+    replayer = Replayer()
+    profiler = cProfile.Profile() if args.profile else None
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    for _ in range(args.repeat):
+        results = replayer.run(cycles)
+    if profiler:
+        profiler.disable()
+    elapsed = time.perf_counter() - start
+
+    runs = len(cycles) * args.repeat
+    print(f"Replayed {runs} cycles in {elapsed:.3f}s ({elapsed / max(runs, 1) * 1000:.2f} ms per cycle)")
+    alerts = sum(1 for item in results if item['result'] and item['result'].get('alert'))
+    if alerts:
+        print(f"Alerts: {alerts}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            for item in results:
+                f.write(json.dumps(item, default=_json_default) + "\n")
+        print(f"Results written to {args.output}")
+
+    if profiler:
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
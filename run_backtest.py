@@ -0,0 +1,38 @@
+from src.analysis.technical import TechnicalAnalyzer
+from src.analysis.backtest import Backtester
+import sys
+
+def main():
+    interval = sys.argv[1] if len(sys.argv) > 1 else '5m'
+    period = sys.argv[2] if len(sys.argv) > 2 else '1mo'
+
+    print(f"Backtesting NIFTY {interval} bars over {period}...")
+
+    try:
+        # Served from the local bar store when it already covers the period
+        df = TechnicalAnalyzer().fetch_nifty_data(interval=interval, period=period)
+        if df is None:
+            print("Failed to fetch NIFTY data")
+            return
+
+        result = Backtester().run(df)
+        metrics = result['metrics']
+
+        print(f"\nBars: {len(df)}")
+        print(f"Signals: {metrics['signals']}")
+        print(f"Trades: {metrics['trades']}")
+        print(f"Hit Rate: {metrics['hit_rate'] * 100:.1f}%")
+        print(f"Total P&L: {metrics['total_pnl']:.2f} points")
+        print(f"Average P&L: {metrics['avg_pnl']:.2f} points")
+        print(f"Max Drawdown: {metrics['max_drawdown']:.2f} points")
+        print(f"Profit Factor: {metrics['profit_factor']:.2f}")
+
+        if len(result['trades']):
+            print("\nLast trades:")
+            print(result['trades'].tail(10).to_string(index=False))
+
+    except Exception as e:
+        print(f"Error during backtest: {str(e)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,51 @@
 from src.analysis.technical import TechnicalAnalyzer
-import pandas_ta as ta
+from src.analysis.streaming import IndicatorEngine
+from src import config
 import time
 import pandas as pd
 
-def prepare_data(df):
-    """Add technical indicators to the dataframe"""
+# Indicator state kept between main() runs in one process, so each run only processes new bars
+_engine = None
+
+def prepare_data(df, engine=None):
+    """
+    Add technical indicators to the dataframe.
+    Pass the same IndicatorEngine on every cycle so only bars newer than the
+    previous call are processed instead of the whole history.
+    """
     if df is None or len(df) == 0:
         return None
         
-    # Calculate RSI
-    df['RSI'] = ta.rsi(df['Close'], length=14)
-    
-    # Calculate MACD
-    macd = ta.macd(df['Close'])
-    df['MACD'] = macd['MACD_12_26_9']
-    df['MACD_Signal'] = macd['MACDs_12_26_9']
+    if engine is None:
+        engine = IndicatorEngine(history=len(df))
+    indicators = engine.update_frame(df)
     
-    # Calculate ADX
-    adx = ta.adx(df['High'], df['Low'], df['Close'])
-    df['ADX'] = adx['ADX_14']
+    # RSI, MACD, ADX and session VWAP
+    for column in ['RSI', 'MACD', 'MACD_Signal', 'ADX', 'VWAP']:
+        df[column] = indicators[column]
     
     return df
 
 def main():
+    global _engine
     analyzer = TechnicalAnalyzer()
     
     print("Starting NIFTY Analysis...")
     
     try:
-        # Fetch market data
-        df = analyzer.fetch_nifty_data(interval='5m', period='1d')
+        # Fetch completed bars only: the engine commits every bar it is given
+        df = analyzer.fetch_completed_bars(interval='5m')
         if df is None:
             print("Failed to fetch NIFTY data")
             return
             
-        # Add technical indicators
-        df = prepare_data(df)
+        # Add technical indicators (VWAP included)
+        if _engine is None:
+            _engine = IndicatorEngine(history=config.RESAMPLE_WARMUP_BARS)
+        df = prepare_data(df, engine=_engine)
         if df is None:
             print("Failed to prepare data")
             return
-            
-        # Calculate VWAP
-        df = analyzer.calculate_vwap(df)
         
         # Check for signals and send alerts
         analysis = analyzer.check_and_send_alerts(df)
@@ -2,10 +2,11 @@ from tradingview_ta import TA_Handler, Interval
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import time
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from src.alerts.dispatcher import get_dispatcher
+from src.alerts.channels import SMTPChannel
+from src.scheduling.scheduler import BarScheduler
+from src.config import SCHEDULER_PRE_CLOSE
+from src.analysis.rules import get_rule_set, analysis_fields
 
 # Email configuration
 EMAIL_CONFIG = {
@@ -18,20 +19,12 @@ EMAIL_CONFIG = {
 
 def send_alert(subject, body):
     try:
-        msg = MIMEMultipart()
-        msg['From'] = EMAIL_CONFIG['sender_email']
-        msg['To'] = ', '.join(EMAIL_CONFIG['recipients'])
-        msg['Subject'] = f"NIFTY Alert: {subject}"
+        dispatcher = get_dispatcher()
+        dispatcher.ensure_channel('email', lambda: SMTPChannel.from_config(EMAIL_CONFIG))
+        if not dispatcher.send('email', f"NIFTY Alert: {subject}", body):
+            return False
         
-        msg.attach(MIMEText(body, 'plain'))
-        
-        server = smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port'])
-        server.starttls()
-        server.login(EMAIL_CONFIG['sender_email'], EMAIL_CONFIG['sender_password'])
-        server.send_message(msg)
-        server.quit()
-        
-        print("Alert email sent successfully!")
+        print("Alert email queued")
         return True
         
     except Exception as e:
@@ -63,35 +56,10 @@ def generate_trading_signals():
         # Calculate nearest strike price
         atm_strike = round(current_price / 50) * 50
         
-        # Determine trend and strength
-        trend = "NEUTRAL"
-        strength = 0
-        
-        # RSI Analysis (0-100)
-        if rsi > 60:
-            trend = "BULLISH"
-            strength += 2
-        elif rsi < 40:
-            trend = "BEARISH"
-            strength += 2
-        
-        # MACD Analysis
-        if macd > macd_signal:
-            if trend == "BULLISH":
-                strength += 2
-            elif trend == "NEUTRAL":
-                trend = "BULLISH"
-                strength += 1
-        elif macd < macd_signal:
-            if trend == "BEARISH":
-                strength += 2
-            elif trend == "NEUTRAL":
-                trend = "BEARISH"
-                strength += 1
-        
-        # ADX Strength (0-100)
-        if adx > 25:
-            strength += 1
+        # Trend and strength from the 'rsi_macd_adx' rule set in src/config.py
+        result = get_rule_set('rsi_macd_adx').evaluate(analysis_fields(analysis))
+        trend = {1: "BULLISH", -1: "BEARISH", 0: "NEUTRAL"}[int(np.sign(result['direction']))]
+        strength = int(result['strength'])
         
         # Print analysis
         print(f"\nCurrent Price: ₹{current_price:.2f}")
@@ -174,18 +142,14 @@ def generate_trading_signals():
         print(f"\nError during analysis: {str(e)}")
 
 def main():
-    while True:
-        try:
-            generate_trading_signals()
-            print("\nWaiting 5 minutes before next analysis...")
-            time.sleep(300)  # Wait 5 minutes
-        except KeyboardInterrupt:
-            print("\nAnalysis stopped by user")
-            break
-        except Exception as e:
-            print(f"\nError in main loop: {str(e)}")
-            print("Retrying in 30 seconds...")
-            time.sleep(30)
+    # Analyse just before each 5-minute candle closes, on NSE trading days only: TradingView's
+    # snapshot is the forming candle, which just after the close would be the next one
+    scheduler = BarScheduler(settle_delay=-SCHEDULER_PRE_CLOSE)
+    scheduler.add_job("Signal analysis", generate_trading_signals, "5m")
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        print("\nAnalysis stopped by user")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,32 @@
+from src.analysis.technical import TechnicalAnalyzer
+from src.analysis.optimizer import ParameterOptimizer
+import sys
+
+def main():
+    interval = sys.argv[1] if len(sys.argv) > 1 else '5m'
+    period = sys.argv[2] if len(sys.argv) > 2 else '1mo'
+    search = sys.argv[3] if len(sys.argv) > 3 else 'grid'
+
+    print(f"Optimizing NIFTY {interval} rules over {period} ({search} search)...")
+
+    try:
+        df = TechnicalAnalyzer().fetch_nifty_data(interval=interval, period=period)
+        if df is None:
+            print("Failed to fetch NIFTY data")
+            return
+
+        optimizer = ParameterOptimizer(search=search)
+        results = optimizer.run(df)
+
+        print(f"\nTrials: {len(results)}")
+        print("\nTop parameter sets (ranked by out-of-sample P&L):")
+        print(results.head(20).to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+
+        results.to_csv('optimizer_results.csv', index=False)
+        print("\nFull table written to optimizer_results.csv")
+
+    except Exception as e:
+        print(f"Error during optimization: {str(e)}")
+
+if __name__ == "__main__":
+    main()
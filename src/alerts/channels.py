@@ -0,0 +1,117 @@
+import smtplib
+import time
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from ..capabilities import require
+
+__all__ = ['SMTPChannel', 'WhatsAppChannel', 'TelegramChannel']
+
+
+class SMTPChannel:
+    """
+    Email channel that keeps one SMTP connection open between messages.
+
+    The connection (and STARTTLS/login) is set up on the first send and reused
+    afterwards; after `idle_check` seconds without traffic it is probed with
+    NOOP, and a dropped connection is re-opened once before the send fails.
+    Only the dispatcher's worker thread for this channel should call send().
+    """
+
+    def __init__(self, smtp_server, smtp_port, sender_email, recipients, sender_password=None,
+                 use_tls=True, subject_prefix=None, timeout=30, idle_check=60):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.recipients = recipients
+        self.use_tls = use_tls
+        self.subject_prefix = subject_prefix
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self.server = None
+        self.last_used = 0.0
+
+    @classmethod
+    def from_config(cls, email_config, **kwargs):
+        """Build from an EMAIL_CONFIG dict (smtp_server, smtp_port, sender_email, sender_password, recipients)"""
+        return cls(email_config['smtp_server'], email_config['smtp_port'], email_config['sender_email'],
+                   email_config['recipients'], sender_password=email_config.get('sender_password'), **kwargs)
+
+    def _connect(self):
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.sender_password:
+            server.login(self.sender_email, self.sender_password)
+        self.server = server
+
+    def _connection(self):
+        if self.server is not None and time.monotonic() - self.last_used > self.idle_check:
+            try:
+                if self.server.noop()[0] != 250:
+                    self.close()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self.server is None:
+            self._connect()
+        return self.server
+
+    def send(self, subject, body):
+        msg = MIMEMultipart()
+        msg['From'] = self.sender_email
+        msg['To'] = ', '.join(self.recipients)
+        msg['Subject'] = f"{self.subject_prefix}: {subject}" if self.subject_prefix else subject
+        msg.attach(MIMEText(body, 'plain'))
+
+        try:
+            self._connection().send_message(msg)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            # The server closed an idle connection; reconnect once and retry
+            self.close()
+            self._connection().send_message(msg)
+        self.last_used = time.monotonic()
+
+    def close(self):
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            pass
+        self.server = None
+
+
+class WhatsAppChannel:
+    """WhatsApp Web messages through pywhatkit (blocks for `wait_time` seconds per message)"""
+
+    def __init__(self, number, wait_time=15):
+        self.phone = number.replace("+", "")
+        self.wait_time = wait_time
+
+    def send(self, subject, body):
+        pwk = require('whatsapp')
+
+        text = f"{subject}\n\n{body}" if subject else body
+        pwk.sendwhatmsg_instantly(
+            self.phone,
+            text,
+            wait_time=self.wait_time,  # Give browser time to load
+            tab_close=True  # Automatically close tab after sending
+        )
+
+    def close(self):
+        pass
+
+
+class TelegramChannel:
+    """Placeholder for Telegram messaging (disabled)"""
+
+    def __init__(self, token=None, chat_id=None):
+        self.token = token
+        self.chat_id = chat_id
+
+    def send(self, subject, body):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,193 @@
+import atexit
+import queue
+import threading
+import time
+from collections import deque
+import numpy as np
+from .. import config
+from ..monitoring.metrics import span, get_metrics
+
+__all__ = ['AlertDispatcher', 'get_dispatcher']
+
+MERGE_SEPARATOR = "\n\n" + "-" * 40 + "\n\n"
+
+
+class _ChannelWorker:
+    """Bounded queue plus the thread that drains it into one channel"""
+
+    def __init__(self, name, channel, max_queue, coalesce_window, history):
+        self.name = name
+        self.channel = channel
+        self.coalesce_window = coalesce_window
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.latencies = deque(maxlen=history)  # enqueue -> delivered, seconds
+        self.lock = threading.Lock()
+        self.counts = {'enqueued': 0, 'dropped': 0, 'delivered': 0, 'merged': 0, 'failed': 0}
+        self.thread = threading.Thread(target=self._run, name=f"alerts-{name}", daemon=True)
+        self.thread.start()
+
+    def _count(self, key, n=1):
+        with self.lock:
+            self.counts[key] += n
+
+    def _next_batch(self):
+        """Block for one alert, then collect whatever else arrives within the coalesce window"""
+        batch = [self.queue.get()]
+        if batch[0] is None:
+            return batch
+        deadline = time.monotonic() + self.coalesce_window
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                return batch
+            batch.append(item)
+            if item is None:
+                return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is None
+            alerts = [item for item in batch if item is not None]
+            if alerts:
+                self._deliver(alerts)
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                self.channel.close()
+                return
+
+    def _deliver(self, alerts):
+        if len(alerts) == 1:
+            subject, body = alerts[0][1], alerts[0][2]
+        else:
+            # Channels that queue without a subject (WhatsApp, Telegram) keep sending none
+            subject = f"{alerts[0][1]} (+{len(alerts) - 1} more)" if alerts[0][1] else None
+            body = MERGE_SEPARATOR.join(f"{s}\n\n{b}" if s else b for _, s, b in alerts)
+        with span(f"notify_{self.name}") as timer:
+            try:
+                self.channel.send(subject, body)
+            except Exception as e:
+                timer.fail()
+                self._count('failed', len(alerts))
+                print(f"Failed to send {self.name} alert: {str(e)}")
+                return
+
+        now = time.monotonic()
+        with self.lock:
+            self.counts['delivered'] += 1
+            self.counts['merged'] += len(alerts) - 1
+            self.latencies.extend(now - queued_at for queued_at, _, _ in alerts)
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counts)
+            latencies = np.array(self.latencies)
+        stats['queued'] = self.queue.qsize()
+        if len(latencies):
+            stats.update({
+                'latency_mean': float(latencies.mean()),
+                'latency_p50': float(np.percentile(latencies, 50)),
+                'latency_p95': float(np.percentile(latencies, 95)),
+                'latency_max': float(latencies.max())
+            })
+        return stats
+
+
+class AlertDispatcher:
+    """
+    Non-blocking outbound alerts.
+
+    Each registered channel gets its own bounded queue and worker thread, so
+    send() only costs an enqueue and a slow channel (WhatsApp Web, SMTP
+    login) never holds up the trading loop or the other channels. Alerts that
+    arrive while a channel is busy, or within `coalesce_window` seconds of each
+    other, go out as one merged message. When a queue is full the new alert
+    is dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(self, max_queue=None, coalesce_window=None, history=1000):
+        self.max_queue = max_queue or config.ALERT_QUEUE_SIZE
+        self.coalesce_window = config.ALERT_COALESCE_WINDOW if coalesce_window is None else coalesce_window
+        self.history = history
+        self.workers = {}
+        self.lock = threading.Lock()
+
+    def _register(self, name, channel):
+        """Start a worker for the channel and return the one it replaces (caller holds self.lock)"""
+        previous = self.workers.get(name)
+        self.workers[name] = _ChannelWorker(name, channel, self.max_queue, self.coalesce_window, self.history)
+        return previous
+
+    def register(self, name, channel):
+        """Attach a channel (any object with send(subject, body) and close()); replaces one with the same name"""
+        with self.lock:
+            previous = self._register(name, channel)
+        if previous is not None:
+            previous.queue.put(None)
+
+    def ensure_channel(self, name, factory):
+        """Register factory() under name unless a channel with that name already exists"""
+        with self.lock:
+            # Check and register under one lock so concurrent callers create a single channel
+            if name not in self.workers:
+                self._register(name, factory())
+
+    def has_channel(self, name):
+        return name in self.workers
+
+    def send(self, name, subject, body):
+        """Queue an alert for a channel; returns False if it had to be dropped"""
+        worker = self.workers.get(name)
+        if worker is None:
+            print(f"No alert channel registered as '{name}'")
+            return False
+        try:
+            worker.queue.put_nowait((time.monotonic(), subject, body))
+        except queue.Full:
+            worker._count('dropped')
+            return False
+        worker._count('enqueued')
+        return True
+
+    def flush(self, timeout=None):
+        """Wait until every queued alert has been handled (or timeout seconds pass); returns True if drained"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in list(self.workers.values()):
+            while worker.queue.unfinished_tasks:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.01)
+        return True
+
+    def close(self, timeout=None):
+        """Deliver what is queued, then stop the workers and close their connections"""
+        with self.lock:
+            workers = list(self.workers.values())
+            self.workers = {}
+        for worker in workers:
+            worker.queue.put(None)
+        for worker in workers:
+            worker.thread.join(timeout)
+
+    def stats(self):
+        """Per-channel counters and delivery latency (seconds from send() to the channel accepting it)"""
+        return {name: worker.stats() for name, worker in list(self.workers.items())}
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """Return the process-wide dispatcher; queued alerts are flushed at exit and its stats go to the metrics"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = AlertDispatcher()
+            atexit.register(_dispatcher.close, config.ALERT_FLUSH_TIMEOUT)
+            get_metrics().add_collector('alerts', _dispatcher.stats, label='channel',
+                                        summary=('delivered', 'dropped', 'failed', 'latency_p95'))
+        return _dispatcher
@@ -0,0 +1,105 @@
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+
+__all__ = ['SMTPSink']
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP (HELO/EHLO, MAIL, RCPT, DATA, NOOP, RSET, QUIT) for smtplib"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        sink = self.server.sink
+        sink._count('connections')
+        self.reply("220 localhost SMTP sink ready")
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip()
+            verb = command[:4].upper()
+
+            if verb in ('HELO', 'EHLO'):
+                self.reply("250 localhost")
+            elif verb == 'MAIL':
+                sender, recipients = command.split(':', 1)[1].strip(), []
+                self.reply("250 OK")
+            elif verb == 'RCPT':
+                recipients.append(command.split(':', 1)[1].strip())
+                self.reply("250 OK")
+            elif verb == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b".\r\n", b".\n"):
+                        break
+                    lines.append(data[1:] if data.startswith(b"..") else data)
+                if sink.delay:
+                    time.sleep(sink.delay)
+                sink._store(sender, recipients, message_from_bytes(b"".join(lines)))
+                self.reply("250 OK")
+            elif verb in ('NOOP', 'RSET'):
+                self.reply("250 OK")
+            elif verb == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SMTPSink:
+    """
+    Local stand-in SMTP server that keeps received messages in memory.
+
+    Point an SMTPChannel at it with use_tls=False and no password to exercise
+    the alert path without a real mail server:
+
+        with SMTPSink() as sink:
+            channel = SMTPChannel(sink.host, sink.port, "bot@localhost", ["me@localhost"], use_tls=False)
+
+    `delay` adds a per-message pause to simulate a slow server.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0):
+        self.delay = delay
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.server = _Server((host, port), _SMTPHandler)
+        self.server.sink = self
+        self.host, self.port = self.server.server_address[:2]
+        self.thread = None
+
+    def _count(self, key):
+        with self.lock:
+            setattr(self, key, getattr(self, key) + 1)
+
+    def _store(self, sender, recipients, message):
+        with self.lock:
+            self.messages.append({'from': sender, 'to': recipients, 'message': message})
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="smtp-sink", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
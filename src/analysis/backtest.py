@@ -0,0 +1,227 @@
+import numpy as np
+import pandas as pd
+from .streaming import compute_indicators
+from .candlesticks import detect_patterns, BULLISH, BEARISH
+
+__all__ = ['Backtester', 'prepare_arrays']
+
+ARRAY_COLUMNS = {
+    'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close',
+    'vwap': 'VWAP', 'rsi': 'RSI', 'adx': 'ADX', 'macd': 'MACD', 'macd_signal': 'MACD_Signal'
+}
+
+
+def prepare_arrays(data):
+    """
+    Turn an OHLCV DataFrame into the float64 arrays the backtester works on.
+    Missing VWAP/RSI/ADX/MACD columns are computed with compute_indicators.
+    """
+    missing = [column for column in ARRAY_COLUMNS.values() if column not in data.columns]
+    if missing:
+        indicators = compute_indicators(data)
+        data = data.assign(**{column: indicators[column] for column in missing})
+
+    arrays = {name: data[column].to_numpy(dtype=np.float64) for name, column in ARRAY_COLUMNS.items()}
+
+    # Session number per bar so trades can be flattened at the close
+    if isinstance(data.index, pd.DatetimeIndex):
+        days = data.index.normalize().asi8
+        arrays['session'] = np.concatenate([[0], np.cumsum(days[1:] != days[:-1])]).astype(np.float64)
+    else:
+        arrays['session'] = np.zeros(len(data))
+    return arrays
+
+
+class Backtester:
+    """
+    Vectorized backtest of the TechnicalAnalyzer trend/momentum rules.
+
+    Trend and momentum follow identify_trend / validate_momentum, a signal fires
+    where both agree with trend strength >= min_strength (as in
+    check_and_send_alerts), and trades use the primary setup from
+    TradePlanGenerator._generate_setups: a limit entry at support_1 /
+    resistance_1, stop at support_2 / resistance_2 and target at
+    min_rr_ratio times the risk from the signal price.
+    """
+
+    def __init__(self, rsi_upper=60, rsi_lower=40, adx_threshold=25, min_strength=3,
+                 min_rr_ratio=1.5, entry_offset=0.005, stop_offset=0.01,
+                 entry_window=6, max_hold=75, flatten_at_session_end=True, pattern_confirmation=False,
+                 chunk_size=20000):
+        self.rsi_upper = rsi_upper
+        self.rsi_lower = rsi_lower
+        self.adx_threshold = adx_threshold
+        self.min_strength = min_strength
+        self.min_rr_ratio = min_rr_ratio
+        self.entry_offset = entry_offset    # support_1 / resistance_1 distance (0.5%)
+        self.stop_offset = stop_offset      # support_2 / resistance_2 distance (1%)
+        self.entry_window = entry_window    # bars the limit entry stays working
+        self.max_hold = max_hold            # bars before a trade is closed at market
+        self.flatten_at_session_end = flatten_at_session_end
+        self.pattern_confirmation = pattern_confirmation  # only trade signals on a candlestick pattern bar
+        self.chunk_size = chunk_size        # signals simulated per vectorized block
+
+    def generate_signals(self, arrays):
+        """Return trend, strength, momentum and signal (+1 long, -1 short, 0 none) per bar"""
+        close, vwap, rsi = arrays['close'], arrays['vwap'], arrays['rsi']
+        adx, macd, macd_signal = arrays['adx'], arrays['macd'], arrays['macd_signal']
+
+        # identify_trend: price vs VWAP, RSI confirmation, ADX strength
+        trend = np.sign(close - vwap)
+        strength = (trend != 0).astype(np.int8)
+        strength += ((rsi > self.rsi_upper) & (trend > 0)) | ((rsi < self.rsi_lower) & (trend < 0))
+        strength += adx > self.adx_threshold
+
+        # validate_momentum: RSI sets the direction, MACD decides when RSI is neutral
+        rsi_direction = np.where(rsi > self.rsi_upper, 1, np.where(rsi < self.rsi_lower, -1, 0))
+        momentum = np.where(rsi_direction != 0, rsi_direction, np.sign(macd - macd_signal))
+
+        valid = ~(np.isnan(vwap) | np.isnan(rsi) | np.isnan(adx) | np.isnan(macd) | np.isnan(macd_signal))
+        signal = np.where(valid & (trend != 0) & (trend == momentum) & (strength >= self.min_strength), trend, 0)
+
+        result = {
+            'trend': trend,
+            'strength': strength,
+            'momentum': momentum
+        }
+        if self.pattern_confirmation:
+            flags = detect_patterns(arrays['open'], arrays['high'], arrays['low'], close)
+            bullish = np.logical_or.reduce([flags[name] for name in BULLISH])
+            bearish = np.logical_or.reduce([flags[name] for name in BEARISH])
+            signal = np.where(((signal > 0) & bullish) | ((signal < 0) & bearish), signal, 0)
+            result.update({'bullish_pattern': bullish, 'bearish_pattern': bearish})
+        result['signal'] = signal.astype(np.int8)
+        return result
+
+    def _first_true(self, mask):
+        """Column offset of the first True per row, -1 where there is none"""
+        first = mask.argmax(axis=1)
+        return np.where(mask.any(axis=1), first, -1)
+
+    def _simulate(self, arrays, signal_bars, direction):
+        """Entry fill and exit for every candidate signal in one vectorized pass"""
+        high, low, close, session = arrays['high'], arrays['low'], arrays['close'], arrays['session']
+        n = len(close)
+
+        price = close[signal_bars]
+        entry = np.round(price * (1 - direction * self.entry_offset), 2)
+        stop = np.round(price * (1 - direction * self.stop_offset), 2)
+        target = price + (price - stop) * self.min_rr_ratio
+
+        # Limit entry: first bar after the signal that trades through the entry price
+        steps = np.arange(1, self.entry_window + 1)
+        bars = signal_bars[:, None] + steps
+        in_range = bars < n
+        bars = np.minimum(bars, n - 1)
+        same_session = session[bars] == session[signal_bars][:, None]
+        touched = np.where(direction[:, None] > 0, low[bars] <= entry[:, None], high[bars] >= entry[:, None])
+        fill_offset = self._first_true(touched & in_range & same_session)
+        filled = fill_offset >= 0
+        fill_bar = np.minimum(signal_bars + 1 + np.maximum(fill_offset, 0), n - 1)
+
+        # Exit: stop or target from the fill bar on; the stop wins when both trade in one bar
+        steps = np.arange(0, self.max_hold)
+        bars = fill_bar[:, None] + steps
+        in_range = bars < n
+        bars = np.minimum(bars, n - 1)
+        live = in_range
+        if self.flatten_at_session_end:
+            live = live & (session[bars] == session[fill_bar][:, None])
+        long_side = direction[:, None] > 0
+        stop_hit = np.where(long_side, low[bars] <= stop[:, None], high[bars] >= stop[:, None]) & live
+        target_hit = np.where(long_side, high[bars] >= target[:, None], low[bars] <= target[:, None]) & live
+        first_stop = self._first_true(stop_hit)
+        first_target = self._first_true(target_hit)
+
+        last_live = live.shape[1] - 1 - live[:, ::-1].argmax(axis=1)
+        stop_first = (first_stop >= 0) & ((first_target < 0) | (first_stop <= first_target))
+        target_first = (first_target >= 0) & ~stop_first
+        exit_offset = np.where(stop_first, first_stop, np.where(target_first, first_target, last_live))
+        exit_bar = fill_bar + exit_offset
+        exit_price = np.where(stop_first, stop, np.where(target_first, target, close[exit_bar]))
+        exit_reason = np.where(stop_first, 'stop', np.where(target_first, 'target', 'time'))
+
+        return {
+            'filled': filled, 'entry': entry, 'stop': stop, 'target': target,
+            'fill_bar': fill_bar, 'exit_bar': exit_bar, 'exit_price': exit_price,
+            'exit_reason': exit_reason
+        }
+
+    def run(self, data):
+        """
+        Backtest over a DataFrame (or arrays from prepare_arrays).
+        Returns {'metrics': dict, 'trades': DataFrame}. One position is held at
+        a time; signals that arrive while a trade is open are ignored.
+        """
+        arrays = prepare_arrays(data) if isinstance(data, pd.DataFrame) else data
+        signals = self.generate_signals(arrays)
+        signal_bars = np.flatnonzero(signals['signal'])
+
+        # Simulate every candidate independently, in blocks to bound memory
+        parts = []
+        for start in range(0, len(signal_bars), self.chunk_size):
+            bars = signal_bars[start:start + self.chunk_size]
+            part = self._simulate(arrays, bars, signals['signal'][bars].astype(np.float64))
+            part['signal_bar'] = bars
+            parts.append(part)
+        if parts:
+            candidates = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+        else:
+            candidates = {key: np.array([]) for key in ['filled', 'signal_bar']}
+
+        # Keep filled candidates that start after the previous trade exited
+        taken = []
+        busy_until = -1
+        filled = np.flatnonzero(candidates['filled'])
+        for i in filled:
+            if candidates['signal_bar'][i] > busy_until:
+                taken.append(i)
+                busy_until = candidates['exit_bar'][i]
+        taken = np.array(taken, dtype=np.int64)
+
+        if len(taken) == 0:
+            trades = pd.DataFrame(columns=['signal_bar', 'side', 'entry', 'stop', 'target',
+                                           'fill_bar', 'exit_bar', 'exit_price', 'exit_reason', 'pnl'])
+        else:
+            side = signals['signal'][candidates['signal_bar'][taken]]
+            entry = candidates['entry'][taken]
+            exit_price = candidates['exit_price'][taken]
+            trades = pd.DataFrame({
+                'signal_bar': candidates['signal_bar'][taken],
+                'side': np.where(side > 0, 'long', 'short'),
+                'entry': entry,
+                'stop': candidates['stop'][taken],
+                'target': candidates['target'][taken],
+                'fill_bar': candidates['fill_bar'][taken],
+                'exit_bar': candidates['exit_bar'][taken],
+                'exit_price': exit_price,
+                'exit_reason': candidates['exit_reason'][taken],
+                'pnl': (exit_price - entry) * side
+            })
+            if isinstance(data, pd.DataFrame):
+                trades['entry_time'] = data.index[trades['fill_bar'].to_numpy()]
+                trades['exit_time'] = data.index[trades['exit_bar'].to_numpy()]
+
+        return {
+            'metrics': self.summarize(trades, signals=len(signal_bars)),
+            'trades': trades
+        }
+
+    def summarize(self, trades, signals=0):
+        """P&L, drawdown and hit rate of a trades table (P&L in index points)"""
+        pnl = trades['pnl'].to_numpy(dtype=np.float64) if len(trades) else np.zeros(0)
+        equity = np.cumsum(pnl)
+        peak = np.maximum.accumulate(np.concatenate([[0.0], equity]))[1:]
+        gross_profit = pnl[pnl > 0].sum()
+        gross_loss = -pnl[pnl < 0].sum()
+
+        return {
+            'signals': int(signals),
+            'trades': int(len(pnl)),
+            'hit_rate': float((pnl > 0).mean()) if len(pnl) else 0.0,
+            'total_pnl': float(equity[-1]) if len(pnl) else 0.0,
+            'avg_pnl': float(pnl.mean()) if len(pnl) else 0.0,
+            'max_drawdown': float((peak - equity).max()) if len(pnl) else 0.0,
+            'profit_factor': float(gross_profit / gross_loss) if gross_loss > 0 else float('inf') if gross_profit > 0 else 0.0,
+            'avg_bars_held': float((trades['exit_bar'] - trades['fill_bar']).mean()) if len(pnl) else 0.0
+        }
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+__all__ = ['detect_patterns', 'candlestick_patterns', 'latest_patterns', 'PATTERNS', 'BULLISH', 'BEARISH']
+
+BULLISH = (
+    'Bullish Marubozu', 'Bullish Engulfing', 'Hammer', 'Inverted Hammer', 'Dragonfly Doji',
+    'Bullish Harami', 'Piercing Line', 'Tweezer Bottom', 'Morning Star', 'Morning Doji Star',
+    'Three White Soldiers', 'Three Inside Up', 'Three Outside Up', 'Bullish Kicker', 'Bullish Belt Hold'
+)
+BEARISH = (
+    'Bearish Marubozu', 'Bearish Engulfing', 'Hanging Man', 'Shooting Star', 'Gravestone Doji',
+    'Bearish Harami', 'Dark Cloud Cover', 'Tweezer Top', 'Evening Star', 'Evening Doji Star',
+    'Three Black Crows', 'Three Inside Down', 'Three Outside Down', 'Bearish Kicker', 'Bearish Belt Hold'
+)
+NEUTRAL = ('Doji', 'Spinning Top', 'Inside Bar', 'Outside Bar')
+PATTERNS = BULLISH + BEARISH + NEUTRAL
+
+# Bars needed before the newest one: the longest pattern (3 bars) plus the trend window
+LOOKBACK = 3
+
+
+def _shift(values, periods):
+    """values[t - periods] at t; NaN where there is no earlier bar"""
+    shifted = np.full_like(values, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+def _rolling_mean(values, window):
+    cumulative = np.concatenate([[0.0], np.cumsum(values)])
+    mean = np.full_like(values, np.nan)
+    if window <= len(values):
+        mean[window - 1:] = (cumulative[window:] - cumulative[:-window]) / window
+    return mean
+
+
+def detect_patterns(open_, high, low, close, trend_window=10):
+    """
+    Evaluate the whole pattern library over OHLC arrays in one pass.
+
+    Returns {pattern name: bool array}, True on the bar that completes the
+    pattern. Reversal patterns that need a prior trend (hammer, hanging man,
+    stars, tweezers, ...) check the close before the pattern against the
+    `trend_window`-bar average close. Doji, marubozu and engulfing keep the
+    thresholds of TechnicalAnalyzer's original single-bar checks.
+    """
+    o, h, l, c = (np.asarray(values, dtype=np.float64) for values in (open_, high, low, close))
+    body = c - o
+    size = np.abs(body)
+    total = h - l
+    upper = h - np.maximum(o, c)
+    lower = np.minimum(o, c) - l
+    bull = body > 0
+    bear = body < 0
+    avg_size = _rolling_mean(size, trend_window)
+    long_body = size > avg_size
+    small_body = size < 0.3 * total
+    mid = (o + c) / 2
+
+    o1, h1, l1, c1 = (_shift(values, 1) for values in (o, h, l, c))
+    o2, h2, l2, c2 = (_shift(values, 2) for values in (o, h, l, c))
+    body1, size1, total1 = c1 - o1, np.abs(c1 - o1), h1 - l1
+    body2, size2 = c2 - o2, np.abs(c2 - o2)
+    bull1, bear1, bull2, bear2 = body1 > 0, body1 < 0, body2 > 0, body2 < 0
+    long1 = size1 > _shift(avg_size, 1)
+    long2 = size2 > _shift(avg_size, 2)
+    mid1, mid2 = (o1 + c1) / 2, (o2 + c2) / 2
+
+    # Trend before the pattern: close vs its rolling average, measured on the bar before
+    trend = _rolling_mean(c, trend_window)
+    down1 = _shift(c, 1) < _shift(trend, 1)
+    up1 = _shift(c, 1) > _shift(trend, 1)
+    down2 = _shift(c, 2) < _shift(trend, 2)
+    up2 = _shift(c, 2) > _shift(trend, 2)
+    down3 = _shift(c, 3) < _shift(trend, 3)
+    up3 = _shift(c, 3) > _shift(trend, 3)
+
+    doji = (size < 0.2 * total) & (upper > 0.4 * total) & (lower > 0.4 * total)
+    doji_any = size <= 0.1 * total
+    doji1 = size1 <= 0.1 * total1
+    hammer_shape = (lower >= 2 * size) & (upper <= 0.25 * total) & (size > 0) & ~doji_any
+    inverted_shape = (upper >= 2 * size) & (lower <= 0.25 * total) & (size > 0) & ~doji_any
+
+    engulf_bull = bull & bear1 & (o < c1) & (c > o1)
+    engulf_bear = bear & bull1 & (o > c1) & (c < o1)
+    harami_bull = bear1 & long1 & bull & (o > c1) & (c < o1)
+    harami_bear = bull1 & long1 & bear & (o < c1) & (c > o1)
+    star_gap_down = np.maximum(o1, c1) < c2
+    star_gap_up = np.minimum(o1, c1) > c2
+    tolerance = 0.05 * np.maximum(total, total1)
+
+    flags = {
+        'Doji': doji,
+        'Bullish Marubozu': bull & (size > 0.7 * total) & (upper < 0.15 * total),
+        'Bearish Marubozu': bear & (size > 0.7 * total) & (lower < 0.15 * total),
+        'Bullish Engulfing': engulf_bull,
+        'Bearish Engulfing': engulf_bear,
+        'Hammer': hammer_shape & down1,
+        'Hanging Man': hammer_shape & up1,
+        'Inverted Hammer': inverted_shape & down1,
+        'Shooting Star': inverted_shape & up1,
+        'Dragonfly Doji': doji_any & (upper <= 0.1 * total) & (lower >= 0.6 * total),
+        'Gravestone Doji': doji_any & (lower <= 0.1 * total) & (upper >= 0.6 * total),
+        'Spinning Top': small_body & ~doji_any & (upper > size) & (lower > size),
+        'Bullish Harami': harami_bull,
+        'Bearish Harami': harami_bear,
+        'Piercing Line': bear1 & long1 & bull & (o < l1) & (c > mid1) & (c < o1),
+        'Dark Cloud Cover': bull1 & long1 & bear & (o > h1) & (c < mid1) & (c > o1),
+        'Tweezer Bottom': down2 & bear1 & bull & (np.abs(l - l1) <= tolerance),
+        'Tweezer Top': up2 & bull1 & bear & (np.abs(h - h1) <= tolerance),
+        'Morning Star': down3 & bear2 & long2 & (size1 < 0.5 * size2) & star_gap_down & ~doji1 & bull & (c > mid2),
+        'Morning Doji Star': down3 & bear2 & long2 & doji1 & star_gap_down & bull & (c > mid2),
+        'Evening Star': up3 & bull2 & long2 & (size1 < 0.5 * size2) & star_gap_up & ~doji1 & bear & (c < mid2),
+        'Evening Doji Star': up3 & bull2 & long2 & doji1 & star_gap_up & bear & (c < mid2),
+        'Three White Soldiers': (bull & bull1 & bull2 & (c > c1) & (c1 > c2)
+                                 & (o > o1) & (o < c1) & (o1 > o2) & (o1 < c2)
+                                 & (upper < 0.3 * size) & (h1 - c1 < 0.3 * size1)),
+        'Three Black Crows': (bear & bear1 & bear2 & (c < c1) & (c1 < c2)
+                              & (o < o1) & (o > c1) & (o1 < o2) & (o1 > c2)
+                              & (lower < 0.3 * size) & (c1 - l1 < 0.3 * size1)),
+        'Three Inside Up': _shift(harami_bull.astype(np.float64), 1) == 1,
+        'Three Outside Up': _shift(engulf_bull.astype(np.float64), 1) == 1,
+        'Three Inside Down': _shift(harami_bear.astype(np.float64), 1) == 1,
+        'Three Outside Down': _shift(engulf_bear.astype(np.float64), 1) == 1,
+        'Bullish Kicker': bear1 & long1 & bull & long_body & (o > o1) & (l > h1),
+        'Bearish Kicker': bull1 & long1 & bear & long_body & (o < o1) & (h < l1),
+        'Bullish Belt Hold': down1 & bull & long_body & (lower <= 0.02 * total),
+        'Bearish Belt Hold': up1 & bear & long_body & (upper <= 0.02 * total),
+        'Inside Bar': (h < h1) & (l > l1),
+        'Outside Bar': (h > h1) & (l < l1),
+    }
+    # Third-bar confirmation of the harami / engulfing setups
+    flags['Three Inside Up'] &= bull & (c > c1)
+    flags['Three Outside Up'] &= bull & (c > c1)
+    flags['Three Inside Down'] &= bear & (c < c1)
+    flags['Three Outside Down'] &= bear & (c < c1)
+    return flags
+
+
+def candlestick_patterns(data, trend_window=10):
+    """Per-bar pattern flags for an OHLC DataFrame (one bool column per pattern)"""
+    flags = detect_patterns(data['Open'].to_numpy(), data['High'].to_numpy(), data['Low'].to_numpy(),
+                            data['Close'].to_numpy(), trend_window)
+    return pd.DataFrame(flags, index=data.index, columns=PATTERNS)
+
+
+def latest_patterns(data, trend_window=10):
+    """Names of the patterns completed by the newest bar (only the tail of `data` is evaluated)"""
+    tail = data.iloc[-(trend_window + LOOKBACK + 1):]
+    flags = detect_patterns(tail['Open'].to_numpy(), tail['High'].to_numpy(), tail['Low'].to_numpy(),
+                            tail['Close'].to_numpy(), trend_window)
+    return [name for name in PATTERNS if flags[name][-1]]
@@ -0,0 +1,154 @@
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from .. import config
+from ..capabilities import require
+from ..data_collectors.response_cache import ResponseCache
+from ..monitoring.metrics import span
+
+__all__ = ['CommentaryService', 'OpenAIBackend', 'StubBackend', 'context_key', 'get_commentary_service']
+
+SYSTEM_PROMPT = "You are an expert options trader specializing in Nifty index options."
+
+
+def _band(value, width):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return int(value // width)
+
+
+def context_key(context):
+    """
+    Quantized market state used as the cache key: price bucket, bias,
+    volume pressure and strength/RSI/ADX bands. Contexts that only differ
+    within a bucket reuse the same commentary.
+    """
+    return (
+        _band(context.get('price'), config.COMMENTARY_PRICE_BUCKET),
+        context.get('bias'),
+        _band(context.get('strength'), config.COMMENTARY_STRENGTH_BAND),
+        context.get('volume_pressure'),
+        _band(context.get('rsi'), config.COMMENTARY_RSI_BAND),
+        _band(context.get('adx'), config.COMMENTARY_ADX_BAND)
+    )
+
+
+class OpenAIBackend:
+    """
+    Chat completion through the openai package, imported on the first
+    completion (the caller sets api_key with capabilities.on_load('llm', ...))
+    """
+
+    def __init__(self, model=None):
+        self.model = model or config.OPENAI_MODEL
+
+    def complete(self, prompt, timeout):
+        openai = require('llm')
+
+        response = openai.ChatCompletion.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            request_timeout=timeout
+        )
+        return response.choices[0].message.content
+
+
+class StubBackend:
+    """
+    Offline backend: returns `responder(prompt)` (or a fixed line) after an
+    optional delay, and records every prompt it was asked to complete.
+    """
+
+    def __init__(self, responder=None, delay=0.0):
+        self.responder = responder
+        self.delay = delay
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def complete(self, prompt, timeout):
+        with self.lock:
+            self.prompts.append(prompt)
+        if self.delay:
+            time.sleep(min(self.delay, timeout))
+        if self.responder:
+            return self.responder(prompt)
+        return "Commentary unavailable offline (stub backend)."
+
+
+class CommentaryService:
+    """
+    LLM market commentary as an asynchronous enrichment step.
+
+    request() returns a Future straight away: a cached answer for the same
+    quantized context (see context_key) is returned already completed, and
+    concurrent requests for one context share a single completion. At most
+    `max_concurrency` completions run at once, each bounded by `timeout`
+    seconds; failures and timeouts resolve the future to None.
+    """
+
+    def __init__(self, backend=None, max_concurrency=None, timeout=None, cache_ttl=None, cache_size=128):
+        self.backend = backend or OpenAIBackend()
+        self.timeout = timeout or config.COMMENTARY_TIMEOUT
+        self.cache_ttl = config.COMMENTARY_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.cache = ResponseCache(max_entries=cache_size, default_ttl=self.cache_ttl)
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency or config.COMMENTARY_MAX_CONCURRENCY,
+                                           thread_name_prefix="commentary")
+
+    def _complete(self, prompt):
+        with span("ai_completion") as timer:
+            try:
+                return self.backend.complete(prompt, self.timeout)
+            except Exception as e:
+                timer.fail()
+                print(f"Error getting AI analysis: {str(e)}")
+                return None
+
+    def request(self, context, prompt, callback=None):
+        """
+        Start (or reuse) commentary for a market context. callback(text) is
+        called with the result, or None on failure, once it is ready.
+        """
+        key = context_key(context)
+        cached = self.cache.get(key)
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+        else:
+            future = self.executor.submit(
+                self.cache.get_or_fetch, key, lambda: self._complete(prompt), self.cache_ttl
+            )
+        if callback is not None:
+            future.add_done_callback(lambda done: callback(done.result()))
+        return future
+
+    def get(self, context, prompt, timeout=None):
+        """Blocking variant: the commentary, or None if it is not ready within the timeout budget"""
+        future = self.request(context, prompt)
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except Exception:
+            return None
+
+    def stats(self):
+        return self.cache.stats()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_commentary_service():
+    """Process-wide service using config.COMMENTARY_BACKEND ('openai' or 'stub')"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            backend = StubBackend() if config.COMMENTARY_BACKEND == 'stub' else OpenAIBackend()
+            _service = CommentaryService(backend)
+        return _service
@@ -0,0 +1,230 @@
+import warnings
+from collections import deque
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from .. import config
+from .streaming import compute_indicators
+
+__all__ = ['find_pivots', 'on_balance_volume', 'detect_divergences', 'DivergenceDetector', 'INDICATORS']
+
+# Oscillator compared against price, and the indicator column it is read from
+INDICATORS = {'RSI': 'RSI', 'MACD': 'MACD_Hist', 'OBV': 'OBV'}
+
+COLUMNS = ['bar', 'timestamp', 'confirmed_bar', 'confirmed_at', 'direction', 'kind', 'indicator',
+           'previous_bar', 'previous_price', 'price', 'previous_value', 'value', 'strength']
+
+
+def find_pivots(values, left=None, right=None, kind='high'):
+    """
+    Bool array marking swing pivots: bars that are the extreme of the `left`
+    bars before and `right` bars after them (the first bar of a flat top or
+    bottom). A pivot at i is only known once bar i + right has closed.
+    """
+    left = config.DIVERGENCE_PIVOT_LEFT if left is None else left
+    right = config.DIVERGENCE_PIVOT_RIGHT if right is None else right
+    values = np.asarray(values, dtype=np.float64)
+    pivots = np.zeros(len(values), dtype=bool)
+    width = left + right + 1
+    if len(values) < width:
+        return pivots
+    windows = sliding_window_view(values, width)
+    centre = values[left:len(values) - right]
+    if kind == 'high':
+        extreme = centre >= windows.max(axis=1)
+        strict = centre > windows[:, :left].max(axis=1) if left else True
+    else:
+        extreme = centre <= windows.min(axis=1)
+        strict = centre < windows[:, :left].min(axis=1) if left else True
+    pivots[left:len(values) - right] = extreme & strict & np.isfinite(centre)
+    return pivots
+
+
+def on_balance_volume(close, volume):
+    close = np.asarray(close, dtype=np.float64)
+    direction = np.sign(np.diff(close, prepend=close[0]))
+    return np.cumsum(direction * np.asarray(volume, dtype=np.float64))
+
+
+def _classify(price_change, value_change, kind):
+    """(direction, kind) for a pair of pivots, or None"""
+    if kind == 'low':
+        if price_change < 0 < value_change:
+            return 'bullish', 'regular'
+        if price_change > 0 > value_change:
+            return 'bullish', 'hidden'
+    else:
+        if price_change > 0 > value_change:
+            return 'bearish', 'regular'
+        if price_change < 0 < value_change:
+            return 'bearish', 'hidden'
+    return None
+
+
+def _pair_divergences(price, indicators, pivots, kind, right, match_window, min_distance, max_distance):
+    """Compare each pivot with the previous one of the same kind, vectorized over all pairs"""
+    previous, current = pivots[:-1], pivots[1:]
+    distance = current - previous
+    keep = (distance >= min_distance) & (distance <= max_distance)
+    previous, current = previous[keep], current[keep]
+    price_change = price[current] - price[previous]
+    rows = []
+    for name, series in indicators.items():
+        # The oscillator's own extreme within match_window bars of each price pivot
+        padded = np.pad(series, match_window, constant_values=np.nan)
+        windows = sliding_window_view(padded, 2 * match_window + 1)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN windows during indicator warm-up
+            extremes = np.nanmin(windows, axis=1) if kind == 'low' else np.nanmax(windows, axis=1)
+        value_change = extremes[current] - extremes[previous]
+        if kind == 'low':
+            regular = (price_change < 0) & (value_change > 0)
+            hidden = (price_change > 0) & (value_change < 0)
+        else:
+            regular = (price_change > 0) & (value_change < 0)
+            hidden = (price_change < 0) & (value_change > 0)
+        direction = 'bullish' if kind == 'low' else 'bearish'
+        for label, mask in (('regular', regular), ('hidden', hidden)):
+            for i in np.flatnonzero(mask):
+                rows.append({
+                    'bar': int(current[i]), 'confirmed_bar': int(current[i] + right),
+                    'direction': direction, 'kind': label, 'indicator': name,
+                    'previous_bar': int(previous[i]),
+                    'previous_price': float(price[previous[i]]), 'price': float(price[current[i]]),
+                    'previous_value': float(extremes[previous[i]]), 'value': float(extremes[current[i]]),
+                    'strength': float(abs(value_change[i]))
+                })
+    return rows
+
+
+def detect_divergences(data, indicators=None, left=None, right=None, match_window=None,
+                       min_distance=None, max_distance=None):
+    """
+    Regular and hidden divergences over a whole OHLCV DataFrame.
+
+    Swing lows of Low and swing highs of High are paired with the previous
+    swing of the same kind (min_distance..max_distance bars apart), and the
+    price move is compared with each oscillator's extreme within
+    match_window bars of both pivots. RSI and the MACD histogram come from
+    the frame's columns when present (compute_indicators otherwise); OBV is
+    computed from Close and Volume. Returns one row per divergence, ordered
+    by the bar at which it was confirmed (pivot bar + right).
+    """
+    left = config.DIVERGENCE_PIVOT_LEFT if left is None else left
+    right = config.DIVERGENCE_PIVOT_RIGHT if right is None else right
+    match_window = min(config.DIVERGENCE_MATCH_WINDOW if match_window is None else match_window, left, right)
+    min_distance = min_distance or config.DIVERGENCE_MIN_DISTANCE
+    max_distance = max_distance or config.DIVERGENCE_MAX_DISTANCE
+    names = list(indicators or INDICATORS)
+    if data is None or len(data) < left + right + 1:
+        return pd.DataFrame(columns=COLUMNS)
+
+    series = {}
+    missing = [INDICATORS[name] for name in names if name != 'OBV' and INDICATORS[name] not in data.columns]
+    computed = compute_indicators(data) if missing else data
+    for name in names:
+        if name == 'OBV':
+            series[name] = on_balance_volume(data['Close'].to_numpy(), data['Volume'].to_numpy())
+        else:
+            source = data if INDICATORS[name] in data.columns else computed
+            series[name] = source[INDICATORS[name]].to_numpy(dtype=np.float64)
+
+    rows = []
+    for kind, column in (('low', 'Low'), ('high', 'High')):
+        price = data[column].to_numpy(dtype=np.float64)
+        pivots = np.flatnonzero(find_pivots(price, left, right, kind))
+        rows += _pair_divergences(price, series, pivots, kind, right, match_window, min_distance, max_distance)
+
+    result = pd.DataFrame(rows, columns=COLUMNS)
+    result['timestamp'] = data.index[result['bar'].to_numpy(dtype=np.int64)]
+    result['confirmed_at'] = data.index[result['confirmed_bar'].to_numpy(dtype=np.int64)]
+    return result.sort_values(['confirmed_bar', 'indicator', 'direction'], kind='stable').reset_index(drop=True)
+
+
+class DivergenceDetector:
+    """
+    Streaming counterpart of detect_divergences().
+
+    Feed one closed bar at a time with its indicator values (as returned by
+    IndicatorEngine.update). Only the bar `right` bars back can become a new
+    pivot, so each update examines that one candidate and, if it is a pivot,
+    compares it with the previous pivot of the same kind: O(left + right)
+    per bar with a window of left + right + 1 bars kept in memory.
+    """
+
+    def __init__(self, indicators=None, left=None, right=None, match_window=None,
+                 min_distance=None, max_distance=None, on_divergence=None):
+        self.names = list(indicators or INDICATORS)
+        self.left = config.DIVERGENCE_PIVOT_LEFT if left is None else left
+        self.right = config.DIVERGENCE_PIVOT_RIGHT if right is None else right
+        self.match_window = min(config.DIVERGENCE_MATCH_WINDOW if match_window is None else match_window,
+                                self.left, self.right)
+        self.min_distance = min_distance or config.DIVERGENCE_MIN_DISTANCE
+        self.max_distance = max_distance or config.DIVERGENCE_MAX_DISTANCE
+        self.on_divergence = on_divergence
+        width = self.left + self.right + 1
+        self.window = deque(maxlen=width)   # (bar, timestamp, high, low, {indicator: value})
+        self.last_pivot = {'high': None, 'low': None}   # (bar, price, {indicator: extreme})
+        self.obv = 0.0
+        self.prev_close = None
+        self.bars = 0
+
+    def update(self, timestamp, high, low, close, volume, values=None):
+        """Add a closed bar; returns the divergences it confirmed (dicts like detect_divergences rows)"""
+        values = values or {}
+        if self.prev_close is not None:
+            self.obv += np.sign(close - self.prev_close) * volume
+        self.prev_close = close
+        oscillators = {
+            name: self.obv if name == 'OBV' else values.get(INDICATORS[name], np.nan) for name in self.names
+        }
+        oscillators = {name: np.nan if value is None else float(value) for name, value in oscillators.items()}
+        self.window.append((self.bars, timestamp, float(high), float(low), oscillators))
+        self.bars += 1
+        if len(self.window) < self.window.maxlen:
+            return []
+
+        found = []
+        for kind, column in (('high', 2), ('low', 3)):
+            prices = [bar[column] for bar in self.window]
+            centre, before = prices[self.left], prices[:self.left]
+            # Same rule as find_pivots(), on the one bar that has just been confirmed
+            if kind == 'high':
+                pivot = centre >= max(prices) and (not before or centre > max(before))
+            else:
+                pivot = centre <= min(prices) and (not before or centre < min(before))
+            if pivot and centre == centre:
+                found += self._pivot(kind, centre)
+        if self.on_divergence:
+            for divergence in found:
+                self.on_divergence(divergence)
+        return found
+
+    def _pivot(self, kind, price):
+        bar, timestamp = self.window[self.left][:2]
+        around = list(self.window)[self.left - self.match_window:self.left + self.match_window + 1]
+        extremes = {}
+        for name in self.names:
+            series = np.array([item[4][name] for item in around])
+            if np.isnan(series).all():
+                extremes[name] = np.nan
+            else:
+                extremes[name] = float(np.nanmin(series) if kind == 'low' else np.nanmax(series))
+
+        found = []
+        previous = self.last_pivot[kind]
+        self.last_pivot[kind] = (bar, price, extremes)
+        if previous is None or not self.min_distance <= bar - previous[0] <= self.max_distance:
+            return found
+        for name in self.names:
+            label = _classify(price - previous[1], extremes[name] - previous[2][name], kind)
+            if label is None:
+                continue
+            found.append({
+                'bar': bar, 'timestamp': timestamp, 'confirmed_bar': bar + self.right,
+                'confirmed_at': self.window[-1][1], 'direction': label[0], 'kind': label[1], 'indicator': name,
+                'previous_bar': previous[0], 'previous_price': previous[1], 'price': price,
+                'previous_value': previous[2][name], 'value': extremes[name],
+                'strength': abs(extremes[name] - previous[2][name])
+            })
+        return found
@@ -0,0 +1,173 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from .. import config
+
+__all__ = ['PriceLevels', 'window_fingerprint']
+
+
+def window_fingerprint(data):
+    """Digest of a bar window's timestamps and High/Low/Close values"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(pd.DatetimeIndex(data.index).asi8).tobytes())
+    for column in ('High', 'Low', 'Close'):
+        digest.update(np.ascontiguousarray(data[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+class PriceLevels:
+    """
+    Support/resistance levels from the density of bar extremes on a price grid.
+
+    Every bar's High and Low count as a touch in the bin they fall in. A level
+    is a peak of the touch density smoothed over the touch tolerance
+    (`tolerance` x price); its price is the touch-weighted mean around the
+    peak, `touches` counts highs and lows within the tolerance and `strength`
+    is touches relative to the strongest level. Peaks that do not exceed the
+    range's average touch density by `prominence` are ignored. The touch histogram follows
+    the bar window incrementally: sync() only adds bars newer than the last
+    one seen, re-applies a revised in-progress bar and removes bars that left
+    the window. A window whose bars do not continue the held ones (another
+    interval or symbol, or revised history) rebuilds the histogram. Results
+    are memoized by window fingerprint.
+    """
+
+    def __init__(self, bin_size=None, tolerance=None, min_touches=None, prominence=None, cache_size=32):
+        self.bin_size = bin_size or config.LEVEL_BIN_SIZE
+        self.tolerance = tolerance or config.LEVEL_TOLERANCE
+        self.min_touches = min_touches or config.LEVEL_MIN_TOUCHES
+        self.prominence = prominence or config.LEVEL_PROMINENCE
+        self.cache_size = cache_size
+        self.reset()
+        self.cache = OrderedDict()      # (fingerprint, max levels) -> result
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def reset(self):
+        """Forget the held bars and the touch histogram"""
+        self.origin = None
+        self.counts = np.zeros(0)
+        # Bars in the histogram: timestamps (ns, ascending) and their high/low bins
+        self.timestamps = np.zeros(0, dtype=np.int64)
+        self.high_bins = np.zeros(0, dtype=np.int64)
+        self.low_bins = np.zeros(0, dtype=np.int64)
+
+    def _bins(self, prices):
+        return np.floor(np.asarray(prices, dtype=np.float64) / self.bin_size).astype(np.int64)
+
+    def _reserve(self, lo, hi):
+        if self.origin is None:
+            self.origin = int(lo) - 64
+            self.counts = np.zeros(int(hi) - int(lo) + 128)
+            return
+        if lo >= self.origin and hi < self.origin + len(self.counts):
+            return
+        grow = len(self.counts)
+        start = min(self.origin, int(lo) - grow // 2)
+        end = max(self.origin + len(self.counts), int(hi) + grow // 2)
+        counts = np.zeros(end - start)
+        offset = self.origin - start
+        counts[offset:offset + len(self.counts)] = self.counts
+        self.origin, self.counts = start, counts
+
+    def _add(self, high_bins, low_bins, sign):
+        size = len(self.counts)
+        self.counts += sign * np.bincount(high_bins - self.origin, minlength=size)[:size]
+        self.counts += sign * np.bincount(low_bins - self.origin, minlength=size)[:size]
+
+    def sync(self, data):
+        """Bring the touch histogram in line with the bars in `data`"""
+        timestamps = pd.DatetimeIndex(data.index).asi8.copy()
+        high_bins = self._bins(data['High'].to_numpy())
+        low_bins = self._bins(data['Low'].to_numpy())
+
+        # Held bars from the window start on must be its first bars, unchanged except the
+        # newest (it may have been forming); otherwise this is another series: rebuild
+        start = int(np.searchsorted(self.timestamps, timestamps[0]))
+        held = len(self.timestamps) - start
+        if held and (held > len(timestamps)
+                     or not np.array_equal(self.timestamps[start:], timestamps[:held])
+                     or not np.array_equal(self.high_bins[start:-1], high_bins[:held - 1])
+                     or not np.array_equal(self.low_bins[start:-1], low_bins[:held - 1])):
+            self.reset()
+            start = held = 0
+
+        # Remove bars that dropped out of the window and the newest held bar, then add it back with the rest
+        if start:
+            self._add(self.high_bins[:start], self.low_bins[:start], -1)
+        if held:
+            self._add(self.high_bins[-1:], self.low_bins[-1:], -1)
+            held -= 1
+        new = slice(held, None)
+        self.timestamps, self.high_bins, self.low_bins = timestamps, high_bins, low_bins
+        if len(timestamps[new]) == 0:
+            return self
+        self._reserve(min(low_bins[new].min(), high_bins[new].min()), max(low_bins[new].max(), high_bins[new].max()))
+        self._add(high_bins[new], low_bins[new], 1)
+        return self
+
+    def levels(self, current_price, max_levels=5):
+        """{'support': [...], 'resistance': [...]} nearest first, plus per-level details"""
+        counts = self.counts
+        radius = max(1, int(round(current_price * self.tolerance / self.bin_size)))
+        if not len(self.timestamps) or counts.sum() == 0:
+            return {'support': [], 'resistance': [], 'levels': []}
+
+        # Touches within +/- radius bins of every bin, from one cumulative sum
+        cumulative = np.concatenate([[0.0], np.cumsum(counts)])
+        index = np.arange(len(counts))
+        upper = np.minimum(index + radius + 1, len(counts))
+        lower = np.maximum(index - radius, 0)
+        touches = cumulative[upper] - cumulative[lower]
+        weighted = np.concatenate([[0.0], np.cumsum(counts * index)])
+        centre = (weighted[upper] - weighted[lower]) / np.where(touches > 0, touches, 1)
+
+        kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / (radius / 2)) ** 2)
+        density = np.convolve(counts, kernel, mode='same')
+        inner = density[1:-1]
+        peaks = np.flatnonzero((inner > density[:-2]) & (inner >= density[2:])) + 1
+        # A level must stand out from the average density of the traded range
+        threshold = max(self.min_touches, self.prominence * touches[touches > 0].mean())
+        peaks = peaks[touches[peaks] >= threshold]
+        # Strongest first; drop weaker peaks within the tolerance of a stronger one
+        peaks = peaks[np.argsort(-touches[peaks], kind='stable')]
+        chosen = []
+        for peak in peaks:
+            if all(abs(peak - other) > radius for other in chosen):
+                chosen.append(peak)
+        if not chosen:
+            return {'support': [], 'resistance': [], 'levels': []}
+
+        strongest = touches[chosen[0]]
+        details = [{
+            'price': round(float((self.origin + centre[peak] + 0.5) * self.bin_size), 2),
+            'touches': int(touches[peak]),
+            'strength': round(float(touches[peak] / strongest), 2)
+        } for peak in chosen]
+        support = sorted((d for d in details if d['price'] < current_price), key=lambda d: -d['price'])
+        resistance = sorted((d for d in details if d['price'] >= current_price), key=lambda d: d['price'])
+        support, resistance = support[:max_levels], resistance[:max_levels]
+        return {
+            'support': [d['price'] for d in support],
+            'resistance': [d['price'] for d in resistance],
+            'levels': sorted(support + resistance, key=lambda d: d['price'])
+        }
+
+    def detect(self, data, max_levels=5):
+        """Levels for a bar window, memoized by the window's fingerprint"""
+        current_price = float(data['Close'].iloc[-1])
+        key = (window_fingerprint(data), max_levels)
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+            self.misses += 1
+            result = self.sync(data).levels(current_price, max_levels)
+            self.cache[key] = result
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return result
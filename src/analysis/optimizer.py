@@ -0,0 +1,152 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from .backtest import Backtester, prepare_arrays
+
+__all__ = ['ParameterOptimizer', 'walk_forward_splits', 'DEFAULT_GRID']
+
+# Thresholds hard-coded in identify_trend / validate_momentum / TradePlanGenerator
+DEFAULT_GRID = {
+    'rsi_upper': [55, 60, 65, 70],
+    'rsi_lower': [30, 35, 40, 45],
+    'adx_threshold': [20, 25, 30],
+    'min_strength': [2, 3],
+    'min_rr_ratio': [1.0, 1.5, 2.0, 2.5]
+}
+
+# Arrays attached from shared memory in each worker process
+_worker_arrays = None
+_worker_shm = None
+
+
+def _attach_shared(name, keys, length):
+    """Process pool initializer: map the shared price block without copying it"""
+    global _worker_arrays, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray((len(keys), length), dtype=np.float64, buffer=_worker_shm.buf)
+    block.flags.writeable = False
+    _worker_arrays = {key: block[i] for i, key in enumerate(keys)}
+
+
+def _slice(arrays, bounds):
+    start, end = bounds
+    return {key: values[start:end] for key, values in arrays.items()}
+
+
+def _run_trial(trial_id, params, splits):
+    """Backtest one parameter set on every in-sample and out-of-sample window"""
+    backtester = Backtester(**params)
+    folds = []
+    for fold, (train, test) in enumerate(splits):
+        in_sample = backtester.run(_slice(_worker_arrays, train))['metrics']
+        out_sample = backtester.run(_slice(_worker_arrays, test))['metrics']
+        folds.append({'trial': trial_id, 'fold': fold,
+                      **{f'is_{key}': value for key, value in in_sample.items()},
+                      **{f'oos_{key}': value for key, value in out_sample.items()}})
+    return folds
+
+
+def walk_forward_splits(session, n_splits=4, train_sessions=None, test_sessions=None):
+    """
+    Rolling walk-forward windows over whole sessions.
+    Returns [((train_start, train_end), (test_start, test_end)), ...] as bar indices.
+    By default the history is cut into n_splits + 1 equal blocks and each fold
+    trains on one block and tests on the next.
+    """
+    session = np.asarray(session)
+    starts = np.flatnonzero(np.r_[True, session[1:] != session[:-1]])
+    bounds = np.r_[starts, len(session)]
+    total = len(starts)
+
+    if train_sessions is None or test_sessions is None:
+        block = max(1, total // (n_splits + 1))
+        train_sessions = train_sessions or block
+        test_sessions = test_sessions or block
+
+    splits = []
+    first = 0
+    while first + train_sessions + test_sessions <= total and len(splits) < n_splits:
+        middle = first + train_sessions
+        splits.append(((int(bounds[first]), int(bounds[middle])),
+                       (int(bounds[middle]), int(bounds[middle + test_sessions]))))
+        first += test_sessions
+    return splits
+
+
+class ParameterOptimizer:
+    """
+    Grid or random search over Backtester parameters, evaluated walk-forward on a
+    process pool. The price and indicator arrays are placed in one shared memory
+    block that workers map read-only, so trials only pickle their parameters.
+    """
+
+    def __init__(self, grid=None, search='grid', n_trials=50, n_splits=4,
+                 objective='oos_total_pnl', max_workers=None, seed=42):
+        self.grid = grid or DEFAULT_GRID
+        self.search = search
+        self.n_trials = n_trials
+        self.n_splits = n_splits
+        self.objective = objective
+        self.max_workers = max_workers or os.cpu_count()
+        self.seed = seed
+        self.fold_results = None
+
+    def parameter_sets(self):
+        """All grid combinations, or n_trials random draws from the grid"""
+        keys = list(self.grid)
+        if self.search == 'grid':
+            combos = itertools.product(*(self.grid[key] for key in keys))
+            return [dict(zip(keys, combo)) for combo in combos]
+
+        rng = np.random.default_rng(self.seed)
+        return [
+            {key: self.grid[key][rng.integers(len(self.grid[key]))] for key in keys}
+            for _ in range(self.n_trials)
+        ]
+
+    def run(self, data):
+        """
+        Evaluate every parameter set and return one row per trial ranked by the
+        objective, with in-sample and out-of-sample metrics averaged over folds.
+        Per-fold rows are kept in self.fold_results.
+        """
+        arrays = prepare_arrays(data) if isinstance(data, pd.DataFrame) else data
+        splits = walk_forward_splits(arrays['session'], n_splits=self.n_splits)
+        if not splits:
+            raise ValueError("Not enough sessions for walk-forward evaluation")
+
+        keys = list(arrays)
+        length = len(arrays['close'])
+        shm = shared_memory.SharedMemory(create=True, size=len(keys) * length * 8)
+        try:
+            block = np.ndarray((len(keys), length), dtype=np.float64, buffer=shm.buf)
+            for i, key in enumerate(keys):
+                block[i] = arrays[key]
+
+            trials = self.parameter_sets()
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_attach_shared,
+                                     initargs=(shm.name, keys, length)) as pool:
+                futures = [pool.submit(_run_trial, trial_id, params, splits)
+                           for trial_id, params in enumerate(trials)]
+                rows = [row for future in futures for row in future.result()]
+            del block
+        finally:
+            shm.close()
+            shm.unlink()
+
+        self.fold_results = pd.DataFrame(rows)
+        summary = self.fold_results.drop(columns='fold').groupby('trial').mean()
+        # Drawdown is a worst case, not an average
+        summary['oos_max_drawdown'] = self.fold_results.groupby('trial')['oos_max_drawdown'].max()
+        params = pd.DataFrame(trials)
+        params.index.name = 'trial'
+
+        table = params.join(summary[[
+            'oos_total_pnl', 'oos_hit_rate', 'oos_max_drawdown', 'oos_profit_factor', 'oos_trades',
+            'is_total_pnl', 'is_hit_rate'
+        ]])
+        ascending = self.objective == 'oos_max_drawdown'
+        return table.sort_values(self.objective, ascending=ascending).reset_index()
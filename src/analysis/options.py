@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+from .. import config
+from ..capabilities import require
+
+__all__ = [
+    'bs_price', 'bs_greeks', 'implied_volatility', 'time_to_expiry', 'next_expiry',
+    'price_chain', 'strike_for_delta', 'suggest_by_delta'
+]
+
+YEAR_SECONDS = 365 * 24 * 3600
+MIN_TIME = 1e-6          # Years; keeps d1/d2 finite in the last seconds before expiry
+IV_BOUNDS = (1e-4, 5.0)  # Search range for implied volatility (0.01% to 500%)
+
+
+def _d1_d2(spot, strike, t, vol, rate):
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * vol * vol) * t) / (vol * sqrt_t)
+    return d1, d1 - vol * sqrt_t
+
+
+def bs_price(spot, strike, t, vol, rate=None, is_call=True):
+    """Black-Scholes price; every argument may be an array (broadcast together)"""
+    rate = config.RISK_FREE_RATE if rate is None else rate
+    norm = require('stats').norm
+    spot, strike, vol = np.asarray(spot, float), np.asarray(strike, float), np.asarray(vol, float)
+    t = np.maximum(np.asarray(t, float), MIN_TIME)
+    d1, d2 = _d1_d2(spot, strike, t, vol, rate)
+    discount = strike * np.exp(-rate * t)
+    call = spot * norm.cdf(d1) - discount * norm.cdf(d2)
+    put = discount * norm.cdf(-d2) - spot * norm.cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def bs_greeks(spot, strike, t, vol, rate=None, is_call=True):
+    """
+    Delta, gamma, theta (per calendar day) and vega (per 1 volatility point)
+    as a dict of arrays.
+    """
+    rate = config.RISK_FREE_RATE if rate is None else rate
+    norm = require('stats').norm
+    spot, strike, vol = np.asarray(spot, float), np.asarray(strike, float), np.asarray(vol, float)
+    t = np.maximum(np.asarray(t, float), MIN_TIME)
+    d1, d2 = _d1_d2(spot, strike, t, vol, rate)
+    pdf = norm.pdf(d1)
+    sqrt_t = np.sqrt(t)
+    discount = strike * np.exp(-rate * t)
+
+    decay = -spot * pdf * vol / (2 * sqrt_t)
+    call_theta = decay - rate * discount * norm.cdf(d2)
+    put_theta = decay + rate * discount * norm.cdf(-d2)
+    return {
+        'delta': np.where(is_call, norm.cdf(d1), norm.cdf(d1) - 1),
+        'gamma': pdf / (spot * vol * sqrt_t),
+        'theta': np.where(is_call, call_theta, put_theta) / 365,
+        'vega': spot * pdf * sqrt_t / 100
+    }
+
+
+def implied_volatility(price, spot, strike, t, rate=None, is_call=True, tol=1e-6, max_iter=50):
+    """
+    Implied volatility for arrays of option prices, solved for all of them at once.
+
+    Each element runs Newton steps on vega inside a bisection bracket: a step
+    that would leave the bracket (or a vanishing vega) falls back to bisection,
+    so deep ITM/OTM strikes converge as reliably as ATM ones. Prices outside
+    the no-arbitrage bounds give NaN.
+    """
+    rate = config.RISK_FREE_RATE if rate is None else rate
+    norm = require('stats').norm
+    price, spot, strike, t, is_call = np.broadcast_arrays(
+        np.asarray(price, float), np.asarray(spot, float), np.asarray(strike, float),
+        np.maximum(np.asarray(t, float), MIN_TIME), np.asarray(is_call, bool)
+    )
+    discount = strike * np.exp(-rate * t)
+    lower = np.where(is_call, np.maximum(spot - discount, 0), np.maximum(discount - spot, 0))
+    upper = np.where(is_call, spot, discount)
+    valid = np.isfinite(price) & (price > lower) & (price < upper)
+
+    low = np.full(price.shape, IV_BOUNDS[0])
+    high = np.full(price.shape, IV_BOUNDS[1])
+    vol = np.full(price.shape, 0.2)
+    active = valid.copy()
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        p, s, k, tt, c, v = price[active], spot[active], strike[active], t[active], is_call[active], vol[active]
+        d1, d2 = _d1_d2(s, k, tt, v, rate)
+        disc = k * np.exp(-rate * tt)
+        model = np.where(c, s * norm.cdf(d1) - disc * norm.cdf(d2), disc * norm.cdf(-d2) - s * norm.cdf(-d1))
+        diff = model - p
+        vega = s * norm.pdf(d1) * np.sqrt(tt)
+
+        # Price is increasing in volatility, so the sign of diff tightens the bracket
+        lo, hi = low[active], high[active]
+        hi = np.where(diff > 0, v, hi)
+        lo = np.where(diff <= 0, v, lo)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = v - diff / vega
+        bisect = ~np.isfinite(step) | (step <= lo) | (step >= hi)
+        new_vol = np.where(bisect, 0.5 * (lo + hi), step)
+
+        done = (np.abs(diff) < tol) | (hi - lo < tol)
+        index = np.flatnonzero(active)
+        low[index], high[index] = lo, hi
+        vol[index] = np.where(done, v, new_vol)
+        active[index[done]] = False
+
+    return np.where(valid, vol, np.nan)
+
+
+def next_expiry(now=None, weekday=None):
+    """Next weekly expiry date (today counts until the 15:30 close)"""
+    weekday = config.EXPIRY_WEEKDAY if weekday is None else weekday
+    now = pd.Timestamp.now(tz=config.MARKET_TIMEZONE) if now is None else now
+    days = (weekday - now.weekday()) % 7
+    if days == 0 and now.strftime("%H:%M") >= config.MARKET_END:
+        days = 7
+    return (now + pd.Timedelta(days=days)).date()
+
+
+def time_to_expiry(expiry, now=None):
+    """Years from now until the 15:30 IST close on the expiry date(s); accepts datetime64 arrays"""
+    now = pd.Timestamp.now(tz=config.MARKET_TIMEZONE) if now is None else now
+    close = pd.Timedelta(config.MARKET_END + ":00")
+    expiry = pd.DatetimeIndex(np.atleast_1d(np.asarray(expiry, dtype='datetime64[D]')))
+    expires_at = expiry.tz_localize(config.MARKET_TIMEZONE) + close
+    seconds = (expires_at - now).total_seconds().to_numpy()
+    return np.maximum(seconds / YEAR_SECONDS, MIN_TIME)
+
+
+def price_chain(chain, spot=None, rate=None, now=None):
+    """
+    Implied volatility and Greeks for every row of an OptionChain.
+
+    IV is solved from each side's last traded price (falling back to NSE's
+    published IV where the price is outside the no-arbitrage bounds).
+    Returns a dict of arrays aligned with the chain rows: t, ce_iv, ce_delta,
+    ce_gamma, ce_theta, ce_vega and the same for pe.
+    """
+    spot = chain.underlying if spot is None else spot
+    rate = config.RISK_FREE_RATE if rate is None else rate
+    t = time_to_expiry(chain.expiry, now) if len(chain) else np.zeros(0)
+
+    n = len(chain)
+    strike = np.concatenate([chain.strike, chain.strike])
+    ltp = np.concatenate([chain.ce_ltp, chain.pe_ltp])
+    published = np.concatenate([chain.ce_iv, chain.pe_iv]) / 100
+    is_call = np.r_[np.ones(n, bool), np.zeros(n, bool)]
+    tt = np.concatenate([t, t])
+
+    iv = implied_volatility(ltp, spot, strike, tt, rate, is_call)
+    iv = np.where(np.isnan(iv) & (published > 0), published, iv)
+    greeks = bs_greeks(spot, strike, tt, iv, rate, is_call)
+
+    result = {'t': t, 'ce_iv': iv[:n], 'pe_iv': iv[n:]}
+    for name, values in greeks.items():
+        result[f'ce_{name}'] = values[:n]
+        result[f'pe_{name}'] = values[n:]
+    return result
+
+
+def strike_for_delta(target, side, spot, t, vol, rate=None, step=None):
+    """
+    Strike whose Black-Scholes delta is closest to `target` (use the absolute
+    delta for puts), rounded to the strike step. Closed form: used when no
+    option chain is available.
+    """
+    rate = config.RISK_FREE_RATE if rate is None else rate
+    norm = require('stats').norm
+    step = config.STRIKE_STEP if step is None else step
+    t = max(float(t), MIN_TIME)
+    d1 = norm.ppf(target) if side == 'CE' else -norm.ppf(target)
+    strike = spot * np.exp(-d1 * vol * np.sqrt(t) + (rate + 0.5 * vol * vol) * t)
+    return float(round(strike / step) * step)
+
+
+def suggest_by_delta(side, spot, chain=None, entry_delta=None, hedge_delta=None, vol=None, now=None):
+    """
+    Entry and hedge strikes for a CE or PE debit spread chosen by delta.
+
+    With a chain, the listed strikes of the nearest expiry are priced and the
+    ones whose |delta| is closest to the targets are picked (with their
+    premiums). Without one, strikes come from the closed-form delta at `vol`
+    (config.DEFAULT_VOLATILITY) for the next weekly expiry.
+    Returns {'primary_strike', 'hedge_strike', 'primary_delta', 'hedge_delta',
+    'primary_price', 'hedge_price', 'iv', 'expiry'}.
+    """
+    entry_delta = config.ENTRY_DELTA if entry_delta is None else entry_delta
+    hedge_delta = config.HEDGE_DELTA if hedge_delta is None else hedge_delta
+    prefix = side.lower()
+
+    if chain is not None and len(chain):
+        chain = chain.for_expiry()
+        greeks = price_chain(chain, spot=spot, now=now)
+        delta = np.abs(greeks[f'{prefix}_delta'])
+        listed = ~np.isnan(delta)
+        if listed.any():
+            rows = np.flatnonzero(listed)
+            primary = rows[np.abs(delta[rows] - entry_delta).argmin()]
+            hedge = rows[np.abs(delta[rows] - hedge_delta).argmin()]
+            ltp = chain.columns[f'{prefix}_ltp']
+            return {
+                'primary_strike': float(chain.strike[primary]),
+                'hedge_strike': float(chain.strike[hedge]),
+                'primary_delta': float(greeks[f'{prefix}_delta'][primary]),
+                'hedge_delta': float(greeks[f'{prefix}_delta'][hedge]),
+                'primary_price': float(ltp[primary]),
+                'hedge_price': float(ltp[hedge]),
+                'iv': float(greeks[f'{prefix}_iv'][primary]),
+                'expiry': str(chain.expiries[0])
+            }
+
+    vol = config.DEFAULT_VOLATILITY if vol is None else vol
+    expiry = next_expiry(now)
+    t = time_to_expiry(expiry, now)[0]
+    primary = strike_for_delta(entry_delta, side, spot, t, vol)
+    hedge = strike_for_delta(hedge_delta, side, spot, t, vol)
+    is_call = side == 'CE'
+    deltas = bs_greeks(spot, np.array([primary, hedge]), t, vol, is_call=is_call)['delta']
+    prices = bs_price(spot, np.array([primary, hedge]), t, vol, is_call=is_call)
+    return {
+        'primary_strike': primary,
+        'hedge_strike': hedge,
+        'primary_delta': float(deltas[0]),
+        'hedge_delta': float(deltas[1]),
+        'primary_price': float(prices[0]),
+        'hedge_price': float(prices[1]),
+        'iv': float(vol),
+        'expiry': str(expiry)
+    }
@@ -0,0 +1,355 @@
+import threading
+import numpy as np
+import pandas as pd
+from .. import config
+from ..data_collectors.ring_buffer import BarRingBuffer
+from ..scheduling.trading_calendar import TradingCalendar, INTERVAL_MINUTES
+from .streaming import IndicatorEngine
+
+__all__ = ['TimeframeResampler', 'resample_bars', 'rate_timeframe']
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _session_opens(index, calendar):
+    """(open, close) of each timestamp's session; NaT for days the exchange is closed"""
+    days = index.normalize()
+    bounds = {}
+    for day in days.unique():
+        session = calendar.session(day.date())
+        bounds[day] = session if session is not None else (pd.NaT, pd.NaT)
+    opens = pd.DatetimeIndex([bounds[day][0] for day in days]).tz_convert(index.tz)
+    closes = pd.DatetimeIndex([bounds[day][1] for day in days]).tz_convert(index.tz)
+    return opens, closes
+
+
+def resample_bars(df, interval, calendar=None):
+    """
+    Aggregate an OHLCV DataFrame (indexed by bar start) to a coarser interval.
+    Bars are aligned to each session's open like NSE candles (09:15, 10:15, ...;
+    the last hourly bar is the partial 15:15-15:30 one) and rows outside the
+    session are dropped.
+    """
+    if df is None or len(df) == 0:
+        return df
+    calendar = calendar or TradingCalendar()
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is None:
+        index = index.tz_localize(calendar.timezone)
+    else:
+        index = index.tz_convert(calendar.timezone)
+
+    opens, closes = _session_opens(index, calendar)
+    inside = np.asarray((index >= opens) & (index < closes))
+    step = pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+    starts = opens + ((index - opens) // step) * step
+
+    grouped = df.iloc[inside].groupby(starts[inside], sort=True)
+    return pd.DataFrame({
+        'Open': grouped['Open'].first(),
+        'High': grouped['High'].max(),
+        'Low': grouped['Low'].min(),
+        'Close': grouped['Close'].last(),
+        'Volume': grouped['Volume'].sum()
+    })
+
+
+def _rating(votes):
+    """TradingView-style rating from +1/0/-1 votes"""
+    votes = [vote for vote in votes if vote is not None]
+    counts = {
+        'BUY': sum(1 for vote in votes if vote > 0),
+        'SELL': sum(1 for vote in votes if vote < 0),
+        'NEUTRAL': sum(1 for vote in votes if vote == 0)
+    }
+    value = sum(votes) / len(votes) if votes else 0.0
+    if value > 0.5:
+        recommendation = 'STRONG_BUY'
+    elif value > 0.1:
+        recommendation = 'BUY'
+    elif value < -0.5:
+        recommendation = 'STRONG_SELL'
+    elif value < -0.1:
+        recommendation = 'SELL'
+    else:
+        recommendation = 'NEUTRAL'
+    return dict(counts, RECOMMENDATION=recommendation), value
+
+
+def _finite(*values):
+    return all(value is not None and np.isfinite(value) for value in values)
+
+
+def rate_timeframe(data):
+    """
+    Summary, moving-average and oscillator ratings for a locally computed
+    timeframe, using TradingView's voting rules on the indicators we have:
+    price vs each EMA/SMA, RSI 30/70 turns, Stochastic 20/80 crosses, MACD vs
+    signal and ADX > 20 direction. Returns (summary, moving_averages, oscillators)
+    in the shape of tradingview_ta's Analysis attributes.
+    """
+    close = data['close']
+    ma_votes = []
+    for name in ('EMA20', 'EMA50', 'EMA200', 'SMA20', 'SMA50', 'SMA200'):
+        ma = data.get(name)
+        if _finite(ma, close):
+            ma_votes.append(int(np.sign(close - ma)))
+
+    osc_votes = []
+    rsi, rsi_prev = data.get('RSI'), data.get('RSI[1]')
+    if _finite(rsi, rsi_prev):
+        osc_votes.append(1 if rsi < 30 and rsi > rsi_prev else -1 if rsi > 70 and rsi < rsi_prev else 0)
+    k, d = data.get('Stoch.K'), data.get('Stoch.D')
+    if _finite(k, d):
+        osc_votes.append(1 if k < 20 and k > d else -1 if k > 80 and k < d else 0)
+    macd, signal = data.get('MACD.macd'), data.get('MACD.signal')
+    if _finite(macd, signal):
+        osc_votes.append(int(np.sign(macd - signal)))
+    adx, plus_di, minus_di = data.get('ADX'), data.get('ADX+'), data.get('ADX-')
+    if _finite(adx, plus_di, minus_di):
+        osc_votes.append(int(np.sign(plus_di - minus_di)) if adx > 20 else 0)
+
+    moving_averages, ma_value = _rating(ma_votes)
+    oscillators, osc_value = _rating(osc_votes)
+    summary, _ = _rating([ma_value, osc_value] if ma_votes and osc_votes else ma_votes + osc_votes)
+    summary.update({
+        'BUY': moving_averages['BUY'] + oscillators['BUY'],
+        'SELL': moving_averages['SELL'] + oscillators['SELL'],
+        'NEUTRAL': moving_averages['NEUTRAL'] + oscillators['NEUTRAL']
+    })
+    return summary, moving_averages, oscillators
+
+
+class _Partial:
+    """Base bars of the coarser bar that is still in progress, keyed by start time"""
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.bars = {}
+        self.complete = True  # every base bar from `start` on, without holes
+        self.last = None
+
+    def add(self, timestamp, bar, step):
+        if timestamp != self.last:
+            expected = self.start if self.last is None else self.last + step
+            self.complete = self.complete and timestamp == expected
+            self.last = timestamp
+        self.bars[timestamp] = bar
+
+    def finished(self, step):
+        """Complete up to its end (the last base bar may not stop short of it)"""
+        return self.complete and self.last + step >= self.end
+
+    def aggregate(self):
+        bars = list(self.bars.values())
+        return (bars[0][0], max(bar[1] for bar in bars), min(bar[2] for bar in bars),
+                bars[-1][3], sum(bar[4] for bar in bars))
+
+
+class TimeframeResampler:
+    """
+    Derives coarser timeframes from one base interval in-process.
+
+    Only base bars are fetched or streamed; every other interval is built by
+    folding them into session-aligned bars as they arrive, and indicators are
+    kept per interval with IndicatorEngine, so a cycle costs one base update
+    instead of one remote request per timeframe. The newest base bar may be
+    sent again while it is still forming: it replaces the previous version
+    and only the coarser bars containing it are re-aggregated (the rest of
+    the history is untouched). Coarser bars close when the first base bar of
+    the next one arrives; until then frame() and timeframe_data() show them
+    as in-progress bars with previewed indicators.
+
+    Base bars must be complete. A coarser bar whose base bars do not start
+    at its own start or leave a hole (a feed gap, a restart mid-bar) would
+    understate its range and volume, so it is dropped instead of closed or
+    shown, and counted in `incomplete_bars`.
+    """
+
+    def __init__(self, base_interval=None, intervals=None, calendar=None, capacity=None, **indicator_params):
+        self.base_interval = base_interval or config.BASE_INTERVAL
+        self.intervals = list(intervals or config.INTERVALS)
+        base_minutes = INTERVAL_MINUTES[self.base_interval]
+        for interval in self.intervals:
+            if interval not in INTERVAL_MINUTES:
+                raise ValueError(f"Unsupported interval: {interval}")
+            if interval != '1d' and INTERVAL_MINUTES[interval] % base_minutes:
+                raise ValueError(f"{interval} bars cannot be built from {self.base_interval} bars")
+        self.calendar = calendar or TradingCalendar()
+        self.capacity = capacity or config.STREAM_BUFFER_SIZE
+        self.buffers = {interval: BarRingBuffer(self.capacity, self.calendar.timezone) for interval in self.intervals}
+        self.engines = {
+            interval: IndicatorEngine(history=self.capacity, **indicator_params) for interval in self.intervals
+        }
+        self.partial = {interval: None for interval in self.intervals}
+        self.last_base = None
+        self.sessions = {}
+        self.base_step = pd.Timedelta(minutes=base_minutes)
+        self.lock = threading.Lock()
+        self.late_bars = 0
+        self.incomplete_bars = 0
+
+    def bar_start(self, timestamp, interval=None):
+        """Start of the session-aligned bar containing `timestamp`, or None outside the session"""
+        interval = interval or self.base_interval
+        timestamp = self._timestamp(timestamp)
+        day = timestamp.date()
+        if day not in self.sessions:
+            self.sessions[day] = self.calendar.session(day)
+        session = self.sessions[day]
+        if session is None or not session[0] <= timestamp < session[1]:
+            return None
+        step = pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+        return session[0] + ((timestamp - session[0]) // step) * step
+
+    def is_current(self, now=None):
+        """Whether the newest base bar is the last one to have closed by `now` (an earlier session's is not)"""
+        now = self._timestamp(pd.Timestamp.now(tz=self.calendar.timezone) if now is None else now)
+        expected = self.bar_start(now - self.base_step)
+        return expected is not None and self.last_base is not None and self.last_base >= expected
+
+    def _timestamp(self, timestamp):
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is None:
+            return timestamp.tz_localize(self.calendar.timezone)
+        return timestamp.tz_convert(self.calendar.timezone)
+
+    def update(self, timestamp, open_, high, low, close, volume):
+        """
+        Add (or revise) one base bar, given by its start time. Returns the
+        intervals whose previous bar closed because of it.
+        """
+        timestamp = self._timestamp(timestamp)
+        bar = (float(open_), float(high), float(low), float(close), float(volume))
+        closed = []
+        with self.lock:
+            if self.last_base is not None and timestamp < self.last_base:
+                # Older than a base bar already folded in; history is append-only
+                self.late_bars += 1
+                return closed
+            for interval in self.intervals:
+                start = self.bar_start(timestamp, interval)
+                if start is None:
+                    continue
+                partial = self.partial[interval]
+                if partial is not None and partial.start != start:
+                    if self._close(interval, partial):
+                        closed.append(interval)
+                    partial = None
+                if partial is None:
+                    end = min(start + pd.Timedelta(minutes=INTERVAL_MINUTES[interval]), self.sessions[start.date()][1])
+                    partial = self.partial[interval] = _Partial(start, end)
+                partial.add(timestamp, bar, self.base_step)
+            self.last_base = timestamp
+        return closed
+
+    def _close(self, interval, partial):
+        """Move a finished coarser bar into the history; False if it had to be dropped"""
+        if not partial.finished(self.base_step):
+            self.incomplete_bars += 1
+            return False
+        o, h, l, c, v = partial.aggregate()
+        self.buffers[interval].append(partial.start.value, o, h, l, c, v)
+        self.engines[interval].update(partial.start, o, h, l, c, v)
+        return True
+
+    def update_frame(self, df):
+        """Feed the rows of an OHLCV DataFrame from the newest base bar onwards"""
+        if df is None or len(df) == 0:
+            return []
+        if self.last_base is not None:
+            index = pd.DatetimeIndex(df.index)
+            index = index.tz_localize(self.calendar.timezone) if index.tz is None else index
+            df = df[index >= self.last_base]
+        closed = []
+        for timestamp, o, h, l, c, v in zip(df.index, *(df[column].values for column in OHLCV)):
+            closed.extend(self.update(timestamp, o, h, l, c, v))
+        return closed
+
+    def frame(self, interval, last=None, include_partial=True):
+        """
+        OHLCV bars for an interval with the IndicatorEngine columns (VWAP,
+        EMAs, MACD, Bollinger, RSI, ATR, ADX), oldest first. The in-progress
+        bar is the last row unless include_partial is False.
+        """
+        with self.lock:
+            engine = self.engines[interval]
+            bars = self.buffers[interval].to_frame(last)
+            history = list(engine.history)[-len(bars):] if len(bars) else []
+            rows = [values for _, values in history]
+            index = [timestamp for timestamp, _ in history]
+            partial = self.partial[interval] if include_partial else None
+            if partial is not None and partial.complete:
+                bar = partial.aggregate()
+                rows.append(engine.preview(partial.start, *bar))
+                index.append(partial.start)
+                bars = pd.concat([bars, pd.DataFrame([bar], index=[partial.start], columns=OHLCV)])
+        if len(bars) == 0:
+            return None
+        indicators = pd.DataFrame.from_records(rows, index=pd.DatetimeIndex(index)) if rows else None
+        return bars if indicators is None else bars.join(indicators)
+
+    def timeframe_data(self, interval):
+        """
+        The newest bar of an interval as the per-timeframe dict built from
+        TradingView analyses (build_timeframe_data), with SMAs, Stochastic
+        (14, 3, 3) and the ratings computed from local bars. None until the
+        interval has a bar.
+        """
+        df = self.frame(interval, last=200)
+        if df is None:
+            return None
+        close = df['Close']
+        current = df.iloc[-1]
+        previous = df.iloc[-2] if len(df) > 1 else current
+
+        lowest = df['Low'].rolling(14).min()
+        highest = df['High'].rolling(14).max()
+        raw_k = 100 * (close - lowest) / (highest - lowest).replace(0, np.nan)
+        stoch_k = raw_k.rolling(3).mean()
+        stoch_d = stoch_k.rolling(3).mean()
+
+        def sma(period):
+            return close.iloc[-period:].mean() if len(close) >= period else np.nan
+
+        data = {
+            'close': current['Close'],
+            'open': current['Open'],
+            'high': current['High'],
+            'low': current['Low'],
+            'volume': current['Volume'],
+            'RSI': current['RSI'],
+            'RSI[1]': previous['RSI'],
+            'EMA20': current.get('EMA20', np.nan),
+            'EMA50': current.get('EMA50', np.nan),
+            'EMA200': current.get('EMA200', np.nan),
+            'SMA20': sma(20),
+            'SMA50': sma(50),
+            'SMA200': sma(200),
+            'BB.upper': current['BB_Upper'],
+            'BB.lower': current['BB_Lower'],
+            'BB.middle': current['BB_Middle'],
+            'MACD.macd': current['MACD'],
+            'MACD.signal': current['MACD_Signal'],
+            'ADX': current['ADX'],
+            'ADX+': current['DI_Plus'],
+            'ADX-': current['DI_Minus'],
+            'Stoch.K': stoch_k.iloc[-1],
+            'Stoch.D': stoch_d.iloc[-1],
+            'ATR': current['ATR'],
+            'VWAP': current['VWAP']
+        }
+        data = {key: float(value) for key, value in data.items()}
+        summary, moving_averages, oscillators = rate_timeframe(data)
+        data.update({
+            'recommendation': summary['RECOMMENDATION'],
+            'oscillator_summary': oscillators['RECOMMENDATION'],
+            'ma_summary': moving_averages['RECOMMENDATION']
+        })
+        return data
+
+    def ratings(self, interval):
+        """(summary, moving_averages, oscillators) for the newest bar of an interval"""
+        data = self.timeframe_data(interval)
+        return rate_timeframe(data) if data is not None else (None, None, None)
@@ -0,0 +1,359 @@
+import ast
+import re
+import numpy as np
+import pandas as pd
+from .. import config
+from ..scheduling.trading_calendar import INTERVAL_MINUTES
+
+__all__ = ['RuleSet', 'RuleResult', 'compile_expression', 'normalize_fields', 'analysis_fields',
+           'align_timeframes', 'get_rule_set']
+
+# Indicator names from TradingView analyses and compute_indicators() mapped to rule field names
+ALIASES = {
+    'Open': 'open', 'High': 'high', 'Low': 'low', 'Close': 'close', 'Volume': 'volume',
+    'MACD.macd': 'MACD', 'MACD.signal': 'MACD_signal', 'MACD_Signal': 'MACD_signal',
+    'ADX+DI': 'ADX_plus', 'ADX-DI': 'ADX_minus', 'ADX+': 'ADX_plus', 'ADX-': 'ADX_minus',
+    'DI_Plus': 'ADX_plus', 'DI_Minus': 'ADX_minus',
+    'Stoch.K': 'Stoch_K', 'Stoch.D': 'Stoch_D',
+    'BB.upper': 'BB_upper', 'BB.lower': 'BB_lower', 'BB.middle': 'BB_middle',
+    'BB_Upper': 'BB_upper', 'BB_Lower': 'BB_lower', 'BB_Middle': 'BB_middle',
+    'ma_summary': 'ma_recommendation', 'oscillator_summary': 'oscillator_recommendation'
+}
+
+FUNCTIONS = {'abs': np.abs, 'sign': np.sign, 'min': np.minimum, 'max': np.maximum}
+
+_LAGGED = re.compile(r'^(.*)\[(\d+)\]$')
+
+
+def _alias(key):
+    match = _LAGGED.match(key)
+    if match:
+        return f"{ALIASES.get(match.group(1), match.group(1))}[{match.group(2)}]"
+    return ALIASES.get(key, key)
+
+
+def normalize_fields(source):
+    """
+    Rule fields from a dict (build_timeframe_data / indicator dicts), a
+    DataFrame (one array per column), a NumPy structured record or array
+    (timeframe snapshots) or a tradingview_ta Analysis.
+    """
+    if hasattr(source, 'indicators') and hasattr(source, 'summary'):
+        return analysis_fields(source)
+    if isinstance(source, pd.DataFrame):
+        return {_alias(column): source[column].to_numpy() for column in source.columns}
+    if _is_structured(source):
+        return {_alias(name): source[name] for name in source.dtype.names}
+    return {_alias(key): value for key, value in source.items()}
+
+
+def _is_structured(value):
+    return isinstance(value, (np.ndarray, np.void)) and value.dtype.names is not None
+
+
+def analysis_fields(analysis):
+    """Fields of a tradingview_ta Analysis: its indicators plus the three recommendations"""
+    fields = normalize_fields(analysis.indicators)
+    fields['recommendation'] = analysis.summary.get('RECOMMENDATION', 'NEUTRAL')
+    fields['ma_recommendation'] = analysis.moving_averages.get('RECOMMENDATION', 'NEUTRAL')
+    fields['oscillator_recommendation'] = analysis.oscillators.get('RECOMMENDATION', 'NEUTRAL')
+    return fields
+
+
+def align_timeframes(frames, base=None, lags=(1,)):
+    """
+    Fields of several timeframes' indicator frames ({timeframe: DataFrame
+    indexed by bar start}) on the bars of the base timeframe, for scoring a
+    whole history in one evaluate() call. Each base bar sees the latest
+    higher-timeframe bar that had closed by its own close, so there is no
+    look-ahead; "name[k]" lags refer to earlier bars of the field's own
+    timeframe.
+    """
+    base = base or config.BASE_INTERVAL
+    index = pd.DatetimeIndex(frames[base].index)
+    closes = index + pd.Timedelta(minutes=INTERVAL_MINUTES[base])
+    aligned = {}
+    for timeframe, frame in frames.items():
+        frame_closes = pd.DatetimeIndex(frame.index) + pd.Timedelta(minutes=INTERVAL_MINUTES[timeframe])
+        position = frame_closes.searchsorted(closes, side='right') - 1
+        if timeframe == base:
+            position = np.arange(len(index))
+        fields = {}
+        for name, values in normalize_fields(frame).items():
+            values = np.asarray(values)
+            numeric = values.dtype.kind in 'fiub'
+            for lag in (0,) + tuple(lags):
+                source = position - lag
+                column = np.full(len(index), np.nan if numeric else None, dtype=float if numeric else object)
+                valid = source >= 0
+                column[valid] = values[source[valid]]
+                fields[name if lag == 0 else f"{name}[{lag}]"] = column
+        aligned[timeframe] = fields
+    return aligned
+
+
+class _Compiler(ast.NodeTransformer):
+    """Rewrite a rule expression into element-wise NumPy operations"""
+
+    def __init__(self):
+        self.fields = set()
+
+    def _field(self, name, lag=0):
+        self.fields.add((name, lag))
+        return ast.Call(ast.Name('_field', ast.Load()), [ast.Constant(name), ast.Constant(lag)], [])
+
+    def _call(self, name, *args):
+        return ast.Call(ast.Name(name, ast.Load()), list(args), [])
+
+    def _combine(self, op, values):
+        result = values[0]
+        for value in values[1:]:
+            result = ast.BinOp(result, op, value)
+        return result
+
+    def visit_Expression(self, node):
+        return ast.Expression(self.visit(node.body))
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (int, float, str, bool)):
+            raise ValueError(f"Unsupported constant: {node.value!r}")
+        return node
+
+    def visit_Name(self, node):
+        if node.id in ('True', 'False'):
+            return ast.Constant(node.id == 'True')
+        return self._field(node.id)
+
+    def visit_Subscript(self, node):
+        # RSI[1] is the previous bar's RSI
+        if not isinstance(node.value, ast.Name) or not isinstance(node.slice, ast.Constant) \
+                or not isinstance(node.slice.value, int):
+            raise ValueError("Only name[lag] subscripts are supported")
+        return self._field(node.value.id, node.slice.value)
+
+    def visit_BoolOp(self, node):
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        return self._combine(op, [self._call('_bool', self.visit(value)) for value in node.values])
+
+    def visit_UnaryOp(self, node):
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(ast.Invert(), self._call('_bool', self.visit(node.operand)))
+        if isinstance(node.op, (ast.USub, ast.UAdd)):
+            return ast.UnaryOp(node.op, self.visit(node.operand))
+        raise ValueError("Unsupported unary operator")
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div)):
+            raise ValueError("Only + - * / are supported")
+        return ast.BinOp(self.visit(node.left), node.op, self.visit(node.right))
+
+    def visit_Compare(self, node):
+        # a < b < c becomes (a < b) & (b < c); "x in (...)" becomes np.isin
+        parts = []
+        left = self.visit(node.left)
+        for op, comparator in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                if not isinstance(comparator, (ast.Tuple, ast.List)):
+                    raise ValueError("'in' needs a literal tuple or list")
+                choices = ast.Tuple([self.visit(element) for element in comparator.elts], ast.Load())
+                part = self._call('_isin', left, choices)
+                if isinstance(op, ast.NotIn):
+                    part = ast.UnaryOp(ast.Invert(), part)
+                parts.append(part)
+                continue
+            if not isinstance(op, (ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq)):
+                raise ValueError("Unsupported comparison")
+            right = self.visit(comparator)
+            parts.append(ast.Compare(left, [op], [right]))
+            left = right
+        return self._combine(ast.BitAnd(), parts)
+
+    def visit_IfExp(self, node):
+        return self._call('_where', self.visit(node.test), self.visit(node.body), self.visit(node.orelse))
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+            raise ValueError(f"Unsupported function; available: {', '.join(FUNCTIONS)}")
+        return self._call(node.func.id, *[self.visit(arg) for arg in node.args])
+
+    def generic_visit(self, node):
+        raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+
+def _bool(value):
+    return np.asarray(value, dtype=bool) if not isinstance(value, np.ndarray) or value.dtype != bool else value
+
+
+def _isin(value, choices):
+    return np.isin(value, choices)
+
+
+def _where(condition, a, b):
+    return np.where(_bool(condition), a, b)
+
+
+def compile_expression(expression):
+    """
+    Compile a rule expression into fn(field) -> array, plus the (name, lag)
+    fields it reads. Expressions use indicator names, name[lag], arithmetic,
+    comparisons (chained too), and/or/not, `in (...)`, `a if cond else b`
+    and abs/sign/min/max, e.g. "RSI > 60 and RSI > RSI[1]".
+    """
+    if isinstance(expression, (int, float)):
+        return (lambda field: expression), set()
+    compiler = _Compiler()
+    tree = compiler.visit(ast.parse(expression, mode='eval'))
+    body = ast.fix_missing_locations(ast.Expression(ast.Lambda(
+        ast.arguments([], [ast.arg('_field')], None, [], [], None, []), tree.body)))
+    namespace = dict(FUNCTIONS, _bool=_bool, _isin=_isin, _where=_where, __builtins__={})
+    return eval(compile(body, f"<rule: {expression}>", 'eval'), namespace), compiler.fields
+
+
+class _Rule:
+    def __init__(self, spec):
+        self.when = spec['when']
+        self.condition, fields = compile_expression(spec['when'])
+        self.adds = {}
+        for target, score in spec['add'].items():
+            function, score_fields = compile_expression(score)
+            self.adds[target] = function
+            fields |= score_fields
+        self.fields = fields
+        self.reason = spec.get('reason')
+
+
+class RuleResult:
+    """Scores from RuleSet.evaluate: totals per target plus which rules fired where"""
+
+    def __init__(self, rule_set, timeframes, totals, hits, fields):
+        self.rule_set = rule_set
+        self.timeframes = timeframes
+        self.totals = totals        # target -> array over (symbols, bars) or scalar
+        self.hits = hits            # per rule: bool array over (timeframes, ...)
+        self.fields = fields        # (name, lag) -> stacked array over (timeframes, ...)
+
+    def __getitem__(self, target):
+        return self.totals.get(target, 0.0)
+
+    def reasons(self, index=()):
+        """Reason strings of the rules that fired at one element, timeframe by timeframe"""
+        reasons = []
+        for t, timeframe in enumerate(self.timeframes):
+            values = {name if lag == 0 else f"{name}[{lag}]": _item(array, (t,) + tuple(index))
+                      for (name, lag), array in self.fields.items()}
+            for rule, hit in zip(self.rule_set.rules, self.hits):
+                if rule.reason and _item(hit, (t,) + tuple(index)):
+                    reasons.append(rule.reason.format(tf=timeframe, **values).strip())
+        return reasons
+
+
+def _item(array, index):
+    array = np.asarray(array)
+    index = index[:array.ndim]
+    value = array[index] if index else array
+    return value.item() if isinstance(value, np.generic) or getattr(value, 'ndim', 1) == 0 else value
+
+
+class RuleSet:
+    """
+    Declarative scoring rules compiled to vectorized expressions.
+
+    A rule set is {'rules': [{'when': expr, 'add': {target: score}, 'reason':
+    template}, ...], 'weights': {timeframe: weight}, 'unweighted': [targets],
+    'extends': other rule set}. Every rule adds its score (a number or an
+    expression) to each target wherever `when` holds. evaluate() takes one
+    field dict (or snapshot record), or one per timeframe, whose values may
+    be scalars (a live snapshot) or arrays over symbols and bars; the
+    timeframes are stacked and each rule is evaluated once over the whole
+    (timeframe, symbol, bar) block.
+    Targets are summed over timeframes with the weights (plain sums for
+    `unweighted` targets).
+    """
+
+    def __init__(self, spec, name=None):
+        if 'extends' in spec:
+            base = config.SIGNAL_RULES[spec['extends']]
+            spec = dict(base, **{key: value for key, value in spec.items() if key != 'rules'},
+                        rules=list(base['rules']) + list(spec.get('rules', [])))
+        self.name = name
+        self.rules = [_Rule(rule) for rule in spec['rules']]
+        self.weights = spec.get('weights')
+        self.unweighted = set(spec.get('unweighted', []))
+        self.targets = list(dict.fromkeys(target for rule in self.rules for target in rule.adds))
+        self.fields = set().union(*(rule.fields for rule in self.rules))
+        self.depth = 1 + max((lag for name, lag in self.fields), default=0)  # bars of history read
+
+    def _stack(self, data, shared):
+        """(timeframes, {(name, lag): array with a leading timeframe axis})"""
+        if self.weights is not None and isinstance(data, dict) and all(
+                isinstance(value, dict) or _is_structured(value) for value in data.values()):
+            timeframes = [timeframe for timeframe in self.weights if timeframe in data]
+            per_timeframe = [normalize_fields(data[timeframe]) for timeframe in timeframes]
+        else:
+            timeframes = [None]
+            per_timeframe = [normalize_fields(data)]
+        shared = normalize_fields(shared or {})
+
+        values = {key: [self._lookup(fields, shared, *key) for fields in per_timeframe]
+                  for key in sorted(self.fields)}
+        # Scalars (a snapshot, or a field missing from one timeframe) broadcast over symbols and bars
+        shape = np.broadcast_shapes(*(np.shape(value) for column in values.values() for value in column))
+        columns = {key: np.stack([np.broadcast_to(value, shape) for value in column])
+                   for key, column in values.items()}
+        return timeframes, columns
+
+    def _lookup(self, fields, shared, name, lag):
+        for source in (fields, shared):
+            if lag and f"{name}[{lag}]" in source:
+                return np.asarray(source[f"{name}[{lag}]"])
+            if name in source:
+                value = np.asarray(source[name])
+                if lag == 0:
+                    return value
+                if value.ndim == 0:
+                    break
+                # Arrays hold history along the last axis: shift it by the lag
+                numeric = value.dtype.kind in 'fiub'
+                lagged = np.full(value.shape, np.nan if numeric else None, dtype=float if numeric else object)
+                lagged[..., lag:] = value[..., :-lag]
+                return lagged
+        return np.asarray(np.nan)
+
+    def evaluate(self, data, shared=None):
+        """
+        Score `data` ({field: value} or {timeframe: {field: value}}); `shared`
+        fields apply to every timeframe (e.g. the live price). Returns a RuleResult.
+        """
+        timeframes, columns = self._stack(data, shared)
+
+        def field(name, lag):
+            return columns[(name, lag)]
+
+        weights = np.array([self.weights[tf] if tf is not None else 1.0 for tf in timeframes])
+        shape = np.broadcast_shapes(*(array.shape for array in columns.values())) if columns else (len(timeframes),)
+        totals = {target: np.zeros(shape) for target in self.targets}
+        hits = []
+        with np.errstate(all='ignore'):
+            for rule in self.rules:
+                hit = np.broadcast_to(_bool(rule.condition(field)), shape)
+                hits.append(hit)
+                for target, score in rule.adds.items():
+                    totals[target] = totals[target] + np.where(hit, score(field), 0.0)
+
+        for target, total in totals.items():
+            if target in self.unweighted:
+                total = total.sum(axis=0)
+            else:
+                total = np.tensordot(weights, total, axes=(0, 0))
+            totals[target] = total.item() if total.ndim == 0 else total
+        return RuleResult(self, timeframes, totals, hits, columns)
+
+
+_rule_sets = {}
+
+
+def get_rule_set(name):
+    """Compiled rule set from config.SIGNAL_RULES (compiled once per process)"""
+    if name not in _rule_sets:
+        _rule_sets[name] = RuleSet(config.SIGNAL_RULES[name], name)
+    return _rule_sets[name]
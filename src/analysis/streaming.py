@@ -0,0 +1,300 @@
+import copy
+import math
+from collections import deque
+import numpy as np
+import pandas as pd
+
+__all__ = ['IndicatorEngine', 'compute_indicators', 'session_vwap', 'TOLERANCE']
+
+# Streaming values agree with compute_indicators() to this tolerance, measured
+# as |stream - batch| / max(1, |batch|).
+# Both use SMA-seeded EMAs and Wilder smoothing (the TA-Lib convention);
+# pandas_ta's adjust=True RMA converges to the same values after ~10x period bars.
+TOLERANCE = 1e-9
+
+
+class _EMA:
+    """Exponential moving average seeded with the SMA of the first `period` values"""
+
+    def __init__(self, period, alpha=None):
+        self.period = period
+        self.alpha = alpha if alpha is not None else 2.0 / (period + 1)
+        self.count = 0
+        self.total = 0.0
+        self.value = None
+
+    def update(self, x):
+        if self.value is None:
+            self.count += 1
+            self.total += x
+            if self.count == self.period:
+                self.value = self.total / self.period
+            return self.value
+        self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class _Wilder(_EMA):
+    """Wilder's smoothing (RMA): an SMA-seeded EMA with alpha = 1 / period"""
+
+    def __init__(self, period):
+        super().__init__(period, alpha=1.0 / period)
+
+
+class _RollingWindow:
+    """Rolling mean/std over a fixed window with O(1) updates"""
+
+    def __init__(self, period):
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.shift = None  # Accumulate around the first value to limit cancellation
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def update(self, x):
+        if self.shift is None:
+            self.shift = x
+        if len(self.values) == self.period:
+            old = self.values[0] - self.shift
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(x)
+        centred = x - self.shift
+        self.total += centred
+        self.total_sq += centred * centred
+        if len(self.values) < self.period:
+            return None, None
+        mean = self.total / self.period
+        variance = max(self.total_sq / self.period - mean * mean, 0.0)
+        return mean + self.shift, math.sqrt(variance)
+
+
+class IndicatorEngine:
+    """
+    Incremental VWAP, EMA, RSI, MACD, ATR, ADX and Bollinger Bands.
+
+    Call update() once per closed bar; each call costs O(1) and the state per
+    indicator is a few floats (Bollinger keeps its `bb_period` window). Call
+    preview() with the in-progress bar on every tick to get the values the bar
+    would produce if it closed now, without committing it.
+    """
+
+    def __init__(self, ema_periods=(20, 50, 200), rsi_period=14, macd_fast=12, macd_slow=26,
+                 macd_signal=9, atr_period=14, adx_period=14, bb_period=20, bb_std=2.0,
+                 vwap_session_reset=True, history=500):
+        self.ema_periods = tuple(ema_periods)
+        self.adx_period = adx_period
+        self.bb_std = bb_std
+        self.vwap_session_reset = vwap_session_reset
+
+        self.emas = {period: _EMA(period) for period in self.ema_periods}
+        self.rsi_gain = _Wilder(rsi_period)
+        self.rsi_loss = _Wilder(rsi_period)
+        self.macd_fast = _EMA(macd_fast)
+        self.macd_slow = _EMA(macd_slow)
+        self.macd_signal = _EMA(macd_signal)
+        self.atr = _Wilder(atr_period)
+        self.tr_smooth = _Wilder(adx_period)
+        self.plus_dm_smooth = _Wilder(adx_period)
+        self.minus_dm_smooth = _Wilder(adx_period)
+        self.adx = _Wilder(adx_period)
+        self.bollinger = _RollingWindow(bb_period)
+
+        self.session = None
+        self.cum_pv = 0.0
+        self.cum_volume = 0.0
+        self.prev_high = None
+        self.prev_low = None
+        self.prev_close = None
+
+        self.last_timestamp = None
+        self.last_values = None
+        self.history = deque(maxlen=history)  # (timestamp, values) of recent closed bars
+
+    def update(self, timestamp, open_, high, low, close, volume):
+        """Commit a closed bar and return its indicator values"""
+        values = self._step(timestamp, high, low, close, volume)
+        self.last_timestamp = timestamp
+        self.last_values = values
+        self.history.append((timestamp, values))
+        return values
+
+    def preview(self, timestamp, open_, high, low, close, volume):
+        """Return the values for an unfinished bar without changing the engine state"""
+        state = copy.copy(self)
+        for name in ('emas', 'rsi_gain', 'rsi_loss', 'macd_fast', 'macd_slow', 'macd_signal', 'atr',
+                     'tr_smooth', 'plus_dm_smooth', 'minus_dm_smooth', 'adx', 'bollinger'):
+            setattr(state, name, copy.deepcopy(getattr(self, name)))
+        return state._step(timestamp, high, low, close, volume)
+
+    def _step(self, timestamp, high, low, close, volume):
+        values = {}
+
+        # VWAP, reset at the start of every trading day
+        session = getattr(timestamp, 'date', lambda: None)() if self.vwap_session_reset else None
+        if session != self.session:
+            self.session = session
+            self.cum_pv = 0.0
+            self.cum_volume = 0.0
+        self.cum_pv += (high + low + close) / 3 * volume
+        self.cum_volume += volume
+        values['VWAP'] = self.cum_pv / self.cum_volume if self.cum_volume else np.nan
+
+        for period, ema in self.emas.items():
+            values[f'EMA{period}'] = _nan(ema.update(close))
+
+        # MACD line is defined once the slow EMA is seeded; the signal is an EMA of it
+        fast = self.macd_fast.update(close)
+        slow = self.macd_slow.update(close)
+        macd = signal = None
+        if fast is not None and slow is not None:
+            macd = fast - slow
+            signal = self.macd_signal.update(macd)
+        values['MACD'] = _nan(macd)
+        values['MACD_Signal'] = _nan(signal)
+        values['MACD_Hist'] = macd - signal if signal is not None else np.nan
+
+        mean, std = self.bollinger.update(close)
+        values['BB_Middle'] = _nan(mean)
+        values['BB_Upper'] = mean + self.bb_std * std if mean is not None else np.nan
+        values['BB_Lower'] = mean - self.bb_std * std if mean is not None else np.nan
+
+        rsi = atr = adx = plus_di = minus_di = None
+        if self.prev_close is not None:
+            change = close - self.prev_close
+            avg_gain = self.rsi_gain.update(max(change, 0.0))
+            avg_loss = self.rsi_loss.update(max(-change, 0.0))
+            if avg_gain is not None:
+                total = avg_gain + avg_loss
+                rsi = 100 * avg_gain / total if total else 50.0
+
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+            atr = self.atr.update(true_range)
+
+            up_move = high - self.prev_high
+            down_move = self.prev_low - low
+            plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+            minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+            tr_avg = self.tr_smooth.update(true_range)
+            plus_avg = self.plus_dm_smooth.update(plus_dm)
+            minus_avg = self.minus_dm_smooth.update(minus_dm)
+            if tr_avg:
+                plus_di = 100 * plus_avg / tr_avg
+                minus_di = 100 * minus_avg / tr_avg
+                di_total = plus_di + minus_di
+                dx = 100 * abs(plus_di - minus_di) / di_total if di_total else 0.0
+                adx = self.adx.update(dx)
+
+        values['RSI'] = _nan(rsi)
+        values['ATR'] = _nan(atr)
+        values['ADX'] = _nan(adx)
+        values['DI_Plus'] = _nan(plus_di)
+        values['DI_Minus'] = _nan(minus_di)
+
+        self.prev_high = high
+        self.prev_low = low
+        self.prev_close = close
+        return values
+
+    def update_frame(self, df):
+        """
+        Feed the rows of an OHLCV DataFrame that are newer than the last committed
+        bar and return indicator columns for the rows still held in history.
+        Rows older than the engine's history come back as NaN.
+        """
+        if df is None or len(df) == 0:
+            return None
+
+        new_rows = df if self.last_timestamp is None else df[df.index > self.last_timestamp]
+        for timestamp, o, h, l, c, v in zip(new_rows.index, new_rows['Open'].values, new_rows['High'].values,
+                                            new_rows['Low'].values, new_rows['Close'].values,
+                                            new_rows['Volume'].values):
+            self.update(timestamp, float(o), float(h), float(l), float(c), float(v))
+
+        recent = pd.DataFrame.from_records(
+            [values for _, values in self.history],
+            index=[timestamp for timestamp, _ in self.history]
+        )
+        return recent.reindex(df.index)
+
+
+def _nan(value):
+    return np.nan if value is None else value
+
+
+def _seeded_ewm(series, period, alpha):
+    """Vectorized SMA-seeded EMA matching _EMA over the valid part of `series`"""
+    result = pd.Series(np.nan, index=series.index)
+    valid = series.dropna()
+    if len(valid) < period:
+        return result
+    seeded = valid.copy()
+    seeded.iloc[:period - 1] = np.nan
+    seeded.iloc[period - 1] = valid.iloc[:period].mean()
+    result.loc[valid.index] = seeded.ewm(alpha=alpha, adjust=False, ignore_na=True).mean()
+    return result
+
+
+def session_vwap(df, session_reset=True):
+    """Vectorized VWAP of an OHLCV DataFrame, restarting every trading day when the index has dates"""
+    pv = (df['High'] + df['Low'] + df['Close']) / 3 * df['Volume']
+    if session_reset and isinstance(df.index, pd.DatetimeIndex):
+        # Local calendar day number; integer keys keep the groupby cheap
+        days = df.index.tz_localize(None).values.astype('datetime64[D]').astype(np.int64)
+        totals = pd.DataFrame({'pv': pv, 'volume': df['Volume']}).groupby(days).cumsum()
+        return totals['pv'] / totals['volume']
+    return pv.cumsum() / df['Volume'].cumsum()
+
+
+def compute_indicators(df, ema_periods=(20, 50, 200), rsi_period=14, macd_fast=12, macd_slow=26,
+                       macd_signal=9, atr_period=14, adx_period=14, bb_period=20, bb_std=2.0,
+                       vwap_session_reset=True):
+    """Batch (vectorized) reference for IndicatorEngine over a whole OHLCV DataFrame"""
+    if df is None or len(df) == 0:
+        return None
+
+    high, low, close, volume = df['High'], df['Low'], df['Close'], df['Volume']
+    out = pd.DataFrame(index=df.index)
+
+    out['VWAP'] = session_vwap(df, vwap_session_reset)
+
+    for period in ema_periods:
+        out[f'EMA{period}'] = _seeded_ewm(close, period, 2.0 / (period + 1))
+
+    macd = _seeded_ewm(close, macd_fast, 2.0 / (macd_fast + 1)) - _seeded_ewm(close, macd_slow, 2.0 / (macd_slow + 1))
+    signal = _seeded_ewm(macd, macd_signal, 2.0 / (macd_signal + 1))
+    out['MACD'] = macd
+    out['MACD_Signal'] = signal
+    out['MACD_Hist'] = macd - signal
+
+    mean = close.rolling(bb_period).mean()
+    std = close.rolling(bb_period).std(ddof=0)
+    out['BB_Middle'] = mean
+    out['BB_Upper'] = mean + bb_std * std
+    out['BB_Lower'] = mean - bb_std * std
+
+    change = close.diff()
+    avg_gain = _seeded_ewm(change.clip(lower=0), rsi_period, 1.0 / rsi_period)
+    avg_loss = _seeded_ewm((-change).clip(lower=0), rsi_period, 1.0 / rsi_period)
+    total = avg_gain + avg_loss
+    out['RSI'] = (100 * avg_gain / total).where(total != 0, 50.0).where(total.notna())
+
+    prev_close = close.shift(1)
+    true_range = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+    true_range = true_range.where(prev_close.notna())
+    out['ATR'] = _seeded_ewm(true_range, atr_period, 1.0 / atr_period)
+
+    up_move = high.diff()
+    down_move = -low.diff()
+    plus_dm = up_move.where((up_move > down_move) & (up_move > 0), 0.0).where(up_move.notna())
+    minus_dm = down_move.where((down_move > up_move) & (down_move > 0), 0.0).where(down_move.notna())
+    tr_avg = _seeded_ewm(true_range, adx_period, 1.0 / adx_period)
+    plus_di = 100 * _seeded_ewm(plus_dm, adx_period, 1.0 / adx_period) / tr_avg
+    minus_di = 100 * _seeded_ewm(minus_dm, adx_period, 1.0 / adx_period) / tr_avg
+    di_total = plus_di + minus_di
+    dx = (100 * (plus_di - minus_di).abs() / di_total).where(di_total != 0, 0.0).where(di_total.notna())
+    out['ADX'] = _seeded_ewm(dx, adx_period, 1.0 / adx_period)
+    out['DI_Plus'] = plus_di
+    out['DI_Minus'] = minus_di
+
+    return out
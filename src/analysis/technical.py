@@ -1,19 +1,40 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import yfinance as yf
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from .. import config
-from scipy.stats import norm
-from sklearn.cluster import KMeans
-import requests
-import json
-import openai
+from ..capabilities import require, available
+from ..data_collectors.bar_store import BarStore
+from ..data_collectors.nse_session import get_nse_session
+from ..data_collectors.option_chain import fetch_option_chain, OPTION_CHAIN_URL
+from ..data_collectors.recorder import get_recorder
+from ..monitoring.metrics import span
+from ..scheduling.trading_calendar import INTERVAL_MINUTES
+from .options import suggest_by_delta
+from .streaming import session_vwap
+from .volume_profile import VolumeProfile
+from .levels import PriceLevels
+from .candlesticks import latest_patterns
+from .divergence import detect_divergences
+from .rules import get_rule_set
+from ..alerts.dispatcher import get_dispatcher
+from ..alerts.channels import SMTPChannel
 
 __all__ = ['TechnicalAnalyzer']
 
+# Calendar days covered by each yfinance period ('1d'/'5d' count trading sessions)
+PERIOD_DAYS = {
+    '1mo': 31, '3mo': 92, '6mo': 183, '1y': 366, '2y': 731, '5y': 1827, '10y': 3653
+}
+
+# Yahoo Finance ticker of the NIFTY 50 index
+NIFTY_SYMBOL = "^NSEI"
+
+# NSE market status; also carries the India VIX quote
+MARKET_STATUS_URL = "https://www.nseindia.com/api/marketStatus"
+
+# Sign of a rule set's 'direction' total
+DIRECTIONS = {1: 'bullish', -1: 'bearish', 0: 'neutral'}
+
 # Email configuration
 EMAIL_CONFIG = {
     'smtp_server': 'smtp.gmail.com',
@@ -30,26 +51,38 @@ class TechnicalAnalyzer:
         self.weights = {"5m": 0.5, "15m": 0.3, "1h": 0.2}  # Weight by importance
         self.last_alert_time = None
         self.alert_cooldown_minutes = 30  # Minimum time between alerts
-        self.nse_headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json, text/javascript, */*; q=0.01',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-        }
+        self.bar_store = BarStore()  # Local OHLCV history
+        self.price_levels = PriceLevels()  # Support/resistance, updated as bars arrive
         
     def fetch_nifty_data(self, interval='1d', period='1mo'):
         """
-        Fetch NIFTY 50 data using yfinance
+        Fetch NIFTY 50 data, served from the local bar store when it already
+        covers the period (only bars newer than the last stored one are downloaded)
         interval: 1m,2m,5m,15m,30m,60m,90m,1h,1d,5d,1wk,1mo,3mo
         period: 1d,5d,1mo,3mo,6mo,1y,2y,5y,10y,max
         """
+        symbol = NIFTY_SYMBOL
         try:
-            # Fetch from Yahoo Finance
-            nifty = yf.Ticker("^NSEI")
-            df = nifty.history(period=period, interval=interval)
+            nifty = require('yfinance').Ticker(symbol)
+            first = self.bar_store.first_timestamp(symbol, interval)
+            last = self.bar_store.last_timestamp(symbol, interval)
+            start = self._period_start(symbol, interval, period)
+            
+            if first is not None and start is not None and first <= start:
+                # Local history covers the period - top it up with the newest bars
+                try:
+                    df = nifty.history(start=last, interval=interval)
+                except Exception as e:
+                    print(f"Could not refresh NIFTY data, using local history: {str(e)}")
+                    df = None
+            else:
+                df = nifty.history(period=period, interval=interval)
             
-            if df.empty:
+            if df is not None and not df.empty:
+                self.bar_store.append(symbol, interval, df)
+                
+            df = self.bar_store.read(symbol, interval, start=self._period_start(symbol, interval, period))
+            if df is None or df.empty:
                 return None
                 
             return df
@@ -58,16 +91,52 @@ class TechnicalAnalyzer:
             print(f"Error fetching NIFTY data: {str(e)}")
             return None
             
+    def fetch_completed_bars(self, interval=None, since=None, period=None):
+        """
+        Stored NIFTY bars that have closed, oldest first: the last
+        config.RESAMPLE_WARMUP_BARS, or those from `since` on. The store is
+        topped up from Yahoo first when yfinance is installed. The newest
+        downloaded bar is usually still forming and is left out until it ends.
+        """
+        interval = interval or config.BASE_INTERVAL
+        if available('yfinance'):
+            # A month of history for the first call, so the indicators have warmed up
+            self.fetch_nifty_data(interval, period or ('1mo' if since is None else '5d'))
+        if since is None:
+            df = self.bar_store.read(NIFTY_SYMBOL, interval, last=config.RESAMPLE_WARMUP_BARS)
+        else:
+            df = self.bar_store.read(NIFTY_SYMBOL, interval, start=since)
+        if df is None or df.empty:
+            return None
+        ends = df.index + pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+        return df[ends <= pd.Timestamp.now(tz=config.MARKET_TIMEZONE)]
+
+    def _period_start(self, symbol, interval, period):
+        """Start timestamp of a yfinance-style period, or None for 'max'/unknown"""
+        now = pd.Timestamp.now(tz=config.MARKET_TIMEZONE)
+        if period in ('1d', '5d'):
+            # Trading-day periods: start of the Nth most recent stored session
+            sessions = int(period[:-1])
+            recent = self.bar_store.read(symbol, interval, start=now - timedelta(days=sessions * 3 + 7))
+            if recent is None or recent.empty:
+                return now - timedelta(days=sessions)
+            dates = np.unique(recent.index.date)
+            first_date = dates[-sessions] if len(dates) >= sessions else dates[0]
+            return pd.Timestamp(first_date, tz=config.MARKET_TIMEZONE)
+        if period in PERIOD_DAYS:
+            return now - timedelta(days=PERIOD_DAYS[period])
+        return None
+            
     def fetch_nse_market_status(self):
         """Fetch current NSE market status"""
         try:
-            url = "https://www.nseindia.com/api/marketStatus"
-            response = requests.get(url, headers=self.nse_headers, timeout=5)
-            data = response.json()
-            return {
+            data = get_nse_session().make_request(MARKET_STATUS_URL)
+            status = {
                 'market_status': data['marketState'][0]['marketStatus'],
                 'last_update': data['marketState'][0]['lastUpdateTime']
             }
+            get_recorder().record('market_status', status)
+            return status
         except Exception as e:
             print(f"Error fetching market status: {str(e)}")
             return None
@@ -75,27 +144,37 @@ class TechnicalAnalyzer:
     def fetch_nse_india_vix(self):
         """Fetch current India VIX value"""
         try:
-            url = "https://www.nseindia.com/api/marketStatus"
-            response = requests.get(url, headers=self.nse_headers, timeout=5)
-            data = response.json()
+            data = get_nse_session().make_request(MARKET_STATUS_URL)
             vix_data = next((item for item in data['marketState'] if item['index'] == 'INDIA VIX'), None)
             if vix_data:
-                return {
+                vix = {
                     'value': float(vix_data['last']),
                     'change': float(vix_data['variation']),
                     'last_update': vix_data['lastUpdateTime']
                 }
+                get_recorder().record('vix', vix)
+                return vix
             return None
         except Exception as e:
             print(f"Error fetching India VIX: {str(e)}")
             return None
             
+    def prefetch_nse_inputs(self, option_chain=True):
+        """
+        Fetch the independent NSE inputs of an alert (market status / VIX and,
+        optionally, the NIFTY option chain) concurrently. The responses land in
+        the NSE client's cache, so the fetch_* calls that follow are served from it.
+        """
+        urls = {'market_status': MARKET_STATUS_URL}
+        if option_chain:
+            urls['option_chain'] = OPTION_CHAIN_URL.format(symbol="NIFTY")
+        return get_nse_session().fetch_many(urls)
+
     def get_market_depth(self, symbol="NIFTY 50"):
         """Get market depth data for the specified symbol"""
         try:
             url = f"https://www.nseindia.com/api/depth-data?symbol={symbol}"
-            response = requests.get(url, headers=self.nse_headers, timeout=5)
-            return response.json()
+            return get_nse_session().make_request(url)
         except Exception as e:
             print(f"Error fetching market depth: {str(e)}")
             return None
@@ -150,7 +229,7 @@ class TechnicalAnalyzer:
             return None
         
     def send_email_alert(self, subject, body):
-        """Send email alerts to configured recipients"""
+        """Queue an email alert to the configured recipients (delivered in the background)"""
         try:
             current_time = datetime.now()
             
@@ -158,23 +237,13 @@ class TechnicalAnalyzer:
             if self.last_alert_time and (current_time - self.last_alert_time).total_seconds() < self.alert_cooldown_minutes * 60:
                 return False
                 
-            msg = MIMEMultipart()
-            msg['From'] = EMAIL_CONFIG['sender_email']
-            msg['To'] = ', '.join(EMAIL_CONFIG['recipients'])
-            msg['Subject'] = f"NIFTY Trading Alert: {subject}"
-            
             # Add timestamp to body
             full_body = f"Alert Time: {current_time.strftime('%Y-%m-%d %H:%M:%S')}\n\n{body}"
-            msg.attach(MIMEText(full_body, 'plain'))
-            
-            # Connect to SMTP server
-            server = smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port'])
-            server.starttls()
-            server.login(EMAIL_CONFIG['sender_email'], EMAIL_CONFIG['sender_password'])
             
-            # Send email
-            server.send_message(msg)
-            server.quit()
+            dispatcher = get_dispatcher()
+            dispatcher.ensure_channel('email', lambda: SMTPChannel.from_config(EMAIL_CONFIG))
+            if not dispatcher.send('email', f"NIFTY Trading Alert: {subject}", full_body):
+                return False
             
             self.last_alert_time = current_time
             return True
@@ -183,6 +252,14 @@ class TechnicalAnalyzer:
             print(f"Failed to send email alert: {str(e)}")
             return False
             
+    def select_option_strikes(self, side, current_price):
+        """Entry/hedge strikes by delta from the live chain, or from India VIX when NSE is unavailable"""
+        fetched = self.prefetch_nse_inputs()  # the VIX fallback is then ready without a second round trip
+        chain = fetch_option_chain("NIFTY") if 'option_chain' in fetched else None
+        vix = None if chain is not None else self.fetch_nse_india_vix()
+        vol = vix['value'] / 100 if vix else None
+        return suggest_by_delta(side, current_price, chain=chain, vol=vol)
+
     def generate_alert_message(self, analysis_data, current_price):
         """Generate focused buy/sell alert message with detailed recommendations"""
         message = []
@@ -213,14 +290,14 @@ class TechnicalAnalyzer:
                 
                 # Trading recommendations for bullish setup
                 message.append("\nRECOMMENDED TRADES:")
-                atm_strike = round(current_price / 50) * 50  # Round to nearest 50
+                strikes = self.select_option_strikes('CE', current_price)
                 message.append("1. Index Trade:")
                 message.append(f"   - Buy NIFTY Futures with strict stop loss")
                 message.append("\n2. Options Strategy (Conservative):")
-                message.append(f"   - Buy {atm_strike} Call")
-                message.append(f"   - Sell {atm_strike + 200} Call (Bear Spread)")
+                message.append(f"   - Buy {strikes['primary_strike']:.0f} Call (delta {strikes['primary_delta']:.2f})")
+                message.append(f"   - Sell {strikes['hedge_strike']:.0f} Call (delta {strikes['hedge_delta']:.2f}, Bull Call Spread)")
                 message.append("\n3. Options Strategy (Aggressive):")
-                message.append(f"   - Buy {atm_strike} Call")
+                message.append(f"   - Buy {strikes['primary_strike']:.0f} Call")
                 message.append(f"   - Target: 50-70% profit")
                 message.append(f"   - Stop Loss: 30% of premium")
                 
@@ -231,14 +308,14 @@ class TechnicalAnalyzer:
                 
                 # Trading recommendations for bearish setup
                 message.append("\nRECOMMENDED TRADES:")
-                atm_strike = round(current_price / 50) * 50  # Round to nearest 50
+                strikes = self.select_option_strikes('PE', current_price)
                 message.append("1. Index Trade:")
                 message.append(f"   - Sell NIFTY Futures with strict stop loss")
                 message.append("\n2. Options Strategy (Conservative):")
-                message.append(f"   - Buy {atm_strike} Put")
-                message.append(f"   - Sell {atm_strike - 200} Put (Bull Spread)")
+                message.append(f"   - Buy {strikes['primary_strike']:.0f} Put (delta {strikes['primary_delta']:.2f})")
+                message.append(f"   - Sell {strikes['hedge_strike']:.0f} Put (delta {strikes['hedge_delta']:.2f}, Bear Put Spread)")
                 message.append("\n3. Options Strategy (Aggressive):")
-                message.append(f"   - Buy {atm_strike} Put")
+                message.append(f"   - Buy {strikes['primary_strike']:.0f} Put")
                 message.append(f"   - Target: 50-70% profit")
                 message.append(f"   - Stop Loss: 30% of premium")
             
@@ -268,49 +345,31 @@ class TechnicalAnalyzer:
             
         return "\n".join(message)
     
-    def calculate_vwap(self, data):
+    def calculate_vwap(self, data, engine=None):
+        """
+        The frame with a session VWAP column. Live loops pass the same
+        IndicatorEngine every cycle so only bars newer than the last call are
+        processed; without one the VWAP is computed over the whole frame.
+        """
         if data is None or len(data) == 0:
             return data
             
-        df = data.copy()
-        df['Typical_Price'] = (df['High'] + df['Low'] + df['Close']) / 3
-        df['VP'] = df['Typical_Price'] * df['Volume']
-        df['Cumulative_VP'] = df['VP'].cumsum()
-        df['Cumulative_Volume'] = df['Volume'].cumsum()
-        df['VWAP'] = df['Cumulative_VP'] / df['Cumulative_Volume']
-        return df
+        vwap = engine.update_frame(data)['VWAP'] if engine is not None else session_vwap(data)
+        return data.assign(VWAP=vwap)
     
     def identify_trend(self, data):
         if data is None or len(data) == 0:
             return {'trend': 'neutral', 'strength': 0}
             
         current_price = data['Close'].iloc[-1]
-        vwap = data['VWAP'].iloc[-1] if 'VWAP' in data.columns else current_price
-        rsi = data['RSI'].iloc[-1]
-        adx = data['ADX'].iloc[-1]
-        
-        trend = 'neutral'
-        strength = 0
-        
-        # Determine trend based on price vs VWAP
-        if current_price > vwap:
-            trend = 'bullish'
-            strength += 1
-        elif current_price < vwap:
-            trend = 'bearish'
-            strength += 1
-        
-        # Add RSI confirmation
-        if rsi > 60:
-            if trend == 'bullish':
-                strength += 1
-        elif rsi < 40:
-            if trend == 'bearish':
-                strength += 1
-        
-        # Add ADX strength
-        if adx > 25:
-            strength += 1
+        result = get_rule_set('trend').evaluate({
+            'close': current_price,
+            'VWAP': data['VWAP'].iloc[-1] if 'VWAP' in data.columns else current_price,
+            'RSI': data['RSI'].iloc[-1],
+            'ADX': data['ADX'].iloc[-1]
+        })
+        trend = DIRECTIONS[int(np.sign(result['direction']))]
+        strength = int(result['strength'])
         
         return {
             'trend': trend,
@@ -334,64 +393,26 @@ class TechnicalAnalyzer:
         if data is None or len(data) == 0:
             return {'momentum': 'neutral', 'strength': 0}
             
-        rsi = data['RSI'].iloc[-1]
-        macd = data['MACD'].iloc[-1]
-        macd_signal = data['MACD_Signal'].iloc[-1]
-        
-        momentum = 'neutral'
-        strength = 0
-        
-        # RSI momentum
-        if rsi > 60:
-            momentum = 'bullish'
-            strength += 1
-        elif rsi < 40:
-            momentum = 'bearish'
-            strength += 1
-        
-        # MACD momentum
-        if macd > macd_signal:
-            if momentum == 'bullish':
-                strength += 1
-            elif momentum == 'neutral':
-                momentum = 'bullish'
-                strength += 1
-        elif macd < macd_signal:
-            if momentum == 'bearish':
-                strength += 1
-            elif momentum == 'neutral':
-                momentum = 'bearish'
-                strength += 1
+        result = get_rule_set('momentum').evaluate(data.iloc[-1:])
+        momentum = DIRECTIONS[int(np.sign(result['direction'][-1]))]
+        strength = int(result['strength'][-1])
         
         return {
             'momentum': momentum,
             'strength': min(5, strength)  # Cap strength at 5
         }
     
-    def calculate_volume_profile(self, data, num_bins=10):
-        """Calculate Volume Profile to identify high-volume price levels"""
-        if data is None or len(data) < num_bins:
+    def calculate_volume_profile(self, data, row_ticks=None, method='range'):
+        """
+        Volume Profile of the given bars: point of control, value area
+        (VAH/VAL) and high/low volume nodes at tick resolution
+        """
+        if data is None or len(data) == 0:
             return None
             
-        price_range = data['High'].max() - data['Low'].min()
-        bin_size = price_range / num_bins
-        
-        volume_profile = []
-        current_price = data['Close'].iloc[-1]
-        
-        for i in range(num_bins):
-            price_level = data['Low'].min() + (i * bin_size)
-            mask = (data['Low'] >= price_level) & (data['Low'] < price_level + bin_size)
-            volume = data.loc[mask, 'Volume'].sum()
-            volume_profile.append({
-                'price_level': price_level,
-                'volume': volume,
-                'distance_from_current': abs(price_level - current_price)
-            })
-        
-        # Sort by volume to find POC (Point of Control)
-        volume_profile.sort(key=lambda x: x['volume'], reverse=True)
-        return volume_profile[:3]  # Return top 3 high-volume levels
+        profile = VolumeProfile(row_ticks=row_ticks, method=method)
+        profile.add_bars(data)
+        return profile.summary(current_price=data['Close'].iloc[-1])
     
     def calculate_fibonacci_levels(self, data):
         """Calculate Fibonacci retracement and extension levels"""
@@ -417,62 +438,38 @@ class TechnicalAnalyzer:
         return {level: round(price, 2) for level, price in ratios.items()}
     
     def detect_divergence(self, data, window=14):
-        """Detect RSI and price divergences"""
+        """
+        Latest RSI/MACD/OBV divergence between price swings that was confirmed
+        within the last `window` bars, or None
+        """
         if data is None or len(data) < window:
             return None
             
-        df = data.tail(window).copy()
-        
-        # Find price swings
-        price_high = df['Close'].max()
-        price_low = df['Close'].min()
-        price_trend = 'up' if df['Close'].iloc[-1] > df['Close'].iloc[0] else 'down'
-        
-        # Find RSI swings
-        rsi_high = df['RSI'].max()
-        rsi_low = df['RSI'].min()
-        rsi_trend = 'up' if df['RSI'].iloc[-1] > df['RSI'].iloc[0] else 'down'
-        
-        # Check for divergences
-        bullish_div = price_trend == 'down' and rsi_trend == 'up'
-        bearish_div = price_trend == 'up' and rsi_trend == 'down'
-        
-        if bullish_div:
-            return {'type': 'bullish', 'strength': abs(df['RSI'].iloc[-1] - df['RSI'].iloc[0])}
-        elif bearish_div:
-            return {'type': 'bearish', 'strength': abs(df['RSI'].iloc[-1] - df['RSI'].iloc[0])}
-        
-        return None
+        # Enough history for the indicators to settle and two swings to be compared
+        recent = data.tail(window + config.DIVERGENCE_MAX_DISTANCE + 200)
+        divergences = detect_divergences(recent)
+        divergences = divergences[divergences['confirmed_bar'] >= len(recent) - window]
+        if divergences.empty:
+            return None
+            
+        latest = divergences.iloc[-1]
+        return {
+            'type': latest['direction'],
+            'kind': latest['kind'],
+            'indicator': latest['indicator'],
+            'strength': latest['strength'],
+            'confirmed_at': latest['confirmed_at']
+        }
     
     def identify_support_resistance_clusters(self, data, n_clusters=5):
-        """Identify support and resistance levels using price clusters"""
+        """
+        Identify support and resistance levels where bar highs/lows cluster,
+        nearest first (at most n_clusters each side), with touch counts and strength
+        """
         if data is None or len(data) < n_clusters:
             return None
             
-        # Prepare price points for clustering
-        price_points = np.column_stack([
-            data['High'].values,
-            data['Low'].values,
-            data['Close'].values
-        ])
-        
-        # Perform K-means clustering
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-        kmeans.fit(price_points)
-        
-        # Get cluster centers and sort them
-        levels = sorted([round(center[2], 2) for center in kmeans.cluster_centers_])
-        current_price = data['Close'].iloc[-1]
-        
-        # Categorize levels as support or resistance
-        support_resistance = {'support': [], 'resistance': []}
-        for level in levels:
-            if level < current_price:
-                support_resistance['support'].append(level)
-            else:
-                support_resistance['resistance'].append(level)
-                
-        return support_resistance
+        return self.price_levels.detect(data, max_levels=n_clusters)
     
     def calculate_market_profile(self, data, std_dev_range=2):
         """Calculate Market Profile based on normal distribution"""
@@ -487,6 +484,7 @@ class TechnicalAnalyzer:
         value_area_low = mean_price - (std_dev_range * std_price)
         
         # Calculate price distribution
+        norm = require('stats').norm
         prices = np.linspace(value_area_low, value_area_high, 50)
         distribution = norm.pdf(prices, mean_price, std_price)
         
@@ -499,35 +497,11 @@ class TechnicalAnalyzer:
         }
     
     def identify_candlestick_pattern(self, data):
+        """Candlestick patterns completed by the latest bar, or None"""
         if data is None or len(data) == 0:
             return None
             
-        current = data.iloc[-1]
-        prev = data.iloc[-2] if len(data) > 1 else None
-        
-        body = current['Close'] - current['Open']
-        total_range = current['High'] - current['Low']
-        upper_wick = current['High'] - max(current['Open'], current['Close'])
-        lower_wick = min(current['Open'], current['Close']) - current['Low']
-        
-        patterns = []
-        
-        # Enhanced pattern detection
-        if abs(body) < 0.2 * total_range and upper_wick > 0.4 * total_range and lower_wick > 0.4 * total_range:
-            patterns.append('Doji')
-        elif body > 0 and body > 0.7 * total_range and upper_wick < 0.15 * total_range:
-            patterns.append('Bullish Marubozu')
-        elif body < 0 and abs(body) > 0.7 * total_range and lower_wick < 0.15 * total_range:
-            patterns.append('Bearish Marubozu')
-            
-        # Check for engulfing patterns if we have previous candle
-        if prev is not None:
-            prev_body = prev['Close'] - prev['Open']
-            if body > 0 and prev_body < 0 and current['Open'] < prev['Close'] and current['Close'] > prev['Open']:
-                patterns.append('Bullish Engulfing')
-            elif body < 0 and prev_body > 0 and current['Open'] > prev['Close'] and current['Close'] < prev['Open']:
-                patterns.append('Bearish Engulfing')
-        
+        patterns = latest_patterns(data)
         return patterns if patterns else None
     
     def check_and_send_alerts(self, data):
@@ -539,16 +513,14 @@ class TechnicalAnalyzer:
         current_price = data['Close'].iloc[-1]
             
         # Gather essential analysis data
-        analysis_data = {
-            'trend': self.identify_trend(data),
-            'momentum': self.validate_momentum(data),
-            'levels': self.identify_key_levels(data),
-            'patterns': self.identify_candlestick_pattern(data),
-            'market_sentiment': self.calculate_market_sentiment(data),
-            'market_status': self.fetch_nse_market_status(),
-            'vix_data': self.fetch_nse_india_vix()
-        }
-        
+        with span("technical_analysis"):
+            analysis_data = {
+                'trend': self.identify_trend(data),
+                'momentum': self.validate_momentum(data),
+                'levels': self.identify_key_levels(data),
+                'patterns': self.identify_candlestick_pattern(data)
+            }
+            
         # Check for strong buy/sell signals
         trend = analysis_data['trend']['trend']
         trend_strength = analysis_data['trend']['strength']
@@ -561,6 +533,20 @@ class TechnicalAnalyzer:
             trend in ['bullish', 'bearish']  # Clear direction
         )
         
+        # Market status/VIX and, for an alert, the option chain in one concurrent round trip
+        with span("fetch_nse_inputs"):
+            self.prefetch_nse_inputs(option_chain=should_alert)
+        with span("market_sentiment"):
+            analysis_data['market_sentiment'] = self.calculate_market_sentiment(data)
+        with span("fetch_market_status") as timer:
+            analysis_data['market_status'] = self.fetch_nse_market_status()
+            if analysis_data['market_status'] is None:
+                timer.fail()
+        with span("fetch_vix") as timer:
+            analysis_data['vix_data'] = self.fetch_nse_india_vix()
+            if analysis_data['vix_data'] is None:
+                timer.fail()
+        
         # Send alert only for major signals
         if should_alert:
             signal_type = "BUY" if trend == 'bullish' else "SELL"
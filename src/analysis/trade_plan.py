@@ -85,9 +85,10 @@ class TradePlanGenerator:
                 bias['primary'] = 'bearish'
         
         # Options data
-        if option_data['PCR'] > 1:  # Put-Call Ratio
+        pcr = option_data.get('PCR') if option_data else None  # Put-Call Ratio
+        if pcr is not None and pcr > 1:
             intraday_score += 1
-        elif option_data['PCR'] < 0.7:
+        elif pcr is not None and pcr < 0.7:
             intraday_score -= 1
         
         # Global markets influence
@@ -0,0 +1,270 @@
+import threading
+import numpy as np
+import pandas as pd
+from .. import config
+
+__all__ = ['VolumeProfile', 'SessionVolumeProfiles']
+
+
+class VolumeProfile:
+    """
+    Volume-at-price histogram on a fixed tick grid.
+
+    `method='range'` spreads each bar's volume evenly over every tick from its
+    Low to its High; `method='typical'` puts it all at the typical price
+    (H+L+C)/3. Updates are written to a difference array (two additions per
+    bar, however wide the bar), so adding a bar or a tick is O(1) and a
+    multi-month profile costs one cumulative sum when it is read. The grid
+    grows on demand. Reads aggregate ticks into rows of `row_ticks` ticks.
+    """
+
+    def __init__(self, tick_size=None, row_ticks=None, method='range', value_area=None):
+        if method not in ('range', 'typical'):
+            raise ValueError(f"Unknown volume profile method: {method}")
+        self.tick_size = tick_size or config.PROFILE_TICK_SIZE
+        self.row_ticks = row_ticks or config.PROFILE_ROW_TICKS
+        self.method = method
+        self.value_area_pct = value_area or config.PROFILE_VALUE_AREA
+        self.origin = None              # tick index of diff[0]
+        self.diff = np.zeros(0)
+        self.total_volume = 0.0
+        self.bars = 0
+        self.lock = threading.Lock()
+        self._density = None            # materialized volume per tick, dropped on update
+
+    def __len__(self):
+        return self.bars
+
+    def _tick(self, price):
+        return np.floor(np.asarray(price, dtype=np.float64) / self.tick_size + 1e-9).astype(np.int64)
+
+    def _reserve(self, lo, hi):
+        """Make tick indices lo..hi (inclusive) addressable"""
+        if self.origin is None:
+            self.origin = int(lo)
+            self.diff = np.zeros(max(int(hi) - int(lo) + 2, 1024))
+            return
+        start = min(self.origin, int(lo))
+        end = max(self.origin + len(self.diff), int(hi) + 2)
+        if start == self.origin and end == self.origin + len(self.diff):
+            return
+        # Grow geometrically so a trending market does not reallocate every bar
+        grow = len(self.diff)
+        if start < self.origin:
+            start = min(start, self.origin - grow)
+        if end > self.origin + len(self.diff):
+            end = max(end, self.origin + len(self.diff) + grow)
+        diff = np.zeros(end - start)
+        offset = self.origin - start
+        diff[offset:offset + len(self.diff)] = self.diff
+        self.origin, self.diff = start, diff
+
+    def _spans(self, high, low, close):
+        if self.method == 'typical':
+            lo = self._tick((np.asarray(high) + np.asarray(low) + np.asarray(close)) / 3)
+            return lo, lo
+        return self._tick(low), self._tick(high)
+
+    def add_bar(self, high, low, close, volume):
+        """Add one bar's volume; O(1) regardless of the bar's range"""
+        if not volume or volume != volume:
+            return
+        lo, hi = self._spans(high, low, close)
+        lo, hi = int(lo), int(max(hi, lo))
+        share = volume / (hi - lo + 1)
+        with self.lock:
+            self._reserve(lo, hi)
+            self.diff[lo - self.origin] += share
+            self.diff[hi + 1 - self.origin] -= share
+            self.total_volume += volume
+            self.bars += 1
+            self._density = None
+
+    def add_tick(self, price, volume):
+        """Add volume traded at a single price"""
+        self.add_bar(price, price, price, volume)
+
+    def add_bars(self, df):
+        """Add every row of an OHLCV DataFrame at once"""
+        if df is None or len(df) == 0:
+            return
+        volume = df['Volume'].to_numpy(dtype=np.float64)
+        valid = np.isfinite(volume) & (volume > 0)
+        if not valid.any():
+            return
+        lo, hi = self._spans(df['High'].to_numpy(dtype=np.float64)[valid],
+                             df['Low'].to_numpy(dtype=np.float64)[valid],
+                             df['Close'].to_numpy(dtype=np.float64)[valid])
+        hi = np.maximum(hi, lo)
+        share = volume[valid] / (hi - lo + 1)
+        with self.lock:
+            self._reserve(lo.min(), hi.max())
+            size = len(self.diff)
+            self.diff += np.bincount(lo - self.origin, weights=share, minlength=size)[:size]
+            self.diff -= np.bincount(hi + 1 - self.origin, weights=share, minlength=size)[:size]
+            self.total_volume += float(volume[valid].sum())
+            self.bars += int(valid.sum())
+            self._density = None
+
+    def merge(self, other):
+        """Add another profile's volume into this one (same tick size and method)"""
+        if other.tick_size != self.tick_size or other.method != self.method:
+            raise ValueError("Cannot merge volume profiles with different tick sizes or methods")
+        if other.origin is None:
+            return self
+        with self.lock:
+            self._reserve(other.origin, other.origin + len(other.diff) - 2)
+            offset = other.origin - self.origin
+            self.diff[offset:offset + len(other.diff)] += other.diff
+            self.total_volume += other.total_volume
+            self.bars += other.bars
+            self._density = None
+        return self
+
+    def histogram(self, row_ticks=None):
+        """(row low prices, volume per row) over the traded range, lowest price first"""
+        with self.lock:
+            if self.origin is None:
+                return np.empty(0), np.empty(0)
+            if self._density is None:
+                # Round-off from the running sum can leave tiny negatives on untraded ticks
+                self._density = np.clip(np.cumsum(self.diff), 0.0, None)
+            density = self._density
+        traded = np.flatnonzero(density > self.total_volume * 1e-12)
+        if len(traded) == 0:
+            return np.empty(0), np.empty(0)
+        row_ticks = row_ticks or self.row_ticks
+        first = (self.origin + traded[0]) // row_ticks * row_ticks
+        start = first - self.origin
+        stop = traded[-1] + 1
+        padded = np.zeros(-(-(stop - start) // row_ticks) * row_ticks)
+        lo = max(start, 0)
+        padded[lo - start:stop - start] = density[lo:stop]
+        volumes = padded.reshape(-1, row_ticks).sum(axis=1)
+        prices = (first + np.arange(len(volumes)) * row_ticks) * self.tick_size
+        return prices, volumes
+
+    def value_area(self, prices, volumes):
+        """
+        (POC, VAL, VAH) rows: starting at the point of control, extend toward
+        the side whose next two rows hold more volume until value_area_pct of
+        the volume is covered (the CBOT market-profile rule).
+        """
+        poc = int(np.argmax(volumes))
+        target = volumes.sum() * self.value_area_pct
+        low = high = poc
+        covered = volumes[poc]
+        last = len(volumes) - 1
+        while covered < target and (low > 0 or high < last):
+            below = volumes[max(low - 2, 0):low].sum() if low > 0 else -1.0
+            above = volumes[high + 1:high + 3].sum() if high < last else -1.0
+            if above >= below:
+                step = min(2, last - high)
+                covered += volumes[high + 1:high + 1 + step].sum()
+                high += step
+            else:
+                step = min(2, low)
+                covered += volumes[low - step:low].sum()
+                low -= step
+        return poc, low, high
+
+    def nodes(self, volumes, smoothing=3):
+        """
+        Indices of high-volume nodes (local peaks at or above the mean row
+        volume, largest first) and low-volume nodes (local troughs at or below
+        half the mean, lying between HVNs) of a lightly smoothed profile.
+        """
+        if len(volumes) < 3:
+            return [], []
+        kernel = np.ones(smoothing) / smoothing
+        smooth = np.convolve(volumes, kernel, mode='same')
+        inner = smooth[1:-1]
+        peaks = np.flatnonzero((inner >= smooth[:-2]) & (inner > smooth[2:])) + 1
+        troughs = np.flatnonzero((inner <= smooth[:-2]) & (inner < smooth[2:])) + 1
+        mean = smooth[smooth > 0].mean()
+        hvn = peaks[smooth[peaks] >= mean]
+        hvn = hvn[np.argsort(-smooth[hvn], kind='stable')]
+        lvn = troughs[smooth[troughs] <= 0.5 * mean]
+        if len(hvn):
+            lvn = lvn[(lvn > hvn.min()) & (lvn < hvn.max())]
+        return hvn.tolist(), lvn.tolist()
+
+    def summary(self, current_price=None, row_ticks=None, max_nodes=5):
+        """POC, value area and volume nodes as prices (row midpoints), or None if empty"""
+        prices, volumes = self.histogram(row_ticks)
+        if len(volumes) == 0:
+            return None
+        row_size = (row_ticks or self.row_ticks) * self.tick_size
+        mid = prices + row_size / 2
+        poc, low, high = self.value_area(prices, volumes)
+        hvn, lvn = self.nodes(volumes)
+        result = {
+            'poc': round(float(mid[poc]), 2),
+            'vah': round(float(prices[high] + row_size), 2),
+            'val': round(float(prices[low]), 2),
+            'hvn': [round(float(mid[i]), 2) for i in hvn[:max_nodes]],
+            'lvn': [round(float(mid[i]), 2) for i in lvn[:max_nodes]],
+            'total_volume': self.total_volume,
+            'row_size': row_size
+        }
+        if current_price is not None:
+            result['position'] = ('above_value' if current_price > result['vah'] else
+                                  'below_value' if current_price < result['val'] else 'in_value')
+        return result
+
+
+class SessionVolumeProfiles:
+    """
+    One VolumeProfile per trading session, updated bar by bar, with
+    composites over the last N sessions built by merging the daily grids.
+    """
+
+    def __init__(self, tick_size=None, row_ticks=None, method='range', timezone=None, max_sessions=None):
+        self.tick_size = tick_size
+        self.row_ticks = row_ticks
+        self.method = method
+        self.timezone = timezone or config.MARKET_TIMEZONE
+        self.max_sessions = max_sessions or config.PROFILE_MAX_SESSIONS
+        self.sessions = {}      # date -> VolumeProfile, oldest first
+
+    def _new(self):
+        return VolumeProfile(self.tick_size, self.row_ticks, self.method)
+
+    def _date(self, timestamp):
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.tz_localize(self.timezone)
+        return timestamp.tz_convert(self.timezone).date()
+
+    def _session(self, day):
+        if day not in self.sessions:
+            self.sessions[day] = self._new()
+            while len(self.sessions) > self.max_sessions:
+                del self.sessions[next(iter(self.sessions))]
+        return self.sessions[day]
+
+    def add_bar(self, timestamp, high, low, close, volume):
+        self._session(self._date(timestamp)).add_bar(high, low, close, volume)
+
+    def add_bars(self, df):
+        """Add an OHLCV DataFrame, split by session date"""
+        if df is None or len(df) == 0:
+            return
+        index = pd.DatetimeIndex(df.index)
+        index = index.tz_localize(self.timezone) if index.tz is None else index.tz_convert(self.timezone)
+        for day, rows in df.groupby(index.date, sort=True):
+            self._session(day).add_bars(rows)
+
+    def session(self, day=None):
+        """Profile of a session (the latest by default), or None"""
+        if not self.sessions:
+            return None
+        return self.sessions[day if day is not None else next(reversed(self.sessions))]
+
+    def composite(self, sessions=None):
+        """Merged profile of the last `sessions` sessions (all kept sessions by default)"""
+        days = list(self.sessions)[-sessions:] if sessions else list(self.sessions)
+        profile = self._new()
+        for day in days:
+            profile.merge(self.sessions[day])
+        return profile
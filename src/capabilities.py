@@ -0,0 +1,107 @@
+import importlib
+import importlib.util
+import sys
+import threading
+
+__all__ = ['CAPABILITIES', 'CapabilityUnavailable', 'require', 'available', 'loaded', 'on_load',
+           'capability_report', 'print_capabilities']
+
+# Optional and heavy integrations, imported on first use instead of at startup
+# name -> (module, pip package or None for the standard library, what uses it)
+CAPABILITIES = {
+    'yfinance': ('yfinance', 'yfinance', "NIFTY history downloads (TechnicalAnalyzer.fetch_nifty_data)"),
+    'stats': ('scipy.stats', 'scipy', "normal distribution for option pricing and the market profile"),
+    'llm': ('openai', 'openai', "AI trade commentary"),
+    'charts': ('plotly.graph_objects', 'plotly', "interactive charts"),
+    'whatsapp': ('pywhatkit', 'pywhatkit', "WhatsApp alerts"),
+    'websocket': ('websocket', 'websocket-client', "live tick feed"),
+    'sound': ('winsound', None, "audible alerts (Windows only)"),
+}
+
+
+class CapabilityUnavailable(ImportError):
+    """An optional integration was used but its package is not installed"""
+
+
+_modules = {}
+_hooks = {}
+_lock = threading.Lock()
+
+
+def _spec(name):
+    if name not in CAPABILITIES:
+        raise KeyError(f"Unknown capability '{name}'; known: {', '.join(CAPABILITIES)}")
+    return CAPABILITIES[name]
+
+
+def require(name):
+    """
+    Import and return the module behind a capability, running its on_load
+    hooks the first time. Raises CapabilityUnavailable (an ImportError) with
+    an install hint when the package is missing.
+    """
+    module = _modules.get(name)
+    if module is not None:
+        return module
+    module_name, package, purpose = _spec(name)
+    with _lock:
+        if name in _modules:
+            return _modules[name]
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            hint = f"pip install {package}" if package else "not available on this platform"
+            raise CapabilityUnavailable(f"{purpose} needs '{module_name}' ({hint})",
+                                        name=module_name) from e
+        for hook in _hooks.pop(name, []):
+            hook(module)
+        _modules[name] = module
+        return module
+
+
+def available(name):
+    """Whether the capability can be loaded, checked without importing it"""
+    module_name = _spec(name)[0]
+    if module_name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def loaded(name):
+    """Whether require(name) has already imported the capability"""
+    return name in _modules
+
+
+def on_load(name, hook):
+    """Call hook(module) when the capability is first loaded (immediately if it already is)"""
+    _spec(name)
+    with _lock:
+        module = _modules.get(name)
+        if module is None:
+            _hooks.setdefault(name, []).append(hook)
+            return
+    hook(module)
+
+
+def capability_report():
+    """{name: {'module', 'package', 'purpose', 'available', 'loaded'}} for every capability"""
+    return {
+        name: {
+            'module': module_name,
+            'package': package,
+            'purpose': purpose,
+            'available': available(name),
+            'loaded': loaded(name)
+        }
+        for name, (module_name, package, purpose) in CAPABILITIES.items()
+    }
+
+
+def print_capabilities():
+    print("Optional capabilities:")
+    for name, info in capability_report().items():
+        status = "loaded" if info['loaded'] else "available" if info['available'] else "missing"
+        print(f"  {name:<10} {status:<10} {info['purpose']}")
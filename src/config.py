@@ -1,3 +1,5 @@
+import os
+
 # Trading Parameters
 RISK_PER_TRADE = 0.01  # 1% risk per trade
 MIN_TRADE_SCORE = 3    # Minimum score required for trade signal
@@ -8,6 +10,27 @@ MARKET_START = "09:15"
 MARKET_END = "15:30"
 SQUARE_OFF_TIME = "15:15"
 
+# NSE trading holidays (equity and F&O); update from the yearly NSE circular
+# or call TradingCalendar.load_nse_holidays()
+NSE_HOLIDAYS = [
+    # 2025
+    "2025-02-26", "2025-03-14", "2025-03-31", "2025-04-10", "2025-04-14", "2025-04-18",
+    "2025-05-01", "2025-08-15", "2025-08-27", "2025-10-02", "2025-10-21", "2025-10-22",
+    "2025-11-05", "2025-12-25",
+    # 2026
+    "2026-01-15", "2026-01-26", "2026-03-03", "2026-03-26", "2026-03-31", "2026-04-03",
+    "2026-04-14", "2026-05-01", "2026-05-28", "2026-06-26", "2026-09-14", "2026-10-02",
+    "2026-10-20", "2026-11-10", "2026-11-24", "2026-12-25",
+]
+# Sessions outside the normal calendar (budget-day weekends, Muhurat trading): date -> (open, close)
+NSE_SPECIAL_SESSIONS = {
+    "2025-02-01": ("09:15", "15:30"),  # Union Budget (Saturday)
+    "2025-10-21": ("13:45", "14:45"),  # Diwali Muhurat trading
+    "2026-02-01": ("09:15", "15:30"),  # Union Budget (Sunday)
+}
+SCHEDULER_SETTLE_DELAY = 5  # Seconds after a bar close before analysis runs (lets the bar publish)
+SCHEDULER_PRE_CLOSE = 3     # Seconds before a bar close that jobs reading TradingView's forming candle run
+
 # Risk Management
 MAX_TRADES_PER_DAY = 2
 STOP_LOSS_PERCENT = 0.5  # 0.5% per trade
@@ -17,9 +40,225 @@ RSI_OVERBOUGHT = 70
 RSI_OVERSOLD = 30
 ADX_STRONG_TREND = 25
 MACD_SIGNAL_THRESHOLD = 0
+VOLUME_LOOKBACK = 10  # Previous 5m snapshots TradingSystem.analyze_volume compares volume against
+
+# Alerts
+ALERT_QUEUE_SIZE = 100       # Pending alerts per channel before new ones are dropped
+ALERT_COALESCE_WINDOW = 2.0  # Seconds to wait for more alerts to merge into one message
+ALERT_FLUSH_TIMEOUT = 60     # Seconds allowed at exit to deliver queued alerts
+
+# Metrics
+METRICS_ENABLED = True            # Per-stage latency histograms and error counters
+METRICS_PORT = 9108               # Prometheus text at http://127.0.0.1:9108/metrics; None = no endpoint
+METRICS_SUMMARY_INTERVAL = 300    # Seconds between "[metrics] ..." summary lines; 0 = off
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 45, 90)  # Seconds
+
+# Startup
+# Import-time budget in seconds for the entry points (checked by `python -m benchmarks startup`);
+# none of them may import an optional capability (src/capabilities.py) at startup
+STARTUP_IMPORT_BUDGET = {
+    'src.analysis.technical': 1.5,
+    'src.main': 2.0,
+    'nifty_trader': 2.0,
+}
+
+# AI Commentary
+COMMENTARY_BACKEND = "openai"     # "openai", or "stub" for offline runs
+OPENAI_MODEL = "gpt-4"
+COMMENTARY_MAX_CONCURRENCY = 2    # Completions in flight at once
+COMMENTARY_TIMEOUT = 45           # Seconds allowed per completion
+COMMENTARY_CACHE_TTL = 900        # Seconds a commentary is reused for the same market state
+COMMENTARY_PRICE_BUCKET = 25      # Index points per cache bucket
+COMMENTARY_RSI_BAND = 10
+COMMENTARY_ADX_BAND = 10
+COMMENTARY_STRENGTH_BAND = 1      # Signal strength (0-5 stars) per cache band
+
+# Options Pricing
+RISK_FREE_RATE = 0.065       # Annual rate used for Black-Scholes (approx. 91-day T-bill)
+DEFAULT_VOLATILITY = 0.15    # Used when no implied volatility is available
+EXPIRY_WEEKDAY = 1           # NIFTY weekly options expire on Tuesday (Monday = 0)
+STRIKE_STEP = 50
+ENTRY_DELTA = 0.5            # |delta| of the option bought
+HEDGE_DELTA = 0.25           # |delta| of the option sold against it in a spread
+
+# Volume Profile
+PROFILE_TICK_SIZE = 0.05      # NSE tick size; profiles accumulate at this resolution
+PROFILE_ROW_TICKS = 100       # Ticks per reported row (5 points for NIFTY)
+PROFILE_VALUE_AREA = 0.70     # Share of volume inside the value area
+PROFILE_MAX_SESSIONS = 120    # Daily profiles kept for composites (~6 months)
+
+# Support/Resistance Levels
+LEVEL_BIN_SIZE = 1.0          # Price grid for counting touches (points)
+LEVEL_TOLERANCE = 0.001       # Highs/lows within 0.1% of a level count as touches
+LEVEL_MIN_TOUCHES = 3
+LEVEL_PROMINENCE = 1.25       # Minimum touches relative to the average over the traded range
+
+# Divergences
+DIVERGENCE_PIVOT_LEFT = 3     # Bars before a swing that must not exceed it
+DIVERGENCE_PIVOT_RIGHT = 3    # Bars after a swing before it is confirmed
+DIVERGENCE_MATCH_WINDOW = 2   # Oscillator extreme taken within this many bars of the price swing
+DIVERGENCE_MIN_DISTANCE = 5   # Bars between the two swings compared
+DIVERGENCE_MAX_DISTANCE = 60
+
+# Signal Rules
+# Each rule adds its score (a number or an expression) to every target in
+# `add` wherever `when` holds; see src/analysis/rules.py for the expression
+# syntax. Field names follow compute_indicators() with TradingView names
+# aliased (MACD.signal -> MACD_signal, ADX+DI -> ADX_plus, Stoch.K -> Stoch_K,
+# BB.upper -> BB_upper); name[1] is the previous bar.
+SIGNAL_RULES = {
+    # TradingSystem.analyze_indicators: weighted multi-timeframe bias
+    'bias': {
+        'weights': {'5m': 0.5, '15m': 0.3, '1h': 0.2},
+        'unweighted': ['trend_strength'],
+        'rules': [
+            {'when': "price > EMA20 > EMA50", 'add': {'score': 1},
+             'reason': "{tf} Uptrend (Price > EMA20 > EMA50)"},
+            {'when': "price < EMA20 < EMA50", 'add': {'score': -1},
+             'reason': "{tf} Downtrend (Price < EMA20 < EMA50)"},
+            {'when': "RSI > 60 and RSI > RSI[1]", 'add': {'score': 1},
+             'reason': "{tf} Strong RSI with momentum ({RSI:.2f})"},
+            {'when': "RSI < 40 and RSI < RSI[1]", 'add': {'score': -1},
+             'reason': "{tf} Weak RSI with momentum ({RSI:.2f})"},
+            {'when': "MACD > MACD_signal", 'add': {'score': 1}, 'reason': "{tf} MACD bullish"},
+            {'when': "not MACD > MACD_signal", 'add': {'score': -1}, 'reason': "{tf} MACD bearish"},
+            # Lookbacks over the snapshot history (never fire until it holds enough bars)
+            {'when': "RSI > 50 and RSI - RSI[3] > 5", 'add': {'score': 0.5},
+             'reason': "{tf} RSI rising over 3 bars ({RSI:.2f})"},
+            {'when': "RSI < 50 and RSI - RSI[3] < -5", 'add': {'score': -0.5},
+             'reason': "{tf} RSI falling over 3 bars ({RSI:.2f})"},
+            {'when': "MACD > MACD_signal and MACD - MACD_signal > MACD[1] - MACD_signal[1]", 'add': {'score': 0.5},
+             'reason': "{tf} MACD histogram expanding"},
+            {'when': "MACD < MACD_signal and MACD - MACD_signal < MACD[1] - MACD_signal[1]", 'add': {'score': -0.5},
+             'reason': "{tf} MACD histogram falling"},
+            {'when': "(price - BB_lower) / (BB_upper - BB_lower) > 0.8", 'add': {'score': -0.5},
+             'reason': "{tf} Overbought (BB)"},
+            {'when': "(price - BB_lower) / (BB_upper - BB_lower) < 0.2", 'add': {'score': 0.5},
+             'reason': "{tf} Oversold (BB)"},
+            {'when': "ADX > 25", 'add': {'trend_strength': 1}},
+            {'when': "ADX > 25 and ADX_plus > ADX_minus", 'add': {'score': 1},
+             'reason': "{tf} Strong uptrend (ADX: {ADX:.2f})"},
+            {'when': "ADX > 25 and not ADX_plus > ADX_minus", 'add': {'score': -1},
+             'reason': "{tf} Strong downtrend (ADX: {ADX:.2f})"},
+            {'when': "Stoch_K > Stoch_D and Stoch_K < 80", 'add': {'score': 0.5},
+             'reason': "{tf} Stochastic bullish crossover"},
+            {'when': "Stoch_K < Stoch_D and Stoch_K > 20", 'add': {'score': -0.5},
+             'reason': "{tf} Stochastic bearish crossover"},
+            {'when': "True",
+             'add': {'score': "2 if recommendation == 'STRONG_BUY' else 1 if recommendation == 'BUY' else "
+                              "-2 if recommendation == 'STRONG_SELL' else -1 if recommendation == 'SELL' else 0"},
+             'reason': "{tf} TradingView: {recommendation}"},
+        ]
+    },
+    # TechnicalAnalyzer.identify_trend: price vs VWAP, RSI confirmation, ADX strength
+    'trend': {
+        'rules': [
+            {'when': "close > VWAP", 'add': {'direction': 1, 'strength': 1}},
+            {'when': "close < VWAP", 'add': {'direction': -1, 'strength': 1}},
+            {'when': "RSI > 60 and close > VWAP", 'add': {'strength': 1}},
+            {'when': "RSI < 40 and close < VWAP", 'add': {'strength': 1}},
+            {'when': "ADX > 25", 'add': {'strength': 1}},
+        ]
+    },
+    # TechnicalAnalyzer.validate_momentum: RSI sets the direction, MACD confirms or decides
+    'momentum': {
+        'rules': [
+            {'when': "RSI > 60", 'add': {'direction': 1, 'strength': 1}},
+            {'when': "RSI < 40", 'add': {'direction': -1, 'strength': 1}},
+            {'when': "(RSI > 60 and MACD > MACD_signal) or (RSI < 40 and MACD < MACD_signal)",
+             'add': {'strength': 1}},
+            {'when': "not (RSI > 60 or RSI < 40) and MACD > MACD_signal", 'add': {'direction': 1, 'strength': 1}},
+            {'when': "not (RSI > 60 or RSI < 40) and MACD < MACD_signal", 'add': {'direction': -1, 'strength': 1}},
+        ]
+    },
+    # NiftyAnalyzer.analyze_market: RSI and MACD on the 5m snapshot (strength out of 4)
+    'rsi_macd': {
+        'rules': [
+            {'when': "RSI > 60", 'add': {'direction': 1, 'strength': 2}},
+            {'when': "RSI < 40", 'add': {'direction': -1, 'strength': 2}},
+            {'when': "(RSI > 60 and MACD > MACD_signal) or (RSI < 40 and MACD < MACD_signal)",
+             'add': {'strength': 2}},
+            {'when': "not (RSI > 60 or RSI < 40) and MACD > MACD_signal", 'add': {'direction': 1, 'strength': 1}},
+            {'when': "not (RSI > 60 or RSI < 40) and MACD < MACD_signal", 'add': {'direction': -1, 'strength': 1}},
+        ]
+    },
+    # run_nifty_signals: the same plus ADX trend strength (out of 5)
+    'rsi_macd_adx': {
+        'extends': 'rsi_macd',
+        'rules': [
+            {'when': "ADX > 25", 'add': {'strength': 1}},
+        ]
+    },
+    # quick_analysis: indicators and sub-ratings agreeing with the TradingView summary
+    'confluence': {
+        'rules': [
+            {'when': "(RSI > 60 and recommendation in ('BUY', 'STRONG_BUY')) or "
+                     "(RSI < 40 and recommendation in ('SELL', 'STRONG_SELL'))", 'add': {'strength': 1}},
+            {'when': "(MACD > MACD_signal and recommendation in ('BUY', 'STRONG_BUY')) or "
+                     "(MACD < MACD_signal and recommendation in ('SELL', 'STRONG_SELL'))", 'add': {'strength': 1}},
+            {'when': "ma_recommendation == recommendation", 'add': {'strength': 1}},
+            {'when': "oscillator_recommendation == recommendation", 'add': {'strength': 1}},
+        ]
+    },
+}
 
 # Exchange Settings
 EXCHANGE = "NSE"
 SYMBOL = "NIFTY"
 SCREENER = "india"
 INTERVALS = ["5m", "15m", "1h"]
+BASE_INTERVAL = "5m"         # Completed bars of this timeframe (Yahoo ^NSEI, or the tick stream) are resampled
+                             # into the rest of INTERVALS; TradingView is asked only while they lag behind
+RESAMPLE_WARMUP_BARS = 3000  # Stored base bars replayed at startup (~40 sessions of 5m, enough for EMA200 on 1h)
+
+# Data Fetching
+FETCH_DEADLINE = 30      # Seconds allowed for one multi-timeframe fetch batch
+FETCH_MAX_WORKERS = 8    # Threads shared by concurrent fetches
+
+# Watchlist (TradingView tickers on EXCHANGE; use "EXCHANGE:TICKER" for others)
+WATCHLIST_INDICES = ["NIFTY", "BANKNIFTY", "CNXFINANCE"]  # CNXFINANCE is FINNIFTY on TradingView
+WATCHLIST_STOCKS = [
+    "RELIANCE", "HDFCBANK", "ICICIBANK", "INFY", "TCS", "BHARTIARTL", "ITC", "LT",
+    "SBIN", "AXISBANK", "KOTAKBANK", "HINDUNILVR", "BAJFINANCE", "M_M", "MARUTI",
+    "SUNPHARMA", "HCLTECH", "TATAMOTORS", "NTPC", "ASIANPAINT", "TITAN", "ULTRACEMCO",
+    "POWERGRID", "ONGC", "TATASTEEL", "BAJAJFINSV", "ADANIENT", "ADANIPORTS",
+    "COALINDIA", "NESTLEIND", "JSWSTEEL", "GRASIM", "WIPRO", "TECHM", "HINDALCO",
+    "CIPLA", "DRREDDY", "SBILIFE", "HDFCLIFE", "BRITANNIA", "EICHERMOT", "TATACONSUM",
+    "APOLLOHOSP", "DIVISLAB", "BAJAJ_AUTO", "HEROMOTOCO", "INDUSINDBK", "BPCL",
+    "SHRIRAMFIN", "BEL"
+]
+WATCHLIST = WATCHLIST_INDICES + WATCHLIST_STOCKS
+SCREENER_BATCH_SIZE = 250  # Tickers per TradingView scanner request
+
+# Local History
+MARKET_TIMEZONE = "Asia/Kolkata"
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+BAR_STORE_DIR = os.path.join(DATA_DIR, "bars")
+RECORD_INPUTS = True          # Log every fetched analysis input for offline replay (replay.py)
+RECORD_DIR = os.path.join(DATA_DIR, "recordings")
+SNAPSHOT_HISTORY_SIZE = 400     # Timeframe snapshots kept in memory per timeframe (a week of 5m bars is 375)
+
+# Tick Streaming
+TICK_FEED_URL = None            # Websocket tick feed (JSON ticks: timestamp, price, volume); None = polling only
+TICK_FEED_SUBSCRIBE = None      # Message sent after connecting, e.g. {"action": "subscribe", "symbols": ["NIFTY"]}
+STREAM_INTERVALS = ["1m", "5m", "15m", "1h"]
+STREAM_BUFFER_SIZE = 5000       # Closed bars kept in memory per interval
+STREAM_CLOSE_GRACE = 0.25       # Seconds after a bar's end to wait for in-flight ticks before closing it
+STREAM_BAR_TOLERANCE = 1.0      # Seconds a bar's first tick may trail its start (and a replay's last tick its end)
+
+# NSE Client
+NSE_COOKIE_FILE = os.path.join(DATA_DIR, "nse_cookies.json")
+NSE_POOL_SIZE = 10          # Kept-alive connections to nseindia.com
+NSE_RATE_LIMIT = 3          # Requests per second (token refill rate)
+NSE_BURST = 3               # Requests allowed back to back before throttling
+NSE_TIMEOUT = 10
+
+# NSE response cache (seconds a GET response is reused, by API path)
+NSE_CACHE_SIZE = 256
+NSE_CACHE_DEFAULT_TTL = 5
+NSE_CACHE_TTL = {
+    "/api/marketStatus": 15,
+    "/api/option-chain-indices": 5,
+    "/api/equity-stockIndices": 3,
+    "/api/depth-data": 2,
+}
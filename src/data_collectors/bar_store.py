@@ -0,0 +1,167 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from .. import config
+
+__all__ = ['BarStore']
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class BarStore:
+    """
+    Append-only on-disk OHLCV history, one directory per (symbol, interval).
+
+    Each column is a flat little-endian binary file (int64 nanoseconds for
+    timestamps, float64 for prices and volume) that is memory-mapped for reads,
+    so a range read is two binary searches plus views over the mapped files.
+    The timestamp file is written last and defines how many rows are committed,
+    which keeps readers consistent if a write is interrupted.
+    """
+
+    def __init__(self, root=None, timezone=None):
+        self.root = root or config.BAR_STORE_DIR
+        self.timezone = timezone or config.MARKET_TIMEZONE
+        self.lock = threading.Lock()
+
+    def _path(self, symbol, interval, column):
+        # ':' is not allowed in Windows file names ("NSE:NIFTY")
+        safe_symbol = symbol.replace(':', '_').replace('/', '_')
+        return os.path.join(self.root, safe_symbol, interval, f"{column.lower()}.bin")
+
+    def _to_ns(self, index):
+        index = pd.DatetimeIndex(index)
+        if index.tz is None:
+            index = index.tz_localize(self.timezone)
+        return index.tz_convert('UTC').as_unit('ns').asi8
+
+    def _map(self, symbol, interval, column, dtype, rows):
+        path = self._path(symbol, interval, column)
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(rows,))
+
+    def count(self, symbol, interval):
+        """Number of committed bars for symbol/interval"""
+        path = self._path(symbol, interval, 'timestamp')
+        if not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // 8
+
+    def last_timestamp(self, symbol, interval):
+        """Timestamp of the newest stored bar, or None if nothing is stored"""
+        rows = self.count(symbol, interval)
+        if rows == 0:
+            return None
+        timestamps = self._map(symbol, interval, 'timestamp', '<i8', rows)
+        return pd.Timestamp(int(timestamps[-1]), tz='UTC').tz_convert(self.timezone)
+
+    def first_timestamp(self, symbol, interval):
+        """Timestamp of the oldest stored bar, or None if nothing is stored"""
+        rows = self.count(symbol, interval)
+        if rows == 0:
+            return None
+        timestamps = self._map(symbol, interval, 'timestamp', '<i8', rows)
+        return pd.Timestamp(int(timestamps[0]), tz='UTC').tz_convert(self.timezone)
+
+    def append(self, symbol, interval, df):
+        """
+        Append bars from a DataFrame with a DatetimeIndex and OHLCV columns.
+        A bar with the same timestamp as the newest stored one replaces it (the
+        live loop re-sends the in-progress candle every cycle). Bars older than
+        the oldest stored bar trigger a one-off rewrite that backfills them.
+        Returns the number of rows written.
+        """
+        if df is None or len(df) == 0:
+            return 0
+
+        timestamps = self._to_ns(df.index)
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        columns = {column: df[column].to_numpy(dtype='<f8')[order] for column in COLUMNS}
+
+        with self.lock:
+            rows = self.count(symbol, interval)
+            last = None
+            if rows:
+                stored = self._map(symbol, interval, 'timestamp', '<i8', rows)
+                if timestamps[0] < stored[0]:
+                    return self._rewrite(symbol, interval, rows, timestamps, columns)
+                last = int(stored[-1])
+
+            # Replace the newest stored bar in place if it is being updated
+            if last is not None:
+                same = np.flatnonzero(timestamps == last)
+                if len(same):
+                    i = same[-1]
+                    for column in COLUMNS:
+                        with open(self._path(symbol, interval, column), 'r+b') as f:
+                            f.seek((rows - 1) * 8)
+                            f.write(columns[column][i:i + 1].tobytes())
+
+            keep = timestamps > last if last is not None else np.ones(len(timestamps), dtype=bool)
+            # Drop duplicate timestamps within the batch, keeping the latest row
+            keep &= np.append(timestamps[1:] != timestamps[:-1], True)
+            if not keep.any():
+                return 0
+
+            os.makedirs(os.path.dirname(self._path(symbol, interval, 'timestamp')), exist_ok=True)
+            for column in COLUMNS:
+                path = self._path(symbol, interval, column)
+                with open(path, 'ab') as f:
+                    # Trim anything left over from an interrupted write
+                    f.truncate(rows * 8)
+                    f.write(columns[column][keep].tobytes())
+            with open(self._path(symbol, interval, 'timestamp'), 'ab') as f:
+                f.write(timestamps[keep].astype('<i8').tobytes())
+
+            return int(keep.sum())
+
+    def _rewrite(self, symbol, interval, rows, timestamps, columns):
+        """Merge new bars into the stored series and replace its files"""
+        stored = np.array(self._map(symbol, interval, 'timestamp', '<i8', rows))
+        merged_ts = np.concatenate([stored, timestamps])
+        # New bars win over stored ones with the same timestamp
+        order = np.lexsort((np.arange(len(merged_ts)), merged_ts))
+        merged_ts = merged_ts[order]
+        keep = np.append(merged_ts[1:] != merged_ts[:-1], True)
+
+        for column in COLUMNS + ['timestamp']:
+            if column == 'timestamp':
+                values = merged_ts[keep].astype('<i8')
+            else:
+                old = np.array(self._map(symbol, interval, column, '<f8', rows))
+                values = np.concatenate([old, columns[column]])[order][keep]
+            path = self._path(symbol, interval, column)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(values.tobytes())
+            os.replace(path + '.tmp', path)
+
+        return int(keep.sum()) - rows
+
+    def read(self, symbol, interval, start=None, end=None, last=None):
+        """
+        Read bars with start <= timestamp <= end (either bound optional), or the
+        newest `last` bars. OHLCV columns are views over the memory-mapped files.
+        Returns None when nothing is stored.
+        """
+        rows = self.count(symbol, interval)
+        if rows == 0:
+            return None
+
+        timestamps = self._map(symbol, interval, 'timestamp', '<i8', rows)
+        lo, hi = 0, rows
+        if start is not None:
+            lo = int(np.searchsorted(timestamps, self._to_ns([start])[0], side='left'))
+        if end is not None:
+            hi = int(np.searchsorted(timestamps, self._to_ns([end])[0], side='right'))
+        if last is not None:
+            lo = max(lo, hi - last)
+
+        data = {
+            column: self._map(symbol, interval, column, '<f8', rows)[lo:hi]
+            for column in COLUMNS
+        }
+        index = pd.DatetimeIndex(timestamps[lo:hi].view('M8[ns]')).tz_localize('UTC').tz_convert(self.timezone)
+        return pd.DataFrame(data, index=index, copy=False)
@@ -0,0 +1,83 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+__all__ = ['ConcurrentFetcher', 'FetchResult', 'get_default_fetcher']
+
+
+class FetchResult(dict):
+    """Results of one batch keyed like the submitted tasks, plus what went wrong"""
+
+    def __init__(self, results, missed, errors, elapsed):
+        super().__init__(results)
+        self.missed = missed      # keys that did not finish before the deadline
+        self.errors = errors      # key -> exception raised by the task
+        self.elapsed = elapsed    # wall time of the batch in seconds
+
+
+class ConcurrentFetcher:
+    """Run independent blocking fetches at once under a single batch deadline.
+
+    Every task is submitted to a shared thread pool immediately, so the latency
+    of a batch is bounded by its slowest request (or the deadline) rather than
+    the sum of all requests. Tasks that miss the deadline or raise are left
+    out of the result and listed in its ``missed`` and ``errors`` attributes.
+    """
+
+    def __init__(self, max_workers=8, deadline=30):
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+
+    def fetch_all(self, tasks, deadline=None):
+        """
+        Run ``tasks`` concurrently and return the results that finished in time.
+        tasks: dict mapping a key (e.g. "5m") to a zero-argument callable
+        deadline: seconds allowed for the whole batch (defaults to self.deadline)
+        """
+        deadline = self.deadline if deadline is None else deadline
+        start = time.monotonic()
+
+        futures = {self.executor.submit(task): key for key, task in tasks.items()}
+        done, not_done = wait(futures, timeout=deadline)
+
+        results = {}
+        errors = {}
+        for future in done:
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = e
+
+        # Running requests cannot be interrupted; queued ones are dropped and
+        # whatever is still in flight finishes in the background
+        for future in not_done:
+            future.cancel()
+        missed = {futures[future] for future in not_done}
+
+        # Keep the caller's key order so downstream dicts look the same as
+        # when they were filled sequentially
+        return FetchResult(
+            {key: results[key] for key in tasks if key in results},
+            missed=[key for key in tasks if key in missed],
+            errors=errors,
+            elapsed=time.monotonic() - start
+        )
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_default_fetcher = None
+
+
+def get_default_fetcher():
+    """Return the process-wide fetcher shared by the data collectors"""
+    global _default_fetcher
+    if _default_fetcher is None:
+        from .. import config
+        _default_fetcher = ConcurrentFetcher(
+            max_workers=config.FETCH_MAX_WORKERS,
+            deadline=config.FETCH_DEADLINE
+        )
+    return _default_fetcher
@@ -2,71 +2,133 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from tradingview_ta import TA_Handler, Interval
-import websocket
 import json
 from .. import config
+from .concurrent_fetch import get_default_fetcher
+from .screener import BatchScreener
+from .bar_store import BarStore
+from .option_chain import fetch_option_chain
+from ..analysis.resampler import TimeframeResampler, rate_timeframe
+from ..analysis.technical import TechnicalAnalyzer
+
+TV_INTERVALS = {
+    "1m": Interval.INTERVAL_1_MINUTE,
+    "5m": Interval.INTERVAL_5_MINUTES,
+    "15m": Interval.INTERVAL_15_MINUTES,
+    "30m": Interval.INTERVAL_30_MINUTES,
+    "1h": Interval.INTERVAL_1_HOUR,
+    "1d": Interval.INTERVAL_1_DAY
+}
+
+def _indicator_frame(indicators):
+    """
+    One-row frame of a timeframe's indicators (TradingView names, as in
+    Analysis.indicators); locally resampled timeframes also carry the engine's VWAP
+    """
+    frame = pd.DataFrame({
+        'Timestamp': [pd.Timestamp.now()],
+        'Open': [indicators['open']],
+        'High': [indicators['high']],
+        'Low': [indicators['low']],
+        'Close': [indicators['close']],
+        'Volume': [indicators['volume']],
+        'RSI': [indicators.get('RSI', 0)],
+        'ADX': [indicators.get('ADX', 0)],
+        'ATR': [indicators.get('ATR', 0)],
+        'MACD': [indicators.get('MACD.macd', 0)],
+        'MACD_Signal': [indicators.get('MACD.signal', 0)],
+        'BB_Upper': [indicators.get('BB.upper', 0)],
+        'BB_Middle': [indicators.get('BB.middle', 0)],
+        'BB_Lower': [indicators.get('BB.lower', 0)]
+    })
+    if 'VWAP' in indicators:
+        frame['VWAP'] = indicators['VWAP']
+    return frame
 
 class MarketDataCollector:
     def __init__(self):
+        # Remote handlers are the fallback for timeframes the resampler cannot serve yet
         self.handlers = {
-            "5m": TA_Handler(
-                symbol=config.SYMBOL,
-                exchange=config.EXCHANGE,
-                screener=config.SCREENER,
-                interval=Interval.INTERVAL_5_MINUTES
-            ),
-            "15m": TA_Handler(
-                symbol=config.SYMBOL,
-                exchange=config.EXCHANGE,
-                screener=config.SCREENER,
-                interval=Interval.INTERVAL_15_MINUTES
-            ),
-            "1h": TA_Handler(
+            interval: TA_Handler(
                 symbol=config.SYMBOL,
                 exchange=config.EXCHANGE,
                 screener=config.SCREENER,
-                interval=Interval.INTERVAL_1_HOUR
+                interval=TV_INTERVALS[interval]
             )
+            for interval in config.INTERVALS
         }
+        self.fetcher = get_default_fetcher()
+        self.screener = BatchScreener()
+        self.bar_store = BarStore()
+        # Completed Yahoo ^NSEI base bars resampled into the coarser INTERVALS
+        self.analyzer = TechnicalAnalyzer()
+        self.resampler = TimeframeResampler(config.BASE_INTERVAL, config.INTERVALS)
     
     def get_nifty_data(self):
         try:
             all_data = {}
             
-            for interval, handler in self.handlers.items():
-                analysis = handler.get_analysis()
-                indicators = analysis.indicators
-                
-                data = pd.DataFrame({
-                    'Timestamp': [pd.Timestamp.now()],
-                    'Open': [indicators['open']],
-                    'High': [indicators['high']],
-                    'Low': [indicators['low']],
-                    'Close': [indicators['close']],
-                    'Volume': [indicators['volume']],
-                    'RSI': [indicators.get('RSI', 0)],
-                    'ADX': [indicators.get('ADX', 0)],
-                    'ATR': [indicators.get('ATR', 0)],
-                    'MACD': [indicators.get('MACD.macd', 0)],
-                    'MACD_Signal': [indicators.get('MACD.signal', 0)],
-                    'BB_Upper': [indicators.get('BB.upper', 0)],
-                    'BB_Middle': [indicators.get('BB.middle', 0)],
-                    'BB_Lower': [indicators.get('BB.lower', 0)]
-                })
-                
+            # Every interval is built from completed base bars once those reach the bar that just closed
+            if self._sync_bars():
+                for interval in config.INTERVALS:
+                    indicators = self.resampler.timeframe_data(interval)
+                    if indicators is None:
+                        continue
+                    summary, moving_averages, oscillators = rate_timeframe(indicators)
+                    all_data[interval] = {
+                        'data': _indicator_frame(indicators),
+                        'summary': summary,
+                        'moving_averages': moving_averages,
+                        'oscillators': oscillators
+                    }
+            
+            # Request the remaining timeframes at once (the forming candle, so the scheduler samples
+            # it just before the close); late timeframes are left out
+            analyses = self.fetcher.fetch_all({
+                interval: handler.get_analysis
+                for interval, handler in self.handlers.items() if interval not in all_data
+            })
+            for interval in analyses.missed:
+                print(f"Timed out fetching {interval} data")
+            for interval, error in analyses.errors.items():
+                print(f"Error fetching {interval} data: {str(error)}")
+            
+            for interval, analysis in analyses.items():
                 all_data[interval] = {
-                    'data': data,
+                    'data': _indicator_frame(analysis.indicators),
                     'summary': analysis.summary,
                     'moving_averages': analysis.moving_averages,
                     'oscillators': analysis.oscillators
                 }
             
-            return all_data
+            all_data = {interval: all_data[interval] for interval in config.INTERVALS if interval in all_data}
+            return all_data if all_data else None
             
         except Exception as e:
             print(f"Error fetching Nifty data: {str(e)}")
             return None
     
+    def _sync_bars(self):
+        """Fold newly completed base bars into the resampler; True once it holds the bar that just closed"""
+        try:
+            bars = self.analyzer.fetch_completed_bars(config.BASE_INTERVAL, since=self.resampler.last_base)
+            self.resampler.update_frame(bars)
+        except Exception as e:
+            print(f"Error reading completed {config.BASE_INTERVAL} bars: {str(e)}")
+        return self.resampler.is_current()
+    
+    def get_history(self, interval, start=None, end=None, last=None):
+        """Read accumulated OHLCV bars for config.SYMBOL from the local bar store"""
+        return self.bar_store.read(config.SYMBOL, interval, start=start, end=end, last=last)
+    
+    def get_watchlist_data(self):
+        """Get {symbol: {interval: indicators}} for the whole watchlist in batched requests"""
+        try:
+            return self.screener.scan()
+        except Exception as e:
+            print(f"Error scanning watchlist: {str(e)}")
+            return None
+    
     def get_institutional_data(self):
         # Simulated institutional data
         return {
@@ -75,12 +137,15 @@ class MarketDataCollector:
         }
     
     def get_option_chain(self):
-        # Simulated option chain data
-        return {
-            'ATM': 19500,
-            'PCR': 0.85,
-            'max_pain': 19400
-        }
+        """ATM strike, PCR and max pain for the nearest NIFTY expiry, or None if NSE is unavailable"""
+        try:
+            chain = fetch_option_chain("NIFTY")
+            if chain is None or len(chain) == 0:
+                return None
+            return chain.summary()
+        except Exception as e:
+            print(f"Error fetching option chain: {str(e)}")
+            return None
     
     def get_global_indices(self):
         # Simulated global indices data
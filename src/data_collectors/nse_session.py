@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+import time
+from time import sleep
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from .. import config
+from ..monitoring.metrics import get_metrics
+from .concurrent_fetch import get_default_fetcher
+from .nse_headers import BASE_URL, COOKIE_URL, HEADERS, BROWSER_HEADERS
+from .response_cache import ResponseCache
+
+__all__ = ['NSESession', 'TokenBucket', 'get_nse_session']
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            sleep(wait)
+
+
+class NSESession:
+    """
+    Pooled NSE client shared by every caller in the process.
+
+    Connections are kept alive in a pool, cookies are saved to disk and reused
+    across restarts (so the warm-up page loads only happen when NSE rejects
+    them), and requests are paced by a token bucket rather than a fixed gap.
+    GET responses are cached per endpoint (config.NSE_CACHE_TTL) and callers
+    asking for the same URL at once share one request.
+    """
+
+    def __init__(self, cookie_file=None, rate=None, burst=None, pool_size=None, timeout=None):
+        self.cookie_file = cookie_file or config.NSE_COOKIE_FILE
+        self.timeout = timeout or config.NSE_TIMEOUT
+        self.rate_limiter = TokenBucket(rate or config.NSE_RATE_LIMIT, burst or config.NSE_BURST)
+        self.cookie_lock = threading.Lock()
+        self.cookies_updated = 0.0  # monotonic time of the last successful refresh
+
+        pool_size = pool_size or config.NSE_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(HEADERS)
+        self.session.headers.update(BROWSER_HEADERS)
+
+        self.cache = ResponseCache(max_entries=config.NSE_CACHE_SIZE,
+                                   default_ttl=config.NSE_CACHE_DEFAULT_TTL)
+
+        self.has_cookies = self._load_cookies()
+
+    def _load_cookies(self):
+        """Load unexpired cookies saved by a previous run"""
+        try:
+            if not os.path.exists(self.cookie_file):
+                return False
+            with open(self.cookie_file) as f:
+                saved = json.load(f)
+            now = time.time()
+            loaded = 0
+            for cookie in saved:
+                if cookie.get('expires') and cookie['expires'] < now:
+                    continue
+                self.session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=cookie.get('domain', ''), path=cookie.get('path', '/'),
+                    expires=cookie.get('expires')
+                )
+                loaded += 1
+            return loaded > 0
+        except Exception as e:
+            print(f"Error loading NSE cookies: {str(e)}")
+            return False
+
+    def _save_cookies(self):
+        try:
+            os.makedirs(os.path.dirname(self.cookie_file), exist_ok=True)
+            cookies = [
+                {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path, 'expires': c.expires}
+                for c in self.session.cookies
+            ]
+            with open(self.cookie_file, 'w') as f:
+                json.dump(cookies, f)
+        except Exception as e:
+            print(f"Error saving NSE cookies: {str(e)}")
+
+    def _update_cookies(self, stale_after=None):
+        """
+        Warm cookies with the NSE page loads. Concurrent callers that hit a
+        401/403 at the same time share one refresh: only a caller whose
+        `stale_after` is newer than the last refresh triggers another.
+        """
+        with self.cookie_lock:
+            if stale_after is not None and self.cookies_updated > stale_after:
+                return True
+            try:
+                # First get the main page to set initial cookies
+                self.rate_limiter.acquire()
+                self.session.get(BASE_URL, timeout=self.timeout)
+
+                # Then get the specific page for more cookies
+                self.rate_limiter.acquire()
+                response = self.session.get(COOKIE_URL, timeout=self.timeout)
+                if response.status_code == 200:
+                    self.has_cookies = True
+                    self.cookies_updated = time.monotonic()
+                    self._save_cookies()
+                    return True
+                return False
+            except Exception as e:
+                print(f"Error updating cookies: {str(e)}")
+                return False
+
+    def cache_ttl(self, url):
+        """Seconds a response from this URL stays fresh"""
+        return config.NSE_CACHE_TTL.get(urlsplit(url).path, config.NSE_CACHE_DEFAULT_TTL)
+
+    def make_request(self, url, method="GET", params=None, data=None, max_retries=3, use_cache=True):
+        """
+        Request an NSE API URL and return the decoded JSON, or None after all retries fail.
+        GET responses come from the cache while fresh; pass use_cache=False to force a request.
+        """
+        if method.upper() != "GET" or not use_cache:
+            return self._request(url, method, params, data, max_retries)
+
+        key = (url, tuple(sorted((params or {}).items())))
+        return self.cache.get_or_fetch(
+            key, lambda: self._request(url, method, params, data, max_retries), ttl=self.cache_ttl(url)
+        )
+
+    def cache_stats(self):
+        """Cache hit/miss counters, to check how many calls actually reach NSE"""
+        return self.cache.stats()
+
+    def _request(self, url, method, params, data, max_retries):
+        if not self.has_cookies:
+            self._update_cookies()
+
+        for attempt in range(max_retries):
+            started = time.monotonic()
+            try:
+                self.rate_limiter.acquire()
+                if method.upper() == "GET":
+                    response = self.session.get(url, params=params, timeout=self.timeout)
+                else:
+                    response = self.session.post(url, params=params, data=data, timeout=self.timeout)
+
+                if response.status_code == 200:
+                    return response.json()
+                elif response.status_code in [401, 403]:
+                    # Only a rejection means the cookies are stale
+                    self._update_cookies(stale_after=started)
+                    continue
+                else:
+                    print(f"Request failed with status code: {response.status_code}")
+
+            except Exception as e:
+                print(f"Request attempt {attempt + 1} failed: {str(e)}")
+                if attempt < max_retries - 1:
+                    sleep(2 ** attempt)
+                continue
+
+        return None
+
+    def fetch_many(self, urls, deadline=None):
+        """
+        Fetch independent endpoints concurrently (still paced by the rate limit).
+        urls: dict mapping a key to a URL. Returns {key: json} for the ones that succeeded.
+        """
+        results = get_default_fetcher().fetch_all(
+            {key: (lambda url=url: self.make_request(url)) for key, url in urls.items()},
+            deadline=deadline
+        )
+        return {key: value for key, value in results.items() if value is not None}
+
+
+_shared_session = None
+_shared_lock = threading.Lock()
+
+
+def get_nse_session():
+    """Return the process-wide NSE client; its cache counters are published with the metrics"""
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = NSESession()
+            get_metrics().add_collector('nse_cache', _shared_session.cache_stats,
+                                        summary=('hits', 'misses', 'coalesced', 'hit_rate'))
+        return _shared_session
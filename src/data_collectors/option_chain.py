@@ -0,0 +1,204 @@
+import threading
+from datetime import datetime
+import numpy as np
+from .nse_headers import BASE_URL
+from .nse_session import get_nse_session
+
+__all__ = ['OptionChain', 'fetch_option_chain', 'OPTION_CHAIN_URL']
+
+OPTION_CHAIN_URL = f"{BASE_URL}/api/option-chain-indices?symbol={{symbol}}"
+
+# Per-side fields copied out of each NSE row: attribute suffix -> JSON key
+SIDE_FIELDS = {
+    'ltp': 'lastPrice',
+    'oi': 'openInterest',
+    'oi_change': 'changeinOpenInterest',
+    'volume': 'totalTradedVolume',
+    'iv': 'impliedVolatility',
+    'bid': 'bidprice',
+    'ask': 'askPrice'
+}
+
+
+def _parse_expiry(value):
+    return np.datetime64(datetime.strptime(value, "%d-%b-%Y").date(), 'D')
+
+
+class OptionChain:
+    """
+    Columnar option chain: one row per (expiry, strike), sorted by expiry and
+    then strike, with NumPy arrays per field (ce_ltp, pe_oi, ce_iv, ...).
+
+    Rows for one expiry are contiguous, so strike lookups within an expiry are
+    binary searches and PCR / max pain / liquidity ranking are array operations.
+    A side that is not listed for a strike has NaN prices and IV and zero OI
+    and volume.
+    """
+
+    def __init__(self, strike, expiry, columns, underlying=None, timestamp=None):
+        self.strike = strike
+        self.expiry = expiry
+        self.columns = columns
+        self.underlying = underlying
+        self.timestamp = timestamp
+        for name, values in columns.items():
+            setattr(self, name, values)
+        self.expiries = np.unique(expiry)
+
+    @classmethod
+    def from_nse(cls, payload):
+        """Build the chain from an /api/option-chain-indices response (all expiries when available)"""
+        records = payload.get('records') or {}
+        rows = records.get('data') or payload.get('filtered', {}).get('data') or []
+
+        n = len(rows)
+        strike = np.empty(n, dtype=np.float64)
+        expiry = np.empty(n, dtype='datetime64[D]')
+        columns = {}
+        for side in ('ce', 'pe'):
+            for name in SIDE_FIELDS:
+                fill = 0.0 if name in ('oi', 'oi_change', 'volume') else np.nan
+                columns[f'{side}_{name}'] = np.full(n, fill, dtype=np.float64)
+
+        expiry_dates = {}  # only a handful of distinct expiries per response
+        for i, row in enumerate(rows):
+            strike[i] = row['strikePrice']
+            date = row['expiryDate']
+            if date not in expiry_dates:
+                expiry_dates[date] = _parse_expiry(date)
+            expiry[i] = expiry_dates[date]
+            for side in ('CE', 'PE'):
+                leg = row.get(side)
+                if not leg:
+                    continue
+                prefix = side.lower()
+                for name, key in SIDE_FIELDS.items():
+                    value = leg.get(key)
+                    if value is not None:
+                        columns[f'{prefix}_{name}'][i] = value
+
+        order = np.lexsort((strike, expiry))
+        columns = {name: values[order] for name, values in columns.items()}
+        return cls(strike[order], expiry[order], columns,
+                   underlying=records.get('underlyingValue'), timestamp=records.get('timestamp'))
+
+    def __len__(self):
+        return len(self.strike)
+
+    def for_expiry(self, expiry=None):
+        """Chain view for one expiry (nearest when None); slices share memory with this chain"""
+        if len(self) == 0:
+            return self
+        expiry = self.expiries[0] if expiry is None else np.datetime64(expiry, 'D')
+        start = np.searchsorted(self.expiry, expiry, side='left')
+        end = np.searchsorted(self.expiry, expiry, side='right')
+        return OptionChain(self.strike[start:end], self.expiry[start:end],
+                           {name: values[start:end] for name, values in self.columns.items()},
+                           underlying=self.underlying, timestamp=self.timestamp)
+
+    def _single_expiry(self):
+        return self if len(self.expiries) <= 1 else self.for_expiry()
+
+    def strike_index(self, strike):
+        """Row of an exact strike in the nearest expiry, or -1"""
+        chain = self._single_expiry()
+        i = np.searchsorted(chain.strike, strike)
+        return int(i) if i < len(chain) and chain.strike[i] == strike else -1
+
+    def atm_strike(self, price=None):
+        """Listed strike closest to price (the underlying by default), nearest expiry"""
+        chain = self._single_expiry()
+        price = self.underlying if price is None else price
+        if len(chain) == 0 or price is None:
+            return None
+        i = np.searchsorted(chain.strike, price)
+        candidates = chain.strike[max(i - 1, 0):i + 1]
+        return float(candidates[np.abs(candidates - price).argmin()])
+
+    def near_atm(self, price=None, width=1):
+        """Chain view of the ATM strike and `width` listed strikes either side"""
+        chain = self._single_expiry()
+        atm = self.atm_strike(price)
+        if atm is None:
+            return chain
+        i = np.searchsorted(chain.strike, atm)
+        start, end = max(i - width, 0), i + width + 1
+        return OptionChain(chain.strike[start:end], chain.expiry[start:end],
+                           {name: values[start:end] for name, values in chain.columns.items()},
+                           underlying=self.underlying, timestamp=self.timestamp)
+
+    def pcr(self):
+        """Put-call ratio by open interest"""
+        call_oi = self.ce_oi.sum()
+        return float(self.pe_oi.sum() / call_oi) if call_oi > 0 else None
+
+    def max_pain(self):
+        """Settlement strike (nearest expiry) at which option writers pay out the least"""
+        chain = self._single_expiry()
+        if len(chain) == 0:
+            return None
+        settle = chain.strike[:, None]
+        payout = (chain.ce_oi * np.maximum(settle - chain.strike, 0)).sum(axis=1) \
+            + (chain.pe_oi * np.maximum(chain.strike - settle, 0)).sum(axis=1)
+        return float(chain.strike[payout.argmin()])
+
+    def rank_liquidity(self, side):
+        """Row order for 'CE' or 'PE', most traded first (ties broken by open interest)"""
+        prefix = side.lower()
+        volume, oi = self.columns[f'{prefix}_volume'], self.columns[f'{prefix}_oi']
+        listed = ~np.isnan(self.columns[f'{prefix}_ltp'])
+        order = np.lexsort((-oi, -volume))
+        return order[listed[order]]
+
+    def most_liquid(self, side, price=None, width=1):
+        """
+        Most traded CE/PE within `width` strikes of ATM (nearest expiry) as
+        {'strike', 'price', 'volume', 'oi', 'iv'}, or None when nothing is listed.
+        """
+        chain = self.near_atm(price, width)
+        ranked = chain.rank_liquidity(side)
+        if len(ranked) == 0:
+            return None
+        i = ranked[0]
+        prefix = side.lower()
+        return {
+            'strike': float(chain.strike[i]),
+            'price': float(chain.columns[f'{prefix}_ltp'][i]),
+            'volume': int(chain.columns[f'{prefix}_volume'][i]),
+            'oi': int(chain.columns[f'{prefix}_oi'][i]),
+            'iv': float(chain.columns[f'{prefix}_iv'][i])
+        }
+
+    def summary(self):
+        """ATM, PCR and max pain for the nearest expiry"""
+        chain = self._single_expiry()
+        return {
+            'ATM': chain.atm_strike(),
+            'PCR': chain.pcr(),
+            'max_pain': chain.max_pain(),
+            'expiry': str(chain.expiries[0]) if len(chain.expiries) else None,
+            'underlying': self.underlying
+        }
+
+
+_parsed = {}
+_parsed_lock = threading.Lock()
+
+
+def fetch_option_chain(symbol="NIFTY"):
+    """
+    Fetch and parse the NSE option chain for an index, or None on failure.
+    The NSE client caches the response for a few seconds; a response that was
+    already parsed is not parsed again.
+    """
+    payload = get_nse_session().make_request(OPTION_CHAIN_URL.format(symbol=symbol))
+    if not payload:
+        return None
+    with _parsed_lock:
+        cached = _parsed.get(symbol)
+        if cached is not None and cached[0] is payload:
+            return cached[1]
+    chain = OptionChain.from_nse(payload)
+    with _parsed_lock:
+        _parsed[symbol] = (payload, chain)
+    return chain
@@ -0,0 +1,155 @@
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+import pandas as pd
+from .. import config
+
+__all__ = ['SnapshotRecorder', 'SnapshotReader', 'get_recorder']
+
+MAGIC = b'TBREC1\n'
+# payload length, timestamp (ns since epoch, UTC), cycle number, kind length
+HEADER = struct.Struct('<IqIH')
+
+
+class SnapshotRecorder:
+    """
+    Append-only log of the raw inputs the analysis pipeline fetched.
+
+    One segment file per session day (data/recordings/YYYY-MM-DD.rec). Each
+    record is a fixed header (payload length, timestamp, cycle number, kind
+    length) followed by the kind ("tv_data", "option_chain", ...) and the
+    zlib-compressed pickle of the value, so appending is one write and a
+    reader can skip records without decoding them. begin_cycle() groups the
+    inputs of one analysis run for replay. A record torn by a crash is cut
+    off the segment before this process first appends to it, so later
+    records stay readable. Recording never raises into the live loop:
+    failures are printed and the input is dropped.
+    """
+
+    def __init__(self, directory=None, enabled=True, timezone=None, compression=1):
+        self.directory = directory or config.RECORD_DIR
+        self.enabled = enabled
+        self.timezone = timezone or config.MARKET_TIMEZONE
+        self.compression = compression
+        self.lock = threading.Lock()
+        self.cycle = 0
+        self.records = 0
+        self.repaired = set()  # segments checked for a torn tail by this process
+
+    def segment_path(self, timestamp=None):
+        day = pd.Timestamp(timestamp if timestamp is not None else time.time_ns(), tz='UTC')
+        return os.path.join(self.directory, f"{day.tz_convert(self.timezone).date()}.rec")
+
+    def begin_cycle(self):
+        """Start a new analysis run; later records belong to it"""
+        with self.lock:
+            # Seconds-based ids stay distinct across restarts that append to the same segment
+            self.cycle = max(self.cycle + 1, int(time.time()))
+            return self.cycle
+
+    def record(self, kind, value, timestamp=None):
+        """Append one input snapshot; timestamp is ns since epoch (now by default)"""
+        if not self.enabled:
+            return False
+        try:
+            timestamp = time.time_ns() if timestamp is None else int(timestamp)
+            payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), self.compression)
+            name = kind.encode('utf-8')
+            path = self.segment_path(timestamp)
+            with self.lock:
+                header = HEADER.pack(len(payload), timestamp, self.cycle, len(name))
+                os.makedirs(self.directory, exist_ok=True)
+                if path not in self.repaired:
+                    _truncate_torn_tail(path)
+                    self.repaired.add(path)
+                with open(path, 'ab') as f:
+                    if f.tell() == 0:
+                        f.write(MAGIC)
+                    f.write(header + name + payload)
+                self.records += 1
+            return True
+        except Exception as e:
+            print(f"Error recording {kind}: {str(e)}")
+            return False
+
+
+def _complete_length(f):
+    """Bytes of the segment up to the end of its last complete record"""
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(0)
+    if f.read(len(MAGIC)) != MAGIC:
+        return 0
+    end = f.tell()
+    while end + HEADER.size <= size:
+        length, _, _, name_length = HEADER.unpack(f.read(HEADER.size))
+        record_end = end + HEADER.size + name_length + length
+        if record_end > size:
+            break
+        end = record_end
+        f.seek(end)
+    return end
+
+
+def _truncate_torn_tail(path):
+    """Cut a partially written final record (or magic) off a segment"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r+b') as f:
+        end = _complete_length(f)
+        f.seek(0, os.SEEK_END)
+        if end < f.tell():
+            print(f"Recording {path}: dropping a torn record ({f.tell() - end} bytes)")
+            f.truncate(end)
+
+
+class SnapshotReader:
+    """Sequential reader for a SnapshotRecorder segment (no network, no live state)"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        """(timestamp, cycle, kind, value) in recording order; a torn final record is ignored"""
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a snapshot recording: {self.path}")
+            while True:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    return
+                length, timestamp, cycle, name_length = HEADER.unpack(header)
+                name = f.read(name_length)
+                payload = f.read(length)
+                if len(name) < name_length or len(payload) < length:
+                    return
+                yield (pd.Timestamp(timestamp, tz='UTC'), cycle, name.decode('utf-8'),
+                       pickle.loads(zlib.decompress(payload)))
+
+    def cycles(self):
+        """(timestamp of the cycle's first record, {kind: value}) per recorded analysis run"""
+        current, started, inputs = None, None, {}
+        for timestamp, cycle, kind, value in self:
+            if cycle != current:
+                if inputs:
+                    yield started, inputs
+                current, started, inputs = cycle, timestamp, {}
+            inputs[kind] = value
+        if inputs:
+            yield started, inputs
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    """Return the process-wide recorder (a no-op when config.RECORD_INPUTS is off)"""
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = SnapshotRecorder(enabled=config.RECORD_INPUTS)
+        return _recorder
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+__all__ = ['ResponseCache']
+
+
+class ResponseCache:
+    """Thread-safe TTL cache with LRU eviction and request coalescing.
+
+    ``get_or_fetch`` returns a fresh cached value when there is one. Otherwise
+    the first caller for a key runs the fetch, and callers asking for the same
+    key while it is running wait for that result instead of sending their own
+    request. ``None`` results (failed requests) are passed back but never
+    cached.
+    """
+
+    def __init__(self, max_entries=256, default_ttl=5):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.in_flight = {}           # key -> Future of the running fetch
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Cached value for key, or None if it is missing or expired"""
+        with self.lock:
+            return self._lookup(key, time.monotonic())
+
+    def _lookup(self, key, now):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_fetch(self, key, fetch, ttl=None):
+        """
+        Return the cached value for key, or call fetch() once and cache its result.
+        ttl: seconds the value stays fresh (defaults to self.default_ttl; 0 disables caching)
+        """
+        with self.lock:
+            value = self._lookup(key, time.monotonic())
+            if value is not None:
+                self.hits += 1
+                return value
+            pending = self.in_flight.get(key)
+            if pending is None:
+                self.misses += 1
+                pending = self.in_flight[key] = Future()
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+
+        if not owner:
+            return pending.result()
+
+        try:
+            value = fetch()
+        except Exception as e:
+            with self.lock:
+                del self.in_flight[key]
+            pending.set_exception(e)
+            raise
+
+        if value is not None and (ttl is None or ttl > 0):
+            self.put(key, value, ttl)
+        with self.lock:
+            del self.in_flight[key]
+        pending.set_result(value)
+        return value
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None"""
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def stats(self):
+        """Hit/miss counters; `coalesced` counts callers that shared an in-flight request"""
+        with self.lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0
+            }
@@ -0,0 +1,61 @@
+import threading
+import numpy as np
+import pandas as pd
+from .. import config
+
+__all__ = ['BarRingBuffer']
+
+
+class BarRingBuffer:
+    """
+    Fixed-capacity OHLCV history in preallocated NumPy columns.
+
+    Appending overwrites the oldest bar once the buffer is full, so memory
+    stays constant however long the stream runs. Reads return copies in
+    chronological order.
+    """
+
+    def __init__(self, capacity=None, timezone=None):
+        self.capacity = capacity or config.STREAM_BUFFER_SIZE
+        self.timezone = timezone or config.MARKET_TIMEZONE
+        self.timestamp = np.zeros(self.capacity, dtype=np.int64)  # bar start, UTC ns
+        self.values = np.zeros((self.capacity, 5), dtype=np.float64)  # Open, High, Low, Close, Volume
+        self.size = 0
+        self.head = 0  # next slot to write
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def append(self, timestamp, open_, high, low, close, volume):
+        with self.lock:
+            self.timestamp[self.head] = timestamp
+            self.values[self.head] = (open_, high, low, close, volume)
+            self.head = (self.head + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+
+    def _order(self, n):
+        n = self.size if n is None else min(n, self.size)
+        return (np.arange(self.head - n, self.head)) % self.capacity
+
+    def last(self, n=None):
+        """(timestamps, values) of the last n bars, oldest first"""
+        with self.lock:
+            index = self._order(n)
+            return self.timestamp[index], self.values[index]
+
+    def last_bar(self):
+        """Most recent bar as a dict, or None"""
+        with self.lock:
+            if self.size == 0:
+                return None
+            i = (self.head - 1) % self.capacity
+            o, h, l, c, v = self.values[i]
+            return {'timestamp': pd.Timestamp(int(self.timestamp[i]), tz='UTC').tz_convert(self.timezone),
+                    'Open': o, 'High': h, 'Low': l, 'Close': c, 'Volume': v}
+
+    def to_frame(self, n=None):
+        """Last n bars as an OHLCV DataFrame indexed by bar start (market timezone)"""
+        timestamps, values = self.last(n)
+        index = pd.DatetimeIndex(timestamps.view('datetime64[ns]')).tz_localize('UTC').tz_convert(self.timezone)
+        return pd.DataFrame(values, index=index, columns=['Open', 'High', 'Low', 'Close', 'Volume'])
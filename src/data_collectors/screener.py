@@ -0,0 +1,122 @@
+from tradingview_ta import get_multiple_analysis
+from .. import config
+from .concurrent_fetch import get_default_fetcher
+
+__all__ = ['BatchScreener', 'build_timeframe_data']
+
+
+def build_timeframe_data(analysis):
+    """Flatten a TradingView Analysis into the per-timeframe dict used for scoring"""
+    indicators = analysis.indicators
+    oscillators = analysis.oscillators
+    moving_averages = analysis.moving_averages
+
+    return {
+        # Price data
+        'close': indicators.get('close', 0),
+        'open': indicators.get('open', 0),
+        'high': indicators.get('high', 0),
+        'low': indicators.get('low', 0),
+        'volume': indicators.get('volume', 0),
+
+        # Technical indicators
+        'RSI': indicators.get('RSI', 0),
+        'RSI[1]': indicators.get('RSI[1]', 0),
+        'EMA20': indicators.get('EMA20', 0),
+        'EMA50': indicators.get('EMA50', 0),
+        'EMA200': indicators.get('EMA200', 0),
+        'SMA20': indicators.get('SMA20', 0),
+        'SMA50': indicators.get('SMA50', 0),
+        'SMA200': indicators.get('SMA200', 0),
+
+        # Bollinger Bands
+        'BB.upper': indicators.get('BB.upper', 0),
+        'BB.lower': indicators.get('BB.lower', 0),
+        'BB.middle': indicators.get('BB.middle', 0),
+
+        # MACD
+        'MACD.macd': indicators.get('MACD.macd', 0),
+        'MACD.signal': indicators.get('MACD.signal', 0),
+
+        # Volume indicators
+        'ADX': indicators.get('ADX', 0),
+        'ADX+': indicators.get('ADX+DI', 0),
+        'ADX-': indicators.get('ADX-DI', 0),
+
+        # Additional data
+        'Stoch.K': indicators.get('Stoch.K', 0),
+        'Stoch.D': indicators.get('Stoch.D', 0),
+        'ATR': indicators.get('ATR', 0),
+
+        # Summary
+        'recommendation': analysis.summary.get('RECOMMENDATION', 'NEUTRAL'),
+        'oscillator_summary': oscillators.get('RECOMMENDATION', 'NEUTRAL'),
+        'ma_summary': moving_averages.get('RECOMMENDATION', 'NEUTRAL')
+    }
+
+
+class BatchScreener:
+    """Fetch TradingView analysis for many symbols with one scanner request per interval.
+
+    Symbols are split into batches of ``batch_size`` tickers and every
+    (interval, batch) pair is sent concurrently, so a cycle over hundreds of
+    symbols costs a handful of HTTP calls instead of one per symbol.
+    """
+
+    def __init__(self, symbols=None, intervals=None, exchange=None, screener=None,
+                 batch_size=None, timeout=30):
+        self.symbols = list(symbols or config.WATCHLIST)
+        self.intervals = list(intervals or config.INTERVALS)
+        self.exchange = exchange or config.EXCHANGE
+        self.screener = screener or config.SCREENER
+        self.batch_size = batch_size or config.SCREENER_BATCH_SIZE
+        self.timeout = timeout
+        self.fetcher = get_default_fetcher()
+
+    def _ticker(self, symbol):
+        # Symbols may already carry an exchange prefix (e.g. "BSE:SENSEX")
+        return symbol.upper() if ':' in symbol else f"{self.exchange}:{symbol}".upper()
+
+    def _batches(self):
+        tickers = [self._ticker(symbol) for symbol in self.symbols]
+        for start in range(0, len(tickers), self.batch_size):
+            yield start // self.batch_size, tickers[start:start + self.batch_size]
+
+    def scan(self):
+        """
+        Return {symbol: {interval: timeframe dict}} for every symbol that answered.
+        Symbols TradingView has no data for are left out.
+        """
+        tasks = {}
+        for interval in self.intervals:
+            for batch_no, tickers in self._batches():
+                tasks[(interval, batch_no)] = (
+                    lambda interval=interval, tickers=tickers: get_multiple_analysis(
+                        screener=self.screener,
+                        interval=interval,
+                        symbols=tickers,
+                        timeout=self.timeout
+                    )
+                )
+
+        responses = self.fetcher.fetch_all(tasks)
+        for key in responses.missed:
+            print(f"Timed out scanning {key[0]} batch {key[1]}")
+        for key, error in responses.errors.items():
+            print(f"Error scanning {key[0]} batch {key[1]}: {str(error)}")
+
+        # Fan the per-interval responses out into per-symbol timeframe dicts
+        results = {}
+        ticker_to_symbol = {self._ticker(symbol): symbol for symbol in self.symbols}
+        for (interval, _), analyses in responses.items():
+            for ticker, analysis in analyses.items():
+                if analysis is None:
+                    continue
+                symbol = ticker_to_symbol.get(ticker, ticker)
+                results.setdefault(symbol, {})[interval] = build_timeframe_data(analysis)
+
+        # Keep timeframes in the configured order for every symbol
+        return {
+            symbol: {tf: results[symbol][tf] for tf in self.intervals if tf in results[symbol]}
+            for symbol in self.symbols if symbol in results
+        }
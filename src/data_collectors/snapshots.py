@@ -0,0 +1,174 @@
+import threading
+import numpy as np
+import pandas as pd
+from .. import config
+
+__all__ = ['SNAPSHOT_DTYPE', 'is_snapshot', 'to_snapshot', 'SnapshotBuffer', 'SnapshotHistory']
+
+# Numeric snapshot fields (the keys of build_timeframe_data) -> TradingView indicator
+INDICATOR_FIELDS = {
+    'close': 'close', 'open': 'open', 'high': 'high', 'low': 'low', 'volume': 'volume',
+    'RSI': 'RSI', 'RSI[1]': 'RSI[1]',
+    'EMA20': 'EMA20', 'EMA50': 'EMA50', 'EMA200': 'EMA200',
+    'SMA20': 'SMA20', 'SMA50': 'SMA50', 'SMA200': 'SMA200',
+    'BB.upper': 'BB.upper', 'BB.lower': 'BB.lower', 'BB.middle': 'BB.middle',
+    'MACD.macd': 'MACD.macd', 'MACD.signal': 'MACD.signal',
+    'ADX': 'ADX', 'ADX+': 'ADX+DI', 'ADX-': 'ADX-DI',
+    'Stoch.K': 'Stoch.K', 'Stoch.D': 'Stoch.D', 'ATR': 'ATR'
+}
+RATING_FIELDS = ('recommendation', 'oscillator_summary', 'ma_summary')
+
+# One timeframe at one bar: bar start (UTC ns, 0 if unknown), indicators and TradingView ratings.
+# Records index like build_timeframe_data's dict (snapshot['MACD.macd']) at ~350 bytes apiece.
+SNAPSHOT_DTYPE = np.dtype(
+    [('timestamp', 'i8')]
+    + [(name, 'f8') for name in INDICATOR_FIELDS]
+    + [(name, 'U11') for name in RATING_FIELDS]   # 'STRONG_SELL' is the longest rating
+)
+
+# Padding for lookbacks reaching past the stored history
+_EMPTY = np.zeros(1, SNAPSHOT_DTYPE)
+_EMPTY[list(INDICATOR_FIELDS)] = tuple([np.nan] * len(INDICATOR_FIELDS))
+
+
+def _nanos(timestamp):
+    if timestamp is None:
+        return 0
+    if isinstance(timestamp, (int, np.integer)):
+        return int(timestamp)
+    stamp = pd.Timestamp(timestamp)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize(config.MARKET_TIMEZONE)
+    return stamp.value
+
+
+def is_snapshot(value):
+    return isinstance(value, np.void) and value.dtype == SNAPSHOT_DTYPE
+
+
+def to_snapshot(source, timestamp=None):
+    """
+    One timeframe as a SNAPSHOT_DTYPE record, from a tradingview_ta Analysis,
+    a build_timeframe_data-style dict or another record. Missing indicators
+    are 0 and missing ratings NEUTRAL, as in build_timeframe_data.
+    `timestamp` is the bar start; records keep their own unless it is given.
+    """
+    if is_snapshot(source):
+        if timestamp is None:
+            return source
+        record = source.copy()
+        record['timestamp'] = _nanos(timestamp)
+        return record
+
+    record = np.zeros(1, SNAPSHOT_DTYPE)[0]
+    record['timestamp'] = _nanos(timestamp)
+    if hasattr(source, 'indicators') and hasattr(source, 'summary'):
+        indicators = source.indicators
+        for name, indicator in INDICATOR_FIELDS.items():
+            value = indicators.get(indicator)
+            record[name] = value if value is not None else 0.0
+        ratings = (source.summary, source.oscillators, source.moving_averages)
+        for name, rating in zip(RATING_FIELDS, ratings):
+            record[name] = rating.get('RECOMMENDATION') or 'NEUTRAL'
+    else:
+        for name in INDICATOR_FIELDS:
+            value = source.get(name)
+            record[name] = value if value is not None else 0.0
+        for name in RATING_FIELDS:
+            record[name] = source.get(name) or 'NEUTRAL'
+    return record
+
+
+class SnapshotBuffer:
+    """
+    The last `capacity` snapshots of one timeframe in a preallocated
+    SNAPSHOT_DTYPE array. Appending overwrites the oldest snapshot once the
+    buffer is full; a snapshot with the same bar timestamp as the newest one
+    replaces it (the bar was polled again before it closed).
+    """
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity or config.SNAPSHOT_HISTORY_SIZE
+        self.values = np.zeros(self.capacity, dtype=SNAPSHOT_DTYPE)
+        self.size = 0
+        self.head = 0  # next slot to write
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def append(self, source, timestamp=None):
+        snapshot = to_snapshot(source, timestamp)
+        with self.lock:
+            newest = (self.head - 1) % self.capacity
+            if self.size and snapshot['timestamp'] and self.values[newest]['timestamp'] == snapshot['timestamp']:
+                self.values[newest] = snapshot
+                return
+            self.values[self.head] = snapshot
+            self.head = (self.head + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+
+    def latest(self):
+        """Newest snapshot (a copy), or None"""
+        with self.lock:
+            if self.size == 0:
+                return None
+            return self.values[(self.head - 1) % self.capacity].copy()
+
+    def window(self, bars, current=None):
+        """
+        The last `bars` snapshots, oldest first, as a SNAPSHOT_DTYPE array
+        padded at the front with NaN rows while the history is shorter.
+        With `current` the window ends at that snapshot, after the stored
+        bars before it (whether or not it has been appended yet).
+        """
+        window = np.repeat(_EMPTY, bars)
+        if current is not None:
+            current = to_snapshot(current)
+        with self.lock:
+            count, head = self.size, self.head
+            if current is not None and count:
+                newest = self.values[(head - 1) % self.capacity]
+                if newest.tobytes() == current.tobytes() or (
+                        current['timestamp'] and newest['timestamp'] == current['timestamp']):
+                    count, head = count - 1, head - 1  # already stored (or an older poll of its bar)
+            end = bars if current is None else bars - 1
+            take = min(end, count)
+            if take:
+                window[end - take:end] = self.values[np.arange(head - take, head) % self.capacity]
+        if current is not None:
+            window[-1] = current
+        return window
+
+
+class SnapshotHistory:
+    """
+    Per-timeframe SnapshotBuffers for N-bar lookbacks (previous volume, RSI
+    slope, MACD histogram change) that a single TradingView snapshot cannot
+    give. Memory is fixed at `capacity` snapshots per timeframe.
+    """
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity or config.SNAPSHOT_HISTORY_SIZE
+        self.buffers = {}
+
+    def buffer(self, timeframe):
+        if timeframe not in self.buffers:
+            self.buffers[timeframe] = SnapshotBuffer(self.capacity)
+        return self.buffers[timeframe]
+
+    def append(self, timeframe, source, timestamp=None):
+        self.buffer(timeframe).append(source, timestamp)
+
+    def append_cycle(self, data):
+        """Store one cycle's {timeframe: snapshot}"""
+        for timeframe, source in data.items():
+            self.append(timeframe, source)
+
+    def window(self, timeframe, bars, current=None):
+        """SnapshotBuffer.window of one timeframe (all padding for a timeframe never seen)"""
+        return self.buffer(timeframe).window(bars, current)
+
+    def windows(self, data, bars):
+        """{timeframe: window of `bars` snapshots ending at data[timeframe]}"""
+        return {timeframe: self.window(timeframe, bars, current) for timeframe, current in data.items()}
@@ -0,0 +1,400 @@
+import json
+import queue
+import threading
+import time
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from .. import config
+from ..capabilities import require
+from ..scheduling.trading_calendar import TradingCalendar, INTERVAL_MINUTES
+from .ring_buffer import BarRingBuffer
+
+__all__ = ['Tick', 'BarEvent', 'BarAggregator', 'WebSocketTickFeed', 'ReplayTickFeed', 'TickStream', 'to_nanos']
+
+Tick = namedtuple('Tick', ['timestamp', 'price', 'volume'])  # timestamp: UTC ns
+BarEvent = namedtuple('BarEvent', ['symbol', 'interval', 'bar', 'latency'])
+
+MINUTE_NS = 60 * 10**9
+DAY_NS = 24 * 3600 * 10**9
+
+
+def to_nanos(value):
+    """Tick time as UTC nanoseconds: epoch seconds/ms/ns numbers, ISO strings or datetimes"""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        value = float(value)
+        if value > 1e17:
+            return int(value)
+        if value > 1e11:
+            return int(value * 10**6)
+        return int(value * 10**9)
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is None:
+        stamp = stamp.tz_localize(config.MARKET_TIMEZONE)
+    return stamp.value
+
+
+class BarAggregator:
+    """
+    Builds OHLCV bars for several intervals from a tick stream.
+
+    Bars are aligned to the session open from the trading calendar (09:15,
+    09:20, ... for 5m; the last hourly bar is 15:15-15:30) and ticks outside
+    the session are ignored. A bar closes when the first tick of a later bar
+    arrives or when close_until() passes its end, whichever comes first.
+    Closed bars go into a ring buffer per interval and are handed to
+    `on_close(interval, bar)`.
+
+    Only complete bars are kept and published: a bar must either open with a
+    tick at its boundary (within config.STREAM_BAR_TOLERANCE) or follow a
+    closed bar of the same interval with the feed live throughout. The first
+    bar after startup or after mark_gap() (a feed disconnect) holds only part
+    of its interval and is dropped and counted in `incomplete_bars`.
+    """
+
+    def __init__(self, intervals=None, calendar=None, capacity=None, cumulative_volume=False, on_close=None):
+        self.intervals = list(intervals or config.STREAM_INTERVALS)
+        self.steps = {interval: INTERVAL_MINUTES[interval] * MINUTE_NS for interval in self.intervals}
+        self.calendar = calendar or TradingCalendar()
+        self.cumulative_volume = cumulative_volume
+        self.on_close = on_close
+        self.buffers = {interval: BarRingBuffer(capacity) for interval in self.intervals}
+        self.current = {interval: None for interval in self.intervals}  # [start, end, o, h, l, c, v, complete]
+        self.closed_until = {interval: 0 for interval in self.intervals}  # end of the last closed bar
+        self.broken = {interval: True for interval in self.intervals}  # no tick seen since startup or a gap
+        self.tolerance = int(config.STREAM_BAR_TOLERANCE * 1e9)
+        self.sessions = {}  # IST day number -> (open ns, close ns) or None
+        self.offset = pd.Timedelta(pd.Timestamp.now(tz=self.calendar.timezone).utcoffset()).value
+        self.last_cumulative = None
+        self.lock = threading.Lock()
+        self.ticks = 0
+        self.ignored_ticks = 0
+        self.late_ticks = 0
+        self.incomplete_bars = 0
+        self.last_tick = None
+
+    def _session(self, ts):
+        day = (ts + self.offset) // DAY_NS
+        if day not in self.sessions:
+            bounds = self.calendar.session(pd.Timestamp(int(day * DAY_NS)).date())
+            self.sessions[day] = None if bounds is None else (bounds[0].value, bounds[1].value)
+        return self.sessions[day]
+
+    def on_tick(self, tick):
+        """Add one tick; returns the bars it closed as [(interval, bar), ...]"""
+        ts, price, volume = tick
+        with self.lock:
+            if self.cumulative_volume:
+                previous, self.last_cumulative = self.last_cumulative, volume
+                volume = volume - previous if previous is not None and volume >= previous else 0.0
+
+            session = self._session(ts)
+            if session is None or not session[0] <= ts < session[1]:
+                self.ignored_ticks += 1
+                self.broken = dict.fromkeys(self.intervals, False)
+                return []
+            self.ticks += 1
+
+            closed = []
+            for interval in self.intervals:
+                bar = self.current[interval]
+                if ts < self.closed_until[interval]:
+                    # Belongs to a bar that was already closed and published
+                    self.late_ticks += 1
+                    continue
+                if bar is not None and ts < bar[1]:
+                    bar[3] = max(bar[3], price)
+                    bar[4] = min(bar[4], price)
+                    bar[5] = price
+                    bar[6] += volume
+                    continue
+                if bar is not None:
+                    closed.append((interval, self._close(interval)))
+                step = self.steps[interval]
+                start = session[0] + (ts - session[0]) // step * step
+                # Complete only if no part of the bar can have been missed
+                complete = ts - start <= self.tolerance or (
+                    not self.broken[interval] and self.closed_until[interval] == start)
+                self.current[interval] = [start, min(start + step, session[1]),
+                                          price, price, price, price, volume, complete]
+            self.broken = dict.fromkeys(self.intervals, False)
+            self.last_tick = ts
+        return self._publish(closed)
+
+    def close_until(self, now):
+        """Close every open bar that ends at or before `now` (UTC ns), even without a new tick"""
+        closed = []
+        with self.lock:
+            for interval in self.intervals:
+                bar = self.current[interval]
+                if bar is not None and bar[1] <= now:
+                    closed.append((interval, self._close(interval)))
+        return self._publish(closed)
+
+    def finish(self):
+        """End of a finite feed: close the bars its ticks ran to the end of and drop the rest"""
+        closed = [] if self.last_tick is None else self.close_until(self.last_tick + self.tolerance)
+        self.mark_gap()
+        self.close_until(np.iinfo(np.int64).max)
+        return closed
+
+    def mark_gap(self):
+        """The feed dropped: the open bars have lost ticks, and so will any bar opened before the next tick"""
+        with self.lock:
+            for interval in self.intervals:
+                if self.current[interval] is not None:
+                    self.current[interval][7] = False
+            self.broken = dict.fromkeys(self.intervals, True)
+
+    def next_close(self):
+        """Earliest end time (UTC ns) among the bars still open, or None"""
+        with self.lock:
+            ends = [bar[1] for bar in self.current.values() if bar is not None]
+        return min(ends) if ends else None
+
+    def _close(self, interval):
+        """Close the open bar; returns it as a dict, or None if it was incomplete"""
+        start, end, o, h, l, c, v, complete = self.current[interval]
+        self.current[interval] = None
+        self.closed_until[interval] = end
+        if not complete:
+            self.incomplete_bars += 1
+            return None
+        self.buffers[interval].append(start, o, h, l, c, v)
+        return {'timestamp': int(start), 'Open': float(o), 'High': float(h), 'Low': float(l),
+                'Close': float(c), 'Volume': float(v)}
+
+    def _publish(self, closed):
+        closed = [(interval, bar) for interval, bar in closed if bar is not None]
+        if self.on_close is not None:
+            for interval, bar in closed:
+                self.on_close(interval, bar)
+        return closed
+
+    def bars(self, interval, n=None):
+        """Closed bars of an interval as an OHLCV DataFrame"""
+        return self.buffers[interval].to_frame(n)
+
+
+class WebSocketTickFeed:
+    """
+    Ticks from a websocket feed (websocket-client), reconnecting on drops.
+
+    Each message is decoded as JSON and passed to `parser`, which returns a
+    list of Tick; the default accepts {"timestamp", "price", "volume"}
+    objects or lists of them. `subscribe` (a dict or string) is sent after
+    every (re)connect. `on_disconnect()`, when set, is called on every drop.
+    """
+
+    realtime = True
+
+    def __init__(self, url, subscribe=None, parser=None, reconnect_delay=5, ping_interval=20):
+        self.url = url
+        self.subscribe = subscribe
+        self.parser = parser or self.parse
+        self.reconnect_delay = reconnect_delay
+        self.ping_interval = ping_interval
+        self.on_disconnect = None
+        self.app = None
+        self.is_connected = False
+        self.stopped = threading.Event()
+
+    @staticmethod
+    def parse(message):
+        data = json.loads(message)
+        items = data if isinstance(data, list) else [data]
+        return [Tick(to_nanos(item['timestamp']), float(item['price']), float(item.get('volume', 0.0)))
+                for item in items if 'price' in item]
+
+    def run(self, on_tick):
+        """Blocking: deliver ticks to on_tick until stop() is called"""
+        websocket = require('websocket')
+
+        def on_open(ws):
+            self.is_connected = True
+            if self.subscribe is not None:
+                ws.send(self.subscribe if isinstance(self.subscribe, str) else json.dumps(self.subscribe))
+
+        def on_message(ws, message):
+            try:
+                ticks = self.parser(message)
+            except Exception as e:
+                print(f"Error parsing tick message: {str(e)}")
+                return
+            for tick in ticks:
+                on_tick(tick)
+
+        def on_close(ws, status, reason):
+            self.is_connected = False
+            if self.on_disconnect is not None:
+                self.on_disconnect()
+
+        def on_error(ws, error):
+            print(f"Tick feed error: {str(error)}")
+
+        while not self.stopped.is_set():
+            self.app = websocket.WebSocketApp(self.url, on_open=on_open, on_message=on_message,
+                                              on_close=on_close, on_error=on_error)
+            self.app.run_forever(ping_interval=self.ping_interval)
+            self.is_connected = False
+            if self.stopped.wait(self.reconnect_delay):
+                break
+
+    def stop(self):
+        self.stopped.set()
+        if self.app is not None:
+            self.app.close()
+
+
+class ReplayTickFeed:
+    """
+    Stand-in feed that replays ticks from a CSV file (timestamp, price, volume
+    columns) or a DataFrame. With `speed` set the original spacing is kept,
+    scaled by that factor; otherwise ticks are replayed as fast as possible.
+    """
+
+    def __init__(self, source, speed=None):
+        self.source = source
+        self.speed = speed
+        self.realtime = False
+        self.is_connected = False
+        self.stopped = threading.Event()
+
+    def ticks(self):
+        frame = pd.read_csv(self.source) if isinstance(self.source, str) else self.source
+        timestamps = [to_nanos(value) for value in frame['timestamp']]
+        volume = frame['volume'] if 'volume' in frame else np.zeros(len(frame))
+        for ts, price, qty in zip(timestamps, frame['price'].to_numpy(float), np.asarray(volume, dtype=float)):
+            yield Tick(ts, price, qty)
+
+    def run(self, on_tick):
+        self.is_connected = True
+        started, first = time.monotonic(), None
+        for tick in self.ticks():
+            if self.stopped.is_set():
+                break
+            if self.speed:
+                first = tick.timestamp if first is None else first
+                delay = (tick.timestamp - first) / 1e9 / self.speed - (time.monotonic() - started)
+                if delay > 0 and self.stopped.wait(delay):
+                    break
+            on_tick(tick)
+        self.is_connected = False
+
+    def stop(self):
+        self.stopped.set()
+
+
+class TickStream:
+    """
+    Feed -> BarAggregator -> bar-close subscribers.
+
+    Ticks are aggregated on the feed's thread; bar-close events are delivered
+    to subscribers on a separate publisher thread so slow analysis never
+    stalls ingestion. For live feeds a timer thread closes bars at their end
+    time (plus `close_grace` seconds for in-flight ticks) when no later tick
+    arrives. Closed bars can also be appended to a BarStore; like the
+    subscribers, it only ever receives complete bars (see BarAggregator).
+    """
+
+    def __init__(self, feed, symbol=None, intervals=None, calendar=None, capacity=None,
+                 cumulative_volume=False, bar_store=None, close_grace=None):
+        self.feed = feed
+        self.symbol = symbol or config.SYMBOL
+        self.bar_store = bar_store
+        self.close_grace = config.STREAM_CLOSE_GRACE if close_grace is None else close_grace
+        self.aggregator = BarAggregator(intervals, calendar, capacity, cumulative_volume, on_close=self._enqueue)
+        if hasattr(feed, 'on_disconnect'):
+            feed.on_disconnect = self.aggregator.mark_gap
+        self.subscribers = []
+        self.events = queue.Queue()
+        self.threads = []
+        self.stopped = threading.Event()
+        self.latencies = {interval: [] for interval in self.aggregator.intervals}
+
+    def subscribe(self, callback, intervals=None):
+        """callback(BarEvent) for every closed bar of the given intervals (all by default)"""
+        self.subscribers.append((callback, set(intervals) if intervals else None))
+
+    def _enqueue(self, interval, bar):
+        self.events.put((interval, bar))
+
+    def _publish(self):
+        while True:
+            item = self.events.get()
+            if item is None:
+                return
+            interval, bar = item
+            # Latency from the bar's scheduled end to its delivery
+            end = bar['timestamp'] + self.aggregator.steps[interval]
+            latency = max(0.0, (time.time_ns() - end) / 1e9) if self.feed.realtime else 0.0
+            history = self.latencies[interval]
+            history.append(latency)
+            del history[:-1000]
+
+            if self.bar_store is not None:
+                frame = pd.DataFrame([bar]).set_index(pd.DatetimeIndex(
+                    [pd.Timestamp(bar['timestamp'], tz='UTC')]))
+                try:
+                    self.bar_store.append(self.symbol, interval, frame.drop(columns='timestamp'))
+                except Exception as e:
+                    print(f"Error storing {interval} bar: {str(e)}")
+
+            event = BarEvent(self.symbol, interval, bar, latency)
+            for callback, intervals in self.subscribers:
+                if intervals is None or interval in intervals:
+                    try:
+                        callback(event)
+                    except Exception as e:
+                        print(f"Error in bar-close handler: {str(e)}")
+
+    def _close_timer(self):
+        while not self.stopped.is_set():
+            end = self.aggregator.next_close()
+            wait = 1.0 if end is None else (end - time.time_ns()) / 1e9 + self.close_grace
+            if wait > 0:
+                self.stopped.wait(min(wait, 1.0))
+                continue
+            self.aggregator.close_until(time.time_ns() - int(self.close_grace * 1e9))
+
+    def _ingest(self):
+        try:
+            self.feed.run(self.aggregator.on_tick)
+        except Exception as e:
+            print(f"Tick feed stopped: {str(e)}")
+        if not self.feed.realtime:
+            # End of a replay: close what the data covers, drop the cut-off bars
+            self.aggregator.finish()
+
+    def start(self):
+        self.stopped.clear()
+        self.threads = [threading.Thread(target=self._publish, name="bar-publisher", daemon=True),
+                        threading.Thread(target=self._ingest, name="tick-feed", daemon=True)]
+        if self.feed.realtime:
+            self.threads.append(threading.Thread(target=self._close_timer, name="bar-timer", daemon=True))
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def join(self, timeout=None):
+        """Wait for the feed to finish (a replay reaching its end), then for pending events"""
+        self.threads[1].join(timeout)
+        self.stop()
+
+    def stop(self):
+        self.stopped.set()
+        self.feed.stop()
+        self.events.put(None)
+        self.threads[0].join(5)
+
+    def stats(self):
+        aggregator = self.aggregator
+        stats = {'ticks': aggregator.ticks, 'ignored_ticks': aggregator.ignored_ticks,
+                 'late_ticks': aggregator.late_ticks, 'incomplete_bars': aggregator.incomplete_bars,
+                 'connected': self.feed.is_connected}
+        for interval, history in self.latencies.items():
+            if history:
+                stats[f'{interval}_bars'] = len(aggregator.buffers[interval])
+                stats[f'{interval}_latency_mean'] = float(np.mean(history))
+                stats[f'{interval}_latency_max'] = float(np.max(history))
+        return stats
@@ -1,22 +1,7 @@
 import os
 import sys
-import time
 from datetime import datetime
 import pandas as pd
-from pathlib import Path
-
-# Add the project root to the Python path
-project_root = str(Path(__file__).parent.parent)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
-
-from data_collectors.market_data import MarketDataCollector
-from analysis.technical import TechnicalAnalyzer
-from analysis.trade_plan import TradePlanGenerator
-import config import datetime
-import pandas as pd
-import sys
-import os
 
 # Add the project root to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -26,68 +11,76 @@ if project_root not in sys.path:
 from .data_collectors.market_data import MarketDataCollector
 from .analysis.technical import TechnicalAnalyzer
 from .analysis.trade_plan import TradePlanGenerator
-from datetime import datetime
-import pandas as pd
+from .scheduling.scheduler import BarScheduler
+from .data_collectors.recorder import get_recorder
+from .monitoring.metrics import span, timed, start_metrics_server, start_summary_reporter
+from .capabilities import available, print_capabilities
+from . import config
 
-# Add the project root to the Python path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from .data_collectors.market_data import MarketDataCollector
-from .analysis.technical import TechnicalAnalyzer
-from .analysis.trade_plan import TradePlanGenerator
+def build_technical_data(technical_analyzer, market_data):
+    """Trend, levels, momentum and pattern per timeframe of MarketDataCollector.get_nifty_data()"""
+    technical_data = {}
+    for interval in market_data:
+        data = market_data[interval]['data']
+        if 'VWAP' not in data.columns:
+            # Only remote (TradingView) timeframes: resampled ones carry the IndicatorEngine VWAP
+            data = technical_analyzer.calculate_vwap(data)
 
-def is_market_open():
-    now = datetime.now().time()
-    start = datetime.strptime(config.MARKET_START, "%H:%M").time()
-    end = datetime.strptime(config.MARKET_END, "%H:%M").time()
-    return start <= now <= end
+        technical_data[interval] = {
+            'trend': technical_analyzer.identify_trend(data),
+            'key_levels': technical_analyzer.identify_key_levels(data),
+            'momentum': technical_analyzer.validate_momentum(data),
+            'pattern': technical_analyzer.identify_candlestick_pattern(data),
+            'vwap': data['VWAP'].iloc[-1] if 'VWAP' in data.columns else None,
+            'summary': market_data[interval]['summary'],
+            'moving_averages': market_data[interval]['moving_averages'],
+            'oscillators': market_data[interval]['oscillators']
+        }
+    return technical_data
 
 def main():
     try:
         print("\n=== Starting Trading System ===\n")
+        print_capabilities()
         
         # Initialize components
         print("Initializing components...")
         data_collector = MarketDataCollector()
         technical_analyzer = TechnicalAnalyzer()
         trade_planner = TradePlanGenerator()
+        recorder = get_recorder()  # Raw inputs of every run, for replay.py
         last_alert_time = None
         
-        while True:
-            try:
-                if not is_market_open():
-                    print("\nMarket is closed. Waiting for market hours...")
-                    time.sleep(300)  # Check every 5 minutes
-                    continue
-                
-                print("\nFetching market data...")
-                # Collect all required data
+        @timed("analysis_cycle")
+        def analyze():
+            print("\nFetching market data...")
+            # Collect all required data
+            with span("fetch_market_data") as timer:
                 market_data = data_collector.get_nifty_data()
+                if market_data is None:
+                    timer.fail()
+            with span("fetch_institutional_data"):
                 institutional_data = data_collector.get_institutional_data()
+            with span("fetch_option_chain") as timer:
                 option_data = data_collector.get_option_chain()
+                if option_data is None:
+                    timer.fail()
+            with span("fetch_global_indices"):
                 global_data = data_collector.get_global_indices()
-                
-                if market_data is None:
-                    raise Exception("Could not fetch market data")
-                    
-                # Process each timeframe
-                technical_data = {}
-                for interval in market_data:
-                    data = market_data[interval]['data']
-                    data = technical_analyzer.calculate_vwap(data)
-                    
-                    technical_data[interval] = {
-                        'trend': technical_analyzer.identify_trend(data),
-                        'key_levels': technical_analyzer.identify_key_levels(data),
-                        'momentum': technical_analyzer.validate_momentum(data),
-                        'pattern': technical_analyzer.identify_candlestick_pattern(data),
-                        'vwap': data['VWAP'].iloc[-1] if 'VWAP' in data.columns else None,
-                        'summary': market_data[interval]['summary'],
-                        'moving_averages': market_data[interval]['moving_averages'],
-                        'oscillators': market_data[interval]['oscillators']
-                    }
-                
-                # Generate trade plan
+            recorder.begin_cycle()
+            for kind, value in (('market_data', market_data), ('institutional_data', institutional_data),
+                                ('option_data', option_data), ('global_data', global_data)):
+                recorder.record(kind, value)
+
+            if market_data is None:
+                raise Exception("Could not fetch market data")
+
+            # Process each timeframe
+            with span("technical_analysis"):
+                technical_data = build_technical_data(technical_analyzer, market_data)
+
+            # Generate trade plan
+            with span("trade_plan"):
                 trade_plan = trade_planner.generate_trade_plan(
                     market_data["5m"]['data'],  # Use 5m for current price
                     technical_data,
@@ -95,39 +88,39 @@ def main():
                     option_data,
                     global_data
                 )
-                
-                # Print analysis
-                print(f"\n=== NIFTY ANALYSIS === ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')})")
-                
-                current_price = market_data["5m"]['data']['Close'].iloc[-1]
-                print(f"\nPrice: ₹{current_price:.2f}")
-                print(f"VWAP: ₹{technical_data['5m']['vwap']:.2f}")
-                
-                print("\nMarket Bias:")
-                for bias_type, bias in trade_plan['market_bias'].items():
-                    print(f"- {bias_type.capitalize()}: {bias}")
-                
-                if trade_plan['setups']['primary']:
-                    setup = trade_plan['setups']['primary']
-                    print(f"\nPrimary Setup ({setup['type'].upper()}):")
-                    print(f"Entry: ₹{setup['entry']:.2f}")
-                    print(f"Stop Loss: ₹{setup['stop_loss']:.2f}")
-                    print(f"Target: ₹{setup['target']:.2f}")
-                
-                print("\nSignal Strengths:")
-                for interval in technical_data:
-                    trend = technical_data[interval]['trend']
-                    momentum = technical_data[interval]['momentum']
-                    print(f"{interval}: Trend={trend['strength']}/5, Momentum={momentum['strength']}/5")
-                
-                # Wait before next analysis
-                print("\nWaiting 30 seconds for next analysis...")
-                time.sleep(30)
-                
-            except Exception as loop_error:
-                print(f"\nError in analysis loop: {str(loop_error)}")
-                print("Retrying in 30 seconds...")
-                time.sleep(30)
+
+            # Print analysis
+            print(f"\n=== NIFTY ANALYSIS === ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')})")
+
+            current_price = market_data["5m"]['data']['Close'].iloc[-1]
+            print(f"\nPrice: ₹{current_price:.2f}")
+            print(f"VWAP: ₹{technical_data['5m']['vwap']:.2f}")
+
+            print("\nMarket Bias:")
+            for bias_type, bias in trade_plan['market_bias'].items():
+                print(f"- {bias_type.capitalize()}: {bias}")
+
+            if trade_plan['setups']['primary']:
+                setup = trade_plan['setups']['primary']
+                print(f"\nPrimary Setup ({setup['type'].upper()}):")
+                print(f"Entry: ₹{setup['entry']:.2f}")
+                print(f"Stop Loss: ₹{setup['stop_loss']:.2f}")
+                print(f"Target: ₹{setup['target']:.2f}")
+
+            print("\nSignal Strengths:")
+            for interval in technical_data:
+                trend = technical_data[interval]['trend']
+                momentum = technical_data[interval]['momentum']
+                print(f"{interval}: Trend={trend['strength']}/5, Momentum={momentum['strength']}/5")
+        
+        start_metrics_server()
+        start_summary_reporter()
+        
+        # Run right after every 5m candle closes, on NSE trading days only. Without Yahoo's
+        # completed bars the data is TradingView's forming candle, sampled just before the close
+        scheduler = BarScheduler() if available('yfinance') else BarScheduler(settle_delay=-config.SCHEDULER_PRE_CLOSE)
+        scheduler.add_job("NIFTY analysis", analyze, "5m")
+        scheduler.run()
                 
     except KeyboardInterrupt:
         print("\n\nTrading system stopped by user")
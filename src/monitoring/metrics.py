@@ -0,0 +1,314 @@
+import bisect
+import functools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .. import config
+
+__all__ = ['MetricsRegistry', 'get_metrics', 'span', 'timed', 'start_metrics_server', 'start_summary_reporter']
+
+
+class _Histogram:
+    """Cumulative-bucket latency histogram (Prometheus layout) with error count"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count', 'min', 'max', 'errors')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.min = float('inf')
+        self.max = 0.0
+        self.errors = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Approximate quantile, interpolated within its bucket (narrowed to the observed min/max)"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = max(self.buckets[i - 1] if i > 0 else 0.0, self.min)
+                upper = min(self.buckets[i] if i < len(self.buckets) else self.max, self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+
+class _Span:
+    __slots__ = ('registry', 'stage', 'start', 'failed')
+
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+        self.failed = False
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.stage, time.perf_counter() - self.start, self.failed or exc_type is not None)
+        return False
+
+    def fail(self):
+        """Count the stage as failed without raising (e.g. a fetch that returned None)"""
+        self.failed = True
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def fail(self):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class MetricsRegistry:
+    """
+    Latency histograms and error counters per pipeline stage.
+
+    `with registry.span("fetch_tradingview"):` times a block; an exception
+    (or span.fail()) also counts as an error for the stage. When the registry
+    is disabled span() hands back a shared no-op object, so instrumentation
+    left in the loop costs one attribute check and a method call.
+
+    Components that keep their own counters (the NSE response cache, the
+    alert dispatcher) register a collector; it is read only when /metrics is
+    scraped or the summary line is printed.
+    """
+
+    def __init__(self, enabled=True, buckets=None):
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets or config.METRICS_BUCKETS))
+        self.stages = {}
+        self.collectors = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def span(self, stage):
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, stage)
+
+    def timed(self, stage):
+        """Decorator form of span()"""
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def add_collector(self, name, collect, label=None, summary=None):
+        """
+        Export collect()'s numbers as gauges traderbot_<name>_<field>.
+        collect() returns {field: number}, or {label value: {field: number}}
+        when `label` is given (one series per channel, say). `summary` picks
+        the fields shown in the summary line (default: all of them).
+        """
+        with self.lock:
+            self.collectors[name] = (collect, label, summary)
+
+    def _collect(self):
+        """[(name, label, summary fields, {label value or None: {field: number}})] from every collector"""
+        with self.lock:
+            collectors = sorted(self.collectors.items())
+        collected = []
+        for name, (collect, label, summary) in collectors:
+            try:
+                values = collect()
+            except Exception as e:
+                print(f"Error collecting {name} metrics: {str(e)}")
+                continue
+            series = values if label else {None: values}
+            collected.append((name, label, summary, series))
+        return collected
+
+    def observe(self, stage, seconds, error=False):
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = _Histogram(self.buckets)
+            histogram.observe(seconds)
+            if error:
+                histogram.errors += 1
+
+    def snapshot(self):
+        """{stage: {count, errors, mean, p50, p95, max}} in seconds"""
+        with self.lock:
+            return {stage: {
+                'count': h.count,
+                'errors': h.errors,
+                'mean': h.sum / h.count if h.count else 0.0,
+                'p50': h.quantile(0.5),
+                'p95': h.quantile(0.95),
+                'max': h.max
+            } for stage, h in self.stages.items()}
+
+    def prometheus(self):
+        """Prometheus text exposition of every stage"""
+        lines = [
+            "# HELP traderbot_stage_seconds Wall time of trading loop stages",
+            "# TYPE traderbot_stage_seconds histogram"
+        ]
+        errors = [
+            "# HELP traderbot_stage_errors_total Stage runs that raised or reported a failure",
+            "# TYPE traderbot_stage_errors_total counter"
+        ]
+        with self.lock:
+            for stage, h in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float('inf'),), h.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float('inf') else repr(float(bound))
+                    lines.append(f'traderbot_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'traderbot_stage_seconds_sum{{stage="{stage}"}} {h.sum}')
+                lines.append(f'traderbot_stage_seconds_count{{stage="{stage}"}} {h.count}')
+                errors.append(f'traderbot_stage_errors_total{{stage="{stage}"}} {h.errors}')
+        lines += errors
+        for name, label, _, series in self._collect():
+            fields = sorted({field for values in series.values() for field in values})
+            for field in fields:
+                metric = f"traderbot_{name}_{field}"
+                lines += [f"# TYPE {metric} gauge"]
+                for key, values in sorted(series.items(), key=lambda item: str(item[0])):
+                    if field in values:
+                        labels = f'{{{label}="{key}"}}' if label else ""
+                        lines.append(f"{metric}{labels} {values[field]}")
+        lines += [
+            "# HELP traderbot_uptime_seconds Seconds since the metrics registry was created",
+            "# TYPE traderbot_uptime_seconds gauge",
+            f"traderbot_uptime_seconds {time.time() - self.started:.1f}"
+        ]
+        return "\n".join(lines) + "\n"
+
+    def summary_line(self):
+        """One line per report: p50/p95 and error count of every stage seen so far"""
+        parts = []
+        for stage, s in sorted(self.snapshot().items()):
+            part = f"{stage} p50={_format(s['p50'])} p95={_format(s['p95'])} n={s['count']}"
+            if s['errors']:
+                part += f" err={s['errors']}"
+            parts.append(part)
+        for name, label, summary, series in self._collect():
+            for key, values in sorted(series.items(), key=lambda item: str(item[0])):
+                fields = summary or sorted(values)
+                shown = " ".join(f"{field}={_format_value(values[field])}" for field in fields if field in values)
+                parts.append(f"{name}[{key}] {shown}" if label else f"{name} {shown}")
+        return "[metrics] " + (" | ".join(parts) if parts else "no samples")
+
+
+def _format(seconds):
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.1f}s"
+
+
+def _format_value(value):
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_metrics = None
+_server = None
+_reporter = None
+_lock = threading.Lock()
+
+
+def get_metrics():
+    """Return the process-wide registry (disabled when config.METRICS_ENABLED is off)"""
+    global _metrics
+    if _metrics is None:
+        with _lock:
+            if _metrics is None:
+                _metrics = MetricsRegistry(enabled=config.METRICS_ENABLED)
+    return _metrics
+
+
+def span(stage):
+    """Time a block on the process-wide registry"""
+    return get_metrics().span(stage)
+
+
+def timed(stage):
+    """Decorator timing every call on the process-wide registry"""
+    return get_metrics().timed(stage)
+
+
+def start_metrics_server(port=None, host="127.0.0.1"):
+    """Serve /metrics in Prometheus text format from a daemon thread; returns the server or None"""
+    global _server
+    registry = get_metrics()
+    port = config.METRICS_PORT if port is None else port
+    if not registry.enabled or not port:
+        return None
+    with _lock:
+        if _server is not None:
+            return _server
+        try:
+            handler = type('MetricsHandler', (_Handler,), {'registry': registry})
+            _server = ThreadingHTTPServer((host, port), handler)
+        except OSError as e:
+            print(f"Could not start metrics endpoint on {host}:{port}: {str(e)}")
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"Metrics at http://{host}:{port}/metrics")
+        return _server
+
+
+def start_summary_reporter(interval=None):
+    """Print MetricsRegistry.summary_line() every `interval` seconds from a daemon thread"""
+    global _reporter
+    registry = get_metrics()
+    interval = config.METRICS_SUMMARY_INTERVAL if interval is None else interval
+    if not registry.enabled or not interval:
+        return None
+    with _lock:
+        if _reporter is not None:
+            return _reporter
+
+        def report():
+            while True:
+                time.sleep(interval)
+                print(registry.summary_line())
+
+        _reporter = threading.Thread(target=report, name="metrics-summary", daemon=True)
+        _reporter.start()
+        return _reporter
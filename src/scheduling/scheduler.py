@@ -0,0 +1,121 @@
+import threading
+import time
+import pandas as pd
+from .. import config
+from .trading_calendar import TradingCalendar, INTERVAL_MINUTES
+
+__all__ = ['BarScheduler']
+
+
+class _Job:
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.runs = 0
+        self.errors = 0
+        self.lateness = []        # seconds between the scheduled and actual start
+        self.last_duration = None
+
+
+class BarScheduler:
+    """
+    Runs jobs right after bar closes on the NSE calendar.
+
+    Each job fires `settle_delay` seconds after every close of its interval
+    (09:20, 09:25, ... for 5m; the partial 15:30 bar included), only on
+    trading days and special sessions. A negative settle_delay fires that
+    many seconds before each close instead, for jobs whose only source is a
+    snapshot of the forming candle (TradingView): sampled just after the
+    close it would hold the next bar's first seconds, not the bar that closed. The wait for each run is measured with
+    time.monotonic() against the absolute target time, so runs do not drift
+    with job duration and wall-clock adjustments mid-wait do not shift them.
+    Jobs due at the same boundary run one after another in registration order.
+    """
+
+    def __init__(self, calendar=None, settle_delay=None, max_sleep=60, history=500):
+        self.calendar = calendar or TradingCalendar()
+        self.settle_delay = pd.Timedelta(seconds=config.SCHEDULER_SETTLE_DELAY if settle_delay is None else settle_delay)
+        self.max_sleep = max_sleep    # re-read the wall clock at least this often while waiting
+        self.history = history
+        self.jobs = []
+        self.stop_event = threading.Event()
+
+    def add_job(self, name, func, interval="5m"):
+        if interval not in INTERVAL_MINUTES:
+            raise ValueError(f"Unsupported interval: {interval}")
+        self.jobs.append(_Job(name, func, interval))
+
+    def next_run(self, now=None):
+        """(target time, jobs due at it) for the next scheduled run"""
+        now = self.calendar.now() if now is None else now
+        # Targets are bar closes shifted by settle_delay; the next one is strictly after `now`
+        reference = now - self.settle_delay
+        targets = {}
+        for job in self.jobs:
+            target = self.calendar.next_bar_close(job.interval, reference) + self.settle_delay
+            targets.setdefault(target, []).append(job)
+        target = min(targets)
+        return target, targets[target]
+
+    def _wait_until(self, target):
+        """Sleep until the wall-clock target using a monotonic deadline; False if stopped"""
+        deadline = time.monotonic() + (target - self.calendar.now()).total_seconds()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            if self.stop_event.wait(min(remaining, self.max_sleep)):
+                return False
+
+    def run_pending(self, target, jobs):
+        for job in jobs:
+            started = self.calendar.now()
+            lateness = (started - target).total_seconds()
+            job.lateness.append(lateness)
+            del job.lateness[:-self.history]
+            print(f"\n[{started.strftime('%H:%M:%S')}] {job.name} ({job.interval} bar close, {lateness:+.2f}s)")
+            began = time.monotonic()
+            try:
+                job.func()
+            except Exception as e:
+                job.errors += 1
+                print(f"Error in {job.name}: {str(e)}")
+            job.runs += 1
+            job.last_duration = time.monotonic() - began
+
+    def run(self):
+        """Run jobs until stop() is called (or KeyboardInterrupt)"""
+        if not self.jobs:
+            raise ValueError("No jobs scheduled")
+        self.stop_event.clear()
+        last_target = None
+        while not self.stop_event.is_set():
+            now = self.calendar.now()
+            # Never repeat a boundary, even if the wall clock was stepped back
+            target, jobs = self.next_run(now if last_target is None else max(now, last_target))
+            if not self.calendar.is_open(now) and (target - now).total_seconds() > self.max_sleep:
+                print(f"Market closed. Next run at {target.strftime('%Y-%m-%d %H:%M:%S')}")
+            if not self._wait_until(target):
+                break
+            self.run_pending(target, jobs)
+            last_target = target
+
+    def stop(self):
+        self.stop_event.set()
+
+    def stats(self):
+        """Per-job run counts and start lateness in seconds"""
+        stats = {}
+        for job in self.jobs:
+            lateness = job.lateness
+            stats[job.name] = {
+                'interval': job.interval,
+                'runs': job.runs,
+                'errors': job.errors,
+                'last_lateness': lateness[-1] if lateness else None,
+                'mean_lateness': sum(lateness) / len(lateness) if lateness else None,
+                'max_lateness': max(lateness) if lateness else None,
+                'last_duration': job.last_duration
+            }
+        return stats
@@ -0,0 +1,111 @@
+from datetime import date, datetime, timedelta
+import pandas as pd
+from .. import config
+
+__all__ = ['TradingCalendar', 'INTERVAL_MINUTES']
+
+# '1d' is longer than any session, so it spans exactly one bar from open to close
+INTERVAL_MINUTES = {'1m': 1, '3m': 3, '5m': 5, '15m': 15, '30m': 30, '1h': 60, '1d': 1440}
+
+
+def _to_date(value):
+    return value if isinstance(value, date) and not isinstance(value, datetime) else pd.Timestamp(value).date()
+
+
+def _to_time(value):
+    return datetime.strptime(value, "%H:%M").time() if isinstance(value, str) else value
+
+
+class TradingCalendar:
+    """
+    NSE cash/F&O session calendar in IST.
+
+    Weekends and the dates in `holidays` are closed. `special_sessions` maps
+    a date to its own (open, close) times, which covers both extra sessions
+    on non-trading days (budget-day Saturdays, Muhurat trading) and shortened
+    ones. Every other weekday trades from MARKET_START to MARKET_END.
+    """
+
+    def __init__(self, holidays=None, special_sessions=None, open_time=None, close_time=None, timezone=None):
+        self.timezone = timezone or config.MARKET_TIMEZONE
+        self.open_time = _to_time(open_time or config.MARKET_START)
+        self.close_time = _to_time(close_time or config.MARKET_END)
+        self.holidays = {_to_date(day) for day in (config.NSE_HOLIDAYS if holidays is None else holidays)}
+        special_sessions = config.NSE_SPECIAL_SESSIONS if special_sessions is None else special_sessions
+        self.special_sessions = {
+            _to_date(day): (_to_time(start), _to_time(end)) for day, (start, end) in special_sessions.items()
+        }
+
+    def now(self):
+        return pd.Timestamp.now(tz=self.timezone)
+
+    def _localize(self, day, at):
+        return pd.Timestamp(datetime.combine(day, at)).tz_localize(self.timezone)
+
+    def is_trading_day(self, day):
+        day = _to_date(day)
+        if day in self.special_sessions:
+            return True
+        return day.weekday() < 5 and day not in self.holidays
+
+    def session(self, day):
+        """(open, close) timestamps for a date, or None when the exchange is closed"""
+        day = _to_date(day)
+        if not self.is_trading_day(day):
+            return None
+        start, end = self.special_sessions.get(day, (self.open_time, self.close_time))
+        return self._localize(day, start), self._localize(day, end)
+
+    def is_open(self, now=None):
+        now = self.now() if now is None else now
+        session = self.session(now.date())
+        return session is not None and session[0] <= now < session[1]
+
+    def next_session(self, now=None):
+        """The current session if it has not closed yet, else the next one"""
+        now = self.now() if now is None else now
+        day = now.date()
+        for _ in range(366):
+            session = self.session(day)
+            if session is not None and now < session[1]:
+                return session
+            day += timedelta(days=1)
+        raise ValueError("No trading session within a year; check NSE_HOLIDAYS")
+
+    def bar_closes(self, day, interval):
+        """
+        Bar close times for a session: every `interval` from the open, plus the
+        session close when the last bar is partial (the 15:15-15:30 hourly bar).
+        """
+        session = self.session(day)
+        if session is None:
+            return []
+        start, end = session
+        step = pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+        closes = list(pd.date_range(start + step, end, freq=step))
+        if not closes or closes[-1] < end:
+            closes.append(end)
+        return closes
+
+    def next_bar_close(self, interval, now=None):
+        """First bar close strictly after `now` for the interval, across sessions"""
+        now = self.now() if now is None else now
+        session_open, _ = self.next_session(now)
+        # The session close is always one of the bar closes, so this finds one
+        return next(close for close in self.bar_closes(session_open.date(), interval) if close > now)
+
+    def load_nse_holidays(self, segment="CM"):
+        """
+        Add trading holidays published by NSE (/api/holiday-master) to the
+        calendar; returns how many dates were added, or None on failure.
+        """
+        from ..data_collectors.nse_session import get_nse_session
+        from ..data_collectors.nse_headers import BASE_URL
+
+        data = get_nse_session().make_request(f"{BASE_URL}/api/holiday-master?type=trading")
+        if not data or segment not in data:
+            return None
+        dates = {datetime.strptime(item['tradingDate'], "%d-%b-%Y").date() for item in data[segment]}
+        added = dates - self.holidays
+        self.holidays |= dates
+        return len(added)
@@ -0,0 +1,65 @@
+import threading
+from src.alerts.channels import SMTPChannel
+from src.alerts.dispatcher import AlertDispatcher
+from src.alerts.smtp_sink import SMTPSink
+from src.monitoring.metrics import MetricsRegistry
+
+
+def test_dispatcher_delivers_through_smtp():
+    with SMTPSink() as sink:
+        dispatcher = AlertDispatcher(coalesce_window=0)
+        dispatcher.register('email', SMTPChannel(sink.host, sink.port, "bot@localhost",
+                                                 ["me@localhost"], use_tls=False))
+        assert dispatcher.send('email', "NIFTY MAJOR BUY SIGNAL", "Current Price: 25000")
+        assert dispatcher.flush(timeout=10)
+        stats = dispatcher.stats()['email']
+        dispatcher.close(timeout=10)
+
+    assert [m['message']['Subject'] for m in sink.messages] == ["NIFTY MAJOR BUY SIGNAL"]
+    assert stats['delivered'] == 1 and stats['failed'] == 0
+    assert stats['latency_max'] >= 0
+
+
+def test_ensure_channel_creates_one_channel_under_concurrency():
+    dispatcher = AlertDispatcher()
+    created = []
+
+    class Channel:
+        def __init__(self):
+            created.append(self)
+
+        def send(self, subject, body):
+            pass
+
+        def close(self):
+            pass
+
+    start = threading.Barrier(8)
+
+    def ensure():
+        start.wait()
+        dispatcher.ensure_channel('email', Channel)
+
+    threads = [threading.Thread(target=ensure) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    dispatcher.close(timeout=5)
+
+    assert len(created) == 1
+
+
+def test_dispatcher_stats_exported_as_metrics():
+    dispatcher = AlertDispatcher(coalesce_window=0)
+    dispatcher.register('log', type('Channel', (), {'send': lambda self, s, b: None, 'close': lambda self: None})())
+    dispatcher.send('log', "subject", "body")
+    dispatcher.flush(timeout=5)
+
+    registry = MetricsRegistry()
+    registry.add_collector('alerts', dispatcher.stats, label='channel', summary=('delivered',))
+    try:
+        assert 'traderbot_alerts_delivered{channel="log"} 1' in registry.prometheus()
+        assert "alerts[log] delivered=1" in registry.summary_line()
+    finally:
+        dispatcher.close(timeout=5)
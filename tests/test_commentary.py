@@ -0,0 +1,31 @@
+from src.analysis.commentary import CommentaryService, StubBackend
+
+CONTEXT = {'price': 25012.4, 'bias': 'bullish', 'strength': 4, 'volume_pressure': 'buying',
+           'rsi': 61.2, 'adx': 27.5}
+
+
+def test_commentary_cached_per_quantized_context():
+    backend = StubBackend(responder=lambda prompt: f"commentary for {prompt}")
+    service = CommentaryService(backend, timeout=5, cache_ttl=60)
+    try:
+        first = service.get(CONTEXT, "prompt 1")
+        # Same buckets (price, RSI, ADX and strength bands): served from the cache
+        second = service.get(dict(CONTEXT, price=25014.9, rsi=61.9, strength=4.5), "prompt 2")
+        other = service.get(dict(CONTEXT, bias='bearish'), "prompt 3")
+    finally:
+        service.shutdown()
+
+    assert first == second == "commentary for prompt 1"
+    assert other == "commentary for prompt 3"
+    assert backend.prompts == ["prompt 1", "prompt 3"]
+
+
+def test_commentary_callback_receives_result():
+    service = CommentaryService(StubBackend(), timeout=5)
+    received = []
+    try:
+        service.request(CONTEXT, "prompt", callback=received.append).result(timeout=5)
+    finally:
+        service.shutdown()
+
+    assert received == ["Commentary unavailable offline (stub backend)."]
@@ -0,0 +1,37 @@
+import numpy as np
+from benchmarks.synthetic import ohlcv
+from src.analysis.streaming import IndicatorEngine, compute_indicators, TOLERANCE
+from src.analysis.technical import TechnicalAnalyzer
+
+
+def deviation(stream, batch):
+    """Largest |stream - batch| / max(1, |batch|) over the values both define (TOLERANCE's measure)"""
+    stream, batch = np.asarray(stream, dtype=float), np.asarray(batch, dtype=float)
+    assert np.array_equal(np.isnan(stream), np.isnan(batch))
+    valid = ~np.isnan(batch)
+    return float(np.max(np.abs(stream[valid] - batch[valid]) / np.maximum(1.0, np.abs(batch[valid]))))
+
+
+def test_engine_matches_batch_across_cycles():
+    df = ohlcv(600)
+    engine = IndicatorEngine(history=len(df))
+    # Two cycles: the second call only feeds the bars added since the first
+    engine.update_frame(df.iloc[:450])
+    stream = engine.update_frame(df)
+    batch = compute_indicators(df)
+
+    for column in batch.columns:
+        assert deviation(stream[column], batch[column]) <= TOLERANCE, column
+
+
+def test_live_vwap_matches_batch():
+    df = ohlcv(300)
+    analyzer = TechnicalAnalyzer()
+    engine = IndicatorEngine(history=len(df))
+    analyzer.calculate_vwap(df.iloc[:200], engine=engine)
+    live = analyzer.calculate_vwap(df, engine=engine)
+    batch = analyzer.calculate_vwap(df)
+
+    assert 'VWAP' not in df.columns
+    assert deviation(live['VWAP'], batch['VWAP']) <= TOLERANCE
+    assert deviation(batch['VWAP'], compute_indicators(df)['VWAP']) == 0.0
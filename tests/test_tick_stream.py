@@ -0,0 +1,37 @@
+import pandas as pd
+from src.data_collectors.tick_stream import ReplayTickFeed, TickStream
+from src.scheduling.trading_calendar import TradingCalendar
+
+
+def replay(start, end):
+    """One tick every 10 seconds in [start, end] on a trading day, price rising by 1 per tick"""
+    timestamps = pd.date_range(start, end, freq='10s', inclusive='both', tz='Asia/Kolkata')
+    frame = pd.DataFrame({'timestamp': timestamps, 'price': 25000.0 + pd.RangeIndex(len(timestamps)),
+                          'volume': 10.0})
+    stream = TickStream(ReplayTickFeed(frame), intervals=['5m'], calendar=TradingCalendar(holidays=[]))
+    bars = []
+    stream.subscribe(lambda event: bars.append(event.bar))
+    stream.start()
+    stream.join(timeout=30)
+    return stream, bars
+
+
+def test_replay_publishes_complete_bars_only():
+    # Starts mid-bar (09:16:30) and stops before 09:35: both partial bars are dropped
+    stream, bars = replay('2026-10-16 09:16:30', '2026-10-16 09:34:30')
+
+    starts = [pd.Timestamp(bar['timestamp'], tz='UTC').tz_convert('Asia/Kolkata').strftime('%H:%M')
+              for bar in bars]
+    assert starts == ['09:20', '09:25']
+    assert stream.stats()['incomplete_bars'] == 2
+    first = bars[0]
+    assert first['Open'] == 25021.0 and first['Close'] == 25050.0
+    assert first['High'] == 25050.0 and first['Low'] == 25021.0
+    assert first['Volume'] == 300.0
+
+
+def test_replay_from_session_open_keeps_first_bar():
+    _, bars = replay('2026-10-16 09:15', '2026-10-16 09:25')
+
+    assert len(bars) == 2
+    assert bars[0]['Open'] == 25000.0
@@ -1,7 +1,60 @@
 from tradingview_ta import TA_Handler, Interval
 import pandas as pd
 from datetime import datetime
-import time
+from src.data_collectors.concurrent_fetch import get_default_fetcher
+from src.data_collectors.screener import BatchScreener
+from src.scheduling.scheduler import BarScheduler
+from src.config import SCHEDULER_PRE_CLOSE
+
+def calculate_bias(all_data):
+    """Count bullish/bearish signals across timeframes and derive the overall bias"""
+    bullish_signals = 0
+    bearish_signals = 0
+    
+    for interval, data in all_data.items():
+        if data['rsi'] > 60:
+            bullish_signals += 1
+        elif data['rsi'] < 40:
+            bearish_signals += 1
+            
+        if data['macd'] > data['signal']:
+            bullish_signals += 1
+        else:
+            bearish_signals += 1
+            
+        if data['recommendation'] in ['STRONG_BUY', 'BUY']:
+            bullish_signals += 1
+        elif data['recommendation'] in ['STRONG_SELL', 'SELL']:
+            bearish_signals += 1
+    
+    # Final bias
+    if bullish_signals > bearish_signals + 2:
+        bias = "BULLISH"
+    elif bearish_signals > bullish_signals + 2:
+        bias = "BEARISH"
+    else:
+        bias = "NEUTRAL"
+    
+    return bias, bullish_signals, bearish_signals
+
+def scan_watchlist(screener):
+    """Print the bias of every watchlist symbol from one batched scan"""
+    watchlist_data = screener.scan()
+    
+    print(f"\n=== Watchlist ({len(watchlist_data)} symbols) ===")
+    for symbol, timeframes in watchlist_data.items():
+        all_data = {
+            interval: {
+                'rsi': data['RSI'],
+                'macd': data['MACD.macd'],
+                'signal': data['MACD.signal'],
+                'recommendation': data['recommendation']
+            }
+            for interval, data in timeframes.items()
+        }
+        bias, bullish_signals, bearish_signals = calculate_bias(all_data)
+        price = next(iter(timeframes.values()))['close']
+        print(f"{symbol:<12} ₹{price:>10.2f}  {bias:<8} (+{bullish_signals}/-{bearish_signals})")
 
 def main():
     try:
@@ -28,38 +81,48 @@ def main():
                 interval=Interval.INTERVAL_1_HOUR
             )
         }
+        fetcher = get_default_fetcher()
+        screener = BatchScreener()
         
-        while True:
-            try:
-                print("\nFetching market data...")
-                all_data = {}
-                
-                # Get analysis for each timeframe
-                for interval, handler in handlers.items():
-                    analysis = handler.get_analysis()
-                    indicators = analysis.indicators
-                    
-                    print(f"\n=== {interval} Timeframe Analysis ===")
-                    print(f"Price: ₹{indicators['close']:.2f}")
-                    print(f"RSI: {indicators['RSI']:.2f}")
-                    print(f"MACD: {indicators['MACD.macd']:.2f}")
-                    print(f"Signal: {indicators['MACD.signal']:.2f}")
-                    print(f"ADX: {indicators['ADX']:.2f}")
-                    print(f"Recommendation: {analysis.summary['RECOMMENDATION']}")
-                    
-                    # Store data for trend analysis
-                    all_data[interval] = {
-                        'price': indicators['close'],
-                        'rsi': indicators['RSI'],
-                        'adx': indicators['ADX'],
-                        'macd': indicators['MACD.macd'],
-                        'signal': indicators['MACD.signal'],
-                        'recommendation': analysis.summary['RECOMMENDATION']
-                    }
-                
-                # Overall analysis
+        def analyze():
+            print("\nFetching market data...")
+            all_data = {}
+
+            # Get analysis for all timeframes at once
+            analyses = fetcher.fetch_all({
+                interval: handler.get_analysis
+                for interval, handler in handlers.items()
+            })
+            for interval in analyses.missed:
+                print(f"Timed out fetching {interval} data")
+            for interval, error in analyses.errors.items():
+                print(f"Error fetching {interval} data: {str(error)}")
+
+            for interval, analysis in analyses.items():
+                indicators = analysis.indicators
+
+                print(f"\n=== {interval} Timeframe Analysis ===")
+                print(f"Price: ₹{indicators['close']:.2f}")
+                print(f"RSI: {indicators['RSI']:.2f}")
+                print(f"MACD: {indicators['MACD.macd']:.2f}")
+                print(f"Signal: {indicators['MACD.signal']:.2f}")
+                print(f"ADX: {indicators['ADX']:.2f}")
+                print(f"Recommendation: {analysis.summary['RECOMMENDATION']}")
+
+                # Store data for trend analysis
+                all_data[interval] = {
+                    'price': indicators['close'],
+                    'rsi': indicators['RSI'],
+                    'adx': indicators['ADX'],
+                    'macd': indicators['MACD.macd'],
+                    'signal': indicators['MACD.signal'],
+                    'recommendation': analysis.summary['RECOMMENDATION']
+                }
+
+            # Overall analysis; needs the 5m timeframe, which may have failed this cycle
+            if '5m' in all_data:
                 print("\n=== Overall Market Analysis ===")
-                
+
                 # Trend strength
                 adx_5m = all_data['5m']['adx']
                 if adx_5m > 25:
@@ -68,48 +131,24 @@ def main():
                     trend_strength = "Moderate"
                 else:
                     trend_strength = "Weak"
-                
-                # Bias calculation
-                bullish_signals = 0
-                bearish_signals = 0
-                
-                for interval, data in all_data.items():
-                    if data['rsi'] > 60:
-                        bullish_signals += 1
-                    elif data['rsi'] < 40:
-                        bearish_signals += 1
-                        
-                    if data['macd'] > data['signal']:
-                        bullish_signals += 1
-                    else:
-                        bearish_signals += 1
-                        
-                    if data['recommendation'] in ['STRONG_BUY', 'BUY']:
-                        bullish_signals += 1
-                    elif data['recommendation'] in ['STRONG_SELL', 'SELL']:
-                        bearish_signals += 1
-                
-                # Final bias
-                if bullish_signals > bearish_signals + 2:
-                    bias = "BULLISH"
-                elif bearish_signals > bullish_signals + 2:
-                    bias = "BEARISH"
-                else:
-                    bias = "NEUTRAL"
-                
+
+                bias, bullish_signals, bearish_signals = calculate_bias(all_data)
+
                 print(f"Current Price: ₹{all_data['5m']['price']:.2f}")
                 print(f"Trend Strength: {trend_strength}")
                 print(f"Market Bias: {bias}")
                 print(f"Bullish Signals: {bullish_signals}")
                 print(f"Bearish Signals: {bearish_signals}")
-                
-                print("\nWaiting 30 seconds for next analysis...")
-                time.sleep(30)
-                
-            except Exception as loop_error:
-                print(f"\nError in analysis loop: {str(loop_error)}")
-                print("Retrying in 30 seconds...")
-                time.sleep(30)
+            else:
+                print("\n5m data unavailable, skipping overall market analysis")
+
+            scan_watchlist(screener)
+        
+        # Run just before every 5m candle closes, on NSE trading days only: TradingView's
+        # snapshot is the forming candle, which just after the close would be the next one
+        scheduler = BarScheduler(settle_delay=-SCHEDULER_PRE_CLOSE)
+        scheduler.add_job("Market analysis", analyze, "5m")
+        scheduler.run()
                 
     except KeyboardInterrupt:
         print("\n\nTrading system stopped by user")